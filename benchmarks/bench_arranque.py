@@ -0,0 +1,89 @@
+"""
+Benchmark de tiempo de arranque basado en 'python -X importtime'.
+
+    python -m benchmarks.bench_arranque [--modulo ui.main_window] [--repeticiones 5]
+                                        [--referencia arranque.json] [--guardar arranque.json]
+                                        [--prohibir PyQt6 ...]
+
+Para la línea de comandos: --modulo cli --prohibir PyQt6
+
+Falla (código 1) si al importar el módulo se cargan bibliotecas que deben
+importarse a demanda, o si el tiempo supera a la referencia guardada en
+más del margen permitido.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# Bibliotecas de reportes que nunca deben importarse al arrancar
+PROHIBIDOS_AL_ARRANCAR = ["pandas", "matplotlib", "openpyxl", "numpy"]
+
+LINEA_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir(modulo):
+    """Importa 'modulo' en un intérprete nuevo; devuelve (microsegundos acumulados, {modulo: µs})."""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True, text=True, cwd=raiz
+    )
+    if proceso.returncode != 0:
+        raise SystemExit(f"No se pudo importar {modulo}:\n{proceso.stderr.strip().splitlines()[-1]}")
+    modulos = {}
+    total = 0
+    for linea in proceso.stderr.splitlines():
+        m = LINEA_IMPORTTIME.match(linea)
+        if not m:
+            continue
+        acumulado, sangria, nombre = int(m.group(2)), len(m.group(3)), m.group(4)
+        modulos[nombre] = acumulado
+        if sangria == 1:
+            # Solo las importaciones de primer nivel suman al total
+            total += acumulado
+    return total, modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modulo", default="ui.main_window")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--referencia", help="JSON con una medición anterior para comparar")
+    parser.add_argument("--margen", type=float, default=1.25, help="Tolerancia sobre la referencia (1.25 = +25%%)")
+    parser.add_argument("--guardar", help="Guardar la medición como JSON")
+    parser.add_argument("--prohibir", nargs="+", default=[],
+                        help="Otros módulos que no deben importarse (además de PROHIBIDOS_AL_ARRANCAR)")
+    args = parser.parse_args()
+
+    mediciones = [medir(args.modulo) for _ in range(args.repeticiones)]
+    mejor_total, modulos = min(mediciones, key=lambda m: m[0])
+    print(f"Importar {args.modulo}: {mejor_total / 1000:.1f} ms (mejor de {args.repeticiones})")
+    for nombre, us in sorted(modulos.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {us / 1000:8.1f} ms  {nombre}")
+
+    fallos = []
+    cargados = sorted({n.split(".")[0] for n in modulos} & set(PROHIBIDOS_AL_ARRANCAR + args.prohibir))
+    if cargados:
+        fallos.append(f"se importaron al arrancar: {', '.join(cargados)}")
+
+    if args.referencia:
+        with open(args.referencia, encoding="utf-8") as f:
+            referencia = json.load(f)
+        if referencia["modulo"] == args.modulo and mejor_total > referencia["total_us"] * args.margen:
+            fallos.append(f"{mejor_total / 1000:.1f} ms supera la referencia de "
+                          f"{referencia['total_us'] / 1000:.1f} ms (+{(args.margen - 1) * 100:.0f}%)")
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump({"modulo": args.modulo, "total_us": mejor_total, "modulos": modulos}, f, indent=2)
+
+    for fallo in fallos:
+        print(f"REGRESIÓN: {fallo}")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark del catálogo de productos: consultas por acción del usuario con y sin caché.
+
+    python -m benchmarks.bench_catalogo [--productos 2000]
+
+Cada acción repite lo que hace MainWindow: la llamada a DatabaseManager y
+luego el refresco de la tabla y el combobox de productos. Sin caché se
+vuelve a leer todo; con caché la interfaz aplica los avisos del catálogo.
+"""
+import argparse
+import shutil
+
+from core.database import DatabaseManager
+from benchmarks.comun import nueva_base, sembrar_productos, conteo_aleatorio, cronometrar
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias SELECT y de escritura ejecutadas en todas las conexiones de 'db'."""
+    def __init__(self, db):
+        self.lecturas = 0
+        self.escrituras = 0
+        conexiones = [db.conn]
+        if db._pool is not None:
+            tomadas = [db._pool.tomar() for _ in range(db._pool.tamano)]
+            for conn in tomadas:
+                db._pool.devolver(conn)
+            conexiones += tomadas
+        for conn in conexiones:
+            conn.set_trace_callback(self._traza)
+
+    def _traza(self, sql):
+        inicio = sql.lstrip()[:6].upper()
+        if inicio in ("SELECT", "WITH R"):
+            self.lecturas += 1
+        elif inicio in ("INSERT", "UPDATE", "DELETE"):
+            self.escrituras += 1
+
+    def reiniciar(self):
+        self.lecturas = self.escrituras = 0
+
+
+def refrescar_todo(db):
+    """Lo que hacían refresh_table_productos y refresh_combobox_productos."""
+    for _ in db.iter_productos():
+        pass
+    db.get_productos()
+
+
+def acciones(db, conteo):
+    """Secuencia de acciones de un día: [(nombre, función)]."""
+    return [
+        ("abrir ventana", lambda: refrescar_todo(db)),
+        ("agregar producto", lambda: db.add_producto("Producto nuevo", 12.5, 10, False)),
+        ("registrar producción", lambda: db.update_produccion_stock(1, 25)),
+        ("producción en lote", lambda: db.update_produccion_stock_lote([(i, 5) for i in range(1, 51)])),
+        ("ocultar producto", lambda: db.toggle_producto_oculto(2)),
+        ("abrir diálogo de cierre", lambda: db.get_productos()),
+        ("ejecutar cierre", lambda: db.realizar_cierre_diario("2024-01-01", conteo)),
+    ]
+
+
+def medir(ruta, usar_cache, conteo):
+    db = DatabaseManager(ruta, usar_cache_productos=usar_cache)
+    if usar_cache:
+        # Como la interfaz: los avisos puntuales solo leen del catálogo
+        def oyente(evento, ids):
+            if evento == "modificado":
+                [db.catalogo.obtener(i).como_fila_tabla() for i in ids]
+            else:
+                refrescar_todo(db)
+        db.catalogo.suscribir(oyente)
+    contador = ContadorConsultas(db)
+
+    resultados = []
+    for nombre, accion in acciones(db, conteo):
+        contador.reiniciar()
+
+        def completa():
+            accion()
+            if not usar_cache and nombre not in ("abrir ventana", "abrir diálogo de cierre"):
+                refrescar_todo(db)
+
+        tiempo, _ = cronometrar(completa)
+        resultados.append((nombre, contador.lecturas, contador.escrituras, tiempo))
+    estado = db.get_productos(ver_ocultos=True)
+    db.close()
+    return resultados, estado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=2000)
+    args = parser.parse_args()
+
+    base = nueva_base("semilla.db")
+    sembrar_productos(base, args.productos)
+    conteo = conteo_aleatorio(base)
+    base.close()
+
+    medidas = {}
+    for modo, usar_cache in (("sin_cache", False), ("con_cache", True)):
+        ruta = base.db_name.replace("semilla.db", f"{modo}.db")
+        shutil.copyfile(base.db_name, ruta)
+        medidas[modo] = medir(ruta, usar_cache, conteo)
+
+    print(f"Consultas por acción con {args.productos} productos (lecturas / escrituras, ms)")
+    print(f"  {'acción':<24} {'sin caché':>20} {'con caché':>20}")
+    for antes, despues in zip(medidas["sin_cache"][0], medidas["con_cache"][0]):
+        print(f"  {antes[0]:<24} {antes[1]:>5} / {antes[2]:<3} {antes[3] * 1000:7.1f}"
+              f" {despues[1]:>5} / {despues[2]:<3} {despues[3] * 1000:7.1f}")
+
+    if medidas["sin_cache"][1] != medidas["con_cache"][1]:
+        raise SystemExit("ERROR: el catálogo cacheado no coincide con la base.")
+    print("  catálogo idéntico a la base: OK")
+
+
+if __name__ == "__main__":
+    main()
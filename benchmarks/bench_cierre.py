@@ -0,0 +1,95 @@
+"""
+Benchmark del cierre diario: cierre por conjuntos vs. el bucle por producto original.
+
+    python -m benchmarks.bench_cierre [--productos 10000]
+
+Ambos caminos se ejecutan sobre copias idénticas de la misma base sembrada y
+se verifica que produzcan exactamente las mismas filas.
+"""
+import argparse
+import datetime
+import shutil
+import sqlite3
+
+from core.database import DatabaseManager
+from benchmarks.comun import nueva_base, sembrar_productos, conteo_aleatorio, cronometrar
+
+
+def cierre_por_producto(db, fecha, conteo_final):
+    """Implementación original (una sentencia por producto y por tabla)."""
+    cursor = db.conn.cursor()
+    for prod in db.get_productos(ver_ocultos=True):
+        id_prod = prod['id_prod']
+        stock_final_conteo = conteo_final.get(id_prod, 0)
+        stock_inicial_dia = prod['stock'] - prod['produccion_dia']
+        produccion_dia = prod['produccion_dia']
+        ventas_calculadas = stock_inicial_dia + produccion_dia - stock_final_conteo
+        if ventas_calculadas < 0:
+            ventas_calculadas = 0
+        ingresos_calculados = ventas_calculadas * prod['precio']
+        cursor.execute("""
+        INSERT INTO cierre_diario (fecha, id_producto, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(fecha, id_producto) DO UPDATE SET
+            stock_inicial=excluded.stock_inicial,
+            produccion_dia=excluded.produccion_dia,
+            stock_final_conteo=excluded.stock_final_conteo,
+            ventas_calculadas=excluded.ventas_calculadas,
+            ingresos_calculados=excluded.ingresos_calculados
+        """, (fecha, id_prod, prod['nombre'], stock_inicial_dia, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados))
+        cursor.execute("""
+        UPDATE productos SET stock = ?, produccion_dia = 0, vendido_dia = 0
+        WHERE id_prod = ?
+        """, (stock_final_conteo, id_prod))
+    db.conn.commit()
+    return True, f"Cierre del {fecha} realizado con éxito."
+
+
+def volcar(db):
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT * FROM cierre_diario ORDER BY fecha, id_producto")
+    cierres = cursor.fetchall()
+    cursor.execute("SELECT * FROM productos ORDER BY id_prod")
+    return cierres, cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=10000)
+    args = parser.parse_args()
+
+    base = nueva_base("semilla.db")
+    sembrar_productos(base, args.productos)
+    conteo = conteo_aleatorio(base)
+    # Quitar algunos productos del conteo para ejercitar el caso "se asume 0"
+    for id_prod in list(conteo)[::50]:
+        del conteo[id_prod]
+    base.close()
+
+    fecha = datetime.date.today()
+    resultados = {}
+    volcados = {}
+    for nombre, cierre in (("por_producto", cierre_por_producto),
+                           ("por_conjuntos", DatabaseManager.realizar_cierre_diario)):
+        ruta = base.db_name.replace("semilla.db", f"{nombre}.db")
+        shutil.copyfile(base.db_name, ruta)
+        db = DatabaseManager(ruta)
+        tiempo, (ok, mensaje) = cronometrar(lambda: cierre(db, fecha, conteo))
+        if not ok:
+            raise SystemExit(mensaje)
+        resultados[nombre] = tiempo
+        volcados[nombre] = volcar(db)
+        db.close()
+
+    print(f"Cierre de {args.productos} productos (sqlite {sqlite3.sqlite_version})")
+    for nombre, tiempo in resultados.items():
+        print(f"  {nombre:<14} {tiempo * 1000:10.1f} ms")
+    print(f"  aceleración     {resultados['por_producto'] / resultados['por_conjuntos']:10.1f}x")
+
+    if volcados["por_producto"] != volcados["por_conjuntos"]:
+        raise SystemExit("ERROR: los dos cierres produjeron filas distintas.")
+    print("  filas idénticas: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark de la capa de conexión: latencia de commit por perfil y lecturas
+concurrentes mientras otro hilo escribe.
+
+    python -m benchmarks.bench_conexion [--escrituras 300] [--productos 2000]
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from core.conexion import PERFILES
+from benchmarks.comun import nueva_base, sembrar_productos
+
+
+def latencias_commit(db, escrituras):
+    latencias = []
+    for i in range(escrituras):
+        inicio = time.perf_counter()
+        ok, mensaje = db.registrar_pago_trabajador(1, "Bench", 10.0 + i, "Salario")
+        latencias.append(time.perf_counter() - inicio)
+        if not ok:
+            raise SystemExit(mensaje)
+    return latencias
+
+
+def lecturas_durante_escrituras(db, segundos=1.0):
+    """Cuenta cuántos get_productos completa el hilo principal mientras otro hilo escribe."""
+    detener = threading.Event()
+
+    def escritor():
+        while not detener.is_set():
+            db.update_produccion_stock(1, 1)
+
+    hilo = threading.Thread(target=escritor)
+    hilo.start()
+    lecturas = 0
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        db.get_productos(ver_ocultos=True)
+        lecturas += 1
+    detener.set()
+    hilo.join()
+    return lecturas / segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--escrituras", type=int, default=300)
+    parser.add_argument("--productos", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'perfil':<12} {'media ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'lecturas/s':>11}")
+    for perfil in PERFILES:
+        db = nueva_base(f"{perfil}.db", perfil=perfil)
+        sembrar_productos(db, args.productos)
+        latencias = sorted(latencias_commit(db, args.escrituras))
+        lecturas = lecturas_durante_escrituras(db)
+        db.close()
+        print(f"{perfil:<12} {statistics.mean(latencias) * 1000:9.3f} "
+              f"{latencias[len(latencias) // 2] * 1000:8.3f} "
+              f"{latencias[int(len(latencias) * 0.95)] * 1000:8.3f} {lecturas:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de apertura del diálogo de conteo del cierre con catálogos grandes.
+
+    python -m benchmarks.bench_dialogo_cierre [--productos 500 5000]
+
+Compara CierreDialog (modelo/vista, un editor solo en la celda editada)
+con el formulario anterior (un QLabel y un QSpinBox por producto en un
+QScrollArea). Mide construir, mostrar y pintar el diálogo por primera vez.
+Requiere PyQt6 (se usa la plataforma 'offscreen', sin ventana).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--sin-formulario", action="store_true",
+                        help="No medir el formulario anterior (tarda segundos con miles de productos)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtWidgets import (
+            QApplication, QDialog, QFormLayout, QLabel, QScrollArea, QSpinBox, QVBoxLayout, QWidget
+        )
+    except ImportError:
+        raise SystemExit("PyQt6 no está instalado.")
+    from ui.dialogs import CierreDialog
+
+    def formulario_anterior(productos):
+        dialogo = QDialog()
+        layout = QVBoxLayout(dialogo)
+        interno = QWidget()
+        form = QFormLayout(interno)
+        for prod in productos:
+            spinbox = QSpinBox()
+            spinbox.setRange(0, 9999)
+            spinbox.setValue(prod['stock'])
+            form.addRow(QLabel(f"{prod['nombre']} (Actual: {prod['stock']}):"), spinbox)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(interno)
+        layout.addWidget(scroll)
+        return dialogo
+
+    def abrir(crear, productos):
+        inicio = time.perf_counter()
+        dialogo = crear(productos)
+        dialogo.show()
+        app.processEvents()
+        duracion = time.perf_counter() - inicio
+        dialogo.close()
+        dialogo.deleteLater()
+        app.processEvents()
+        return duracion * 1000
+
+    app = QApplication(sys.argv)
+    rnd = random.Random(7)
+    print(f"  {'productos':>10} {'modelo/vista ms':>16} {'formulario ms':>14}")
+    for cantidad in args.productos:
+        productos = [{"id_prod": i + 1, "nombre": f"Producto {i + 1:05d}", "stock": rnd.randint(0, 200)}
+                     for i in range(cantidad)]
+        vista = min(abrir(CierreDialog, productos) for _ in range(3))
+        formulario = "-" if args.sin_formulario else f"{abrir(formulario_anterior, productos):.1f}"
+        print(f"  {cantidad:>10} {vista:16.1f} {formulario:>14}")
+
+        # Editar unos pocos conteos: solo esos vuelven en get_cambios()
+        dialogo = CierreDialog(productos)
+        modelo = dialogo.modelo
+        filas = {0, cantidad // 2, cantidad - 1}
+        for fila in filas:
+            modelo.setData(modelo.index(fila, modelo.COLUMNA_CONTEO), productos[fila]['stock'] + 1)
+        assert len(dialogo.get_cambios()) == len(filas) and len(dialogo.get_conteo_final()) == cantidad
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark de escrituras concurrentes: varios procesos (cajas) escribiendo en el mismo archivo.
+
+    python -m benchmarks.bench_escritores [--escritores 2,4,8] [--segundos 5] [--lote 10]
+                                          [--perfiles compatible,rendimiento] [--busy-timeout MS]
+
+Cada escritor es un proceso con su DatabaseManager que, sin pausas,
+registra pagos y producción. Para cada perfil de core.conexion (y para el
+último también con ráfagas de '--lote' escrituras dentro de
+DatabaseManager.agrupar()) informa las escrituras confirmadas por segundo,
+el porcentaje que falló con "database is locked", la latencia que ve cada
+llamada y los BEGIN IMMEDIATE que se reintentaron. '--busy-timeout' pisa
+el busy_timeout de todos los perfiles (p. ej. 50 para forzar choques).
+Al final comprueba que las tablas de resumen coinciden con los pagos.
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+from benchmarks.comun import ruta_temporal
+from benchmarks.generador import generar_base
+
+
+def escritor(ruta, perfil, numero, inicio, fin, lote, salida):
+    from core.database import DatabaseManager
+
+    db = DatabaseManager(ruta, perfil=perfil, usar_cache_productos=False)
+    rnd = random.Random(numero)
+    trabajadores = [(t["id_trab"], t["nombre"]) for t in db.get_trabajadores()]
+    productos = [p["id_prod"] for p in db.get_productos()]
+
+    def escribir():
+        if rnd.random() < 0.5:
+            id_trab, nombre = rnd.choice(trabajadores)
+            return db.registrar_pago_trabajador(id_trab, nombre, round(rnd.uniform(10, 100), 2), "Salario")
+        return db.update_produccion_stock(rnd.choice(productos), rnd.randint(1, 20))
+
+    confirmadas, fallos, latencias, errores = 0, 0, [], set()
+    time.sleep(max(0.0, inicio - time.time()))
+    while time.time() < fin:
+        t0 = time.perf_counter()
+        if lote > 1:
+            try:
+                with db.agrupar():
+                    resultados = [escribir() for _ in range(lote)]
+            except Exception as e:
+                resultados = [(False, str(e))] * lote
+        else:
+            resultados = [escribir()]
+        latencia = time.perf_counter() - t0
+        for exito, mensaje in resultados:
+            if exito:
+                confirmadas += 1
+            else:
+                fallos += 1
+                errores.add(mensaje)
+        latencias += [latencia] * len(resultados)
+    salida.put({"confirmadas": confirmadas, "fallos": fallos, "latencias": latencias,
+                "reintentos": db.reintentos_bloqueo, "errores": sorted(errores)})
+    db.close()
+
+
+def correr(ruta, perfil, escritores, segundos, lote):
+    contexto = multiprocessing.get_context("spawn")
+    salida = contexto.Queue()
+    inicio = time.time() + 1.5  # margen para que arranquen los procesos
+    procesos = [contexto.Process(target=escritor, args=(ruta, perfil, i, inicio, inicio + segundos, lote, salida))
+                for i in range(escritores)]
+    for proceso in procesos:
+        proceso.start()
+    resultados = [salida.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    return resultados
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))] if ordenados else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--escritores", default="2,4,8", help="Cantidades de procesos a probar, separadas por coma")
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--lote", type=int, default=10, help="Escrituras por agrupar() en el último modo")
+    parser.add_argument("--perfiles", default="compatible,rendimiento")
+    parser.add_argument("--busy-timeout", type=int, help="busy_timeout en ms para todos los perfiles")
+    parser.add_argument("--productos", type=int, default=500)
+    args = parser.parse_args()
+
+    perfiles = args.perfiles.split(",")
+    modos = [(nombre, 1) for nombre in perfiles] + [(perfiles[-1], args.lote)]
+    print(f"{'modo':<26} {'escr.':>5} {'conf./s':>9} {'fallos':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'máx ms':>8} {'reint.':>7}")
+    errores = set()
+    for nombre, lote in modos:
+        perfil = {"base": nombre}
+        if args.busy_timeout is not None:
+            perfil["busy_timeout"] = args.busy_timeout
+        etiqueta = nombre if lote == 1 else f"{nombre} + agrupar({lote})"
+        for escritores in (int(n) for n in args.escritores.split(",")):
+            ruta = ruta_temporal("escritores.db")
+            generar_base(ruta, productos=args.productos, anios=0.1)
+            resultados = correr(ruta, perfil, escritores, args.segundos, lote)
+            confirmadas = sum(r["confirmadas"] for r in resultados)
+            fallos = sum(r["fallos"] for r in resultados)
+            latencias = [l for r in resultados for l in r["latencias"]]
+            errores.update(e for r in resultados for e in r["errores"])
+            from core.database import DatabaseManager
+            db = DatabaseManager(ruta, perfil=perfil)
+            diferencias = db.verificar_resumenes()
+            db.close()
+            print(f"{etiqueta:<26} {escritores:>5} {confirmadas / args.segundos:9.0f} "
+                  f"{fallos / max(confirmadas + fallos, 1) * 100:7.2f}% "
+                  f"{percentil(latencias, 50) * 1000:8.2f} {percentil(latencias, 95) * 1000:8.2f} "
+                  f"{max(latencias, default=float('nan')) * 1000:8.1f} "
+                  f"{sum(r['reintentos'] for r in resultados):7d}"
+                  + (f"  RESÚMENES DESCUADRADOS: {len(diferencias)}" if diferencias else ""))
+    for error in sorted(errores):
+        print(f"  error visto: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark de exportación de cierres: streaming vs. materializar todo el historial.
+
+    python -m benchmarks.bench_exportar [--productos 500] [--dias 2000]
+
+Cada modo corre en un proceso aparte para medir su pico de memoria (RSS).
+Los modos que dependen de bibliotecas no instaladas se omiten.
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from core.database import DatabaseManager, COLUMNAS_REPORTE_VENTAS
+from core.exportar import exportar_cierres
+from benchmarks.comun import nueva_base, sembrar_productos, sembrar_cierres
+
+MODOS = {
+    "streaming_csv": ".csv",
+    "streaming_xlsx": ".xlsx",
+    "fetchall_csv": ".csv",      # get_datos_reporte_ventas + csv (lista de dicts completa)
+    "pandas_xlsx": ".xlsx",      # camino original: lista de dicts -> DataFrame -> to_excel
+}
+
+REQUISITOS = {
+    "streaming_xlsx": ["openpyxl"],
+    "pandas_xlsx": ["pandas", "openpyxl"],
+}
+
+
+def ejecutar_modo(modo, base, salida):
+    db = DatabaseManager(base)
+    inicio = time.perf_counter()
+    if modo.startswith("streaming"):
+        filas = exportar_cierres(db, salida)
+    elif modo == "fetchall_csv":
+        datos = db.get_datos_reporte_ventas()
+        with open(salida, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS_REPORTE_VENTAS)
+            escritor.writeheader()
+            escritor.writerows(datos)
+        filas = len(datos)
+    else:
+        import pandas as pd
+        datos = db.get_datos_reporte_ventas()
+        pd.DataFrame(datos).to_excel(salida, index=False, sheet_name="CierresDiarios")
+        filas = len(datos)
+    duracion = time.perf_counter() - inicio
+    db.close()
+    # ru_maxrss está en KB en Linux
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"modo": modo, "filas": filas, "segundos": duracion, "pico_rss_mb": pico_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=500)
+    parser.add_argument("--dias", type=int, default=2000)
+    parser.add_argument("--modo", choices=MODOS, help=argparse.SUPPRESS)
+    parser.add_argument("--base", help=argparse.SUPPRESS)
+    parser.add_argument("--salida", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        ejecutar_modo(args.modo, args.base, args.salida)
+        return
+
+    db = nueva_base("exportar.db")
+    sembrar_productos(db, args.productos)
+    sembrar_cierres(db, args.dias)
+    base = db.db_name
+    db.close()
+    print(f"Exportando {args.productos * args.dias} filas de cierre_diario")
+
+    for modo, extension in MODOS.items():
+        faltantes = [m for m in REQUISITOS.get(modo, []) if importlib.util.find_spec(m) is None]
+        if faltantes:
+            print(f"  {modo:<15} omitido (falta {', '.join(faltantes)})")
+            continue
+        salida = os.path.join(os.path.dirname(base), modo + extension)
+        proceso = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_exportar", "--modo", modo, "--base", base, "--salida", salida],
+            capture_output=True, text=True, check=True
+        )
+        r = json.loads(proceso.stdout.strip().splitlines()[-1])
+        print(f"  {modo:<15} {r['segundos']:8.2f} s   pico RSS {r['pico_rss_mb']:8.1f} MB   ({r['filas']} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark de los modos de filas (core.filas.MODOS) al leer muchas filas de cierre_diario.
+
+    python -m benchmarks.bench_filas [--filas 100000] [--repeticiones 3]
+"""
+import argparse
+import tracemalloc
+
+from core.filas import MODOS
+from benchmarks.comun import nueva_base, sembrar_productos, sembrar_cierres, cronometrar
+
+PRODUCTOS = 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    db = nueva_base()
+    sembrar_productos(db, PRODUCTOS)
+    sembrar_cierres(db, -(-args.filas // PRODUCTOS))
+    total = db.contar_cierres()
+
+    print(f"get_cierres_por_rango con {total} filas")
+    print(f"  {'modo':<10} {'ms':>9} {'MB retenidos':>13}")
+    referencia = None
+    for modo in MODOS:
+        leer = lambda: db.get_cierres_por_rango("0000-01-01", "9999-12-31", modo=modo)
+        tiempo, _ = cronometrar(leer, args.repeticiones)
+
+        tracemalloc.start()
+        resultado = leer()
+        retenido, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Todos los modos deben devolver los mismos valores
+        if modo == "columnar":
+            valores = list(zip(*resultado))
+        else:
+            valores = [tuple(fila.values()) if modo == "dict" else tuple(fila) for fila in resultado]
+        if referencia is None:
+            referencia = valores
+        elif valores != referencia:
+            raise SystemExit(f"ERROR: el modo {modo} devolvió filas distintas.")
+        del resultado, valores
+        print(f"  {modo:<10} {tiempo * 1000:9.1f} {retenido / 1e6:13.1f}")
+    print("  mismas filas en todos los modos: OK")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark del gráfico de ingresos embebido: tiempo de pintar N días en una imagen.
+
+    python -m benchmarks.bench_grafico [--dias 365 730 1825]
+
+Requiere PyQt6 (se usa la plataforma 'offscreen', sin ventana).
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from array import array
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dias", type=int, nargs="+", default=[30, 365, 730, 1825])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtGui import QImage
+    except ImportError:
+        raise SystemExit("PyQt6 no está instalado.")
+    from ui.grafico import GraficoIngresos
+
+    app = QApplication(sys.argv)
+    rnd = random.Random(7)
+    hoy = datetime.date.today()
+    for dias in args.dias:
+        fechas = [(hoy - datetime.timedelta(days=d)).isoformat() for d in range(dias, 0, -1)]
+        totales = array('d', (rnd.uniform(500, 5000) for _ in fechas))
+        grafico = GraficoIngresos()
+        grafico.resize(900, 400)
+        imagen = QImage(grafico.size(), QImage.Format.Format_ARGB32)
+
+        mejor = None
+        for _ in range(args.repeticiones):
+            grafico.set_serie(fechas, totales)  # invalida el submuestreo, como un refresco real
+            inicio = time.perf_counter()
+            grafico.render(imagen)
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        print(f"  {dias:5d} días: {mejor * 1000:7.2f} ms")
+    del app
+
+
+if __name__ == "__main__":
+    main()
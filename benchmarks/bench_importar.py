@@ -0,0 +1,89 @@
+"""
+Benchmark de la importación masiva de CSV (core.importar) contra add_producto fila por fila.
+
+    python -m benchmarks.bench_importar [--productos 100000] [--invalidas 0.01]
+                                        [--muestra-individual 2000]
+
+Mide: alta de todos los productos, reimportación del mismo archivo (todas
+actualizaciones), carga de un CSV de conteo directo al cierre y, como
+referencia, add_producto con un commit por fila sobre una muestra.
+"""
+import argparse
+import csv
+import os
+import random
+import time
+
+from benchmarks.comun import nueva_base, ruta_temporal
+from core.importar import importar_csv, importar_conteo_csv
+
+
+def escribir_productos(ruta, cantidad, invalidas, semilla=99):
+    """CSV con separador ';' y coma decimal; 'invalidas' es la fracción de filas con errores."""
+    rnd = random.Random(semilla)
+    malas = 0
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo, delimiter=";")
+        escritor.writerow(["nombre", "precio", "stock", "es_gaseosa"])
+        for i in range(cantidad):
+            precio = f"{rnd.uniform(0.5, 40):.2f}".replace(".", ",")
+            stock = str(rnd.randint(0, 200))
+            if rnd.random() < invalidas:
+                malas += 1
+                precio = "gratis"
+            escritor.writerow([f"Producto {i + 1:06d}", precio, stock, "sí" if i % 7 == 0 else "no"])
+    return malas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=100000)
+    parser.add_argument("--invalidas", type=float, default=0.01)
+    parser.add_argument("--muestra-individual", type=int, default=2000)
+    args = parser.parse_args()
+
+    ruta_csv = ruta_temporal("productos.csv")
+    malas = escribir_productos(ruta_csv, args.productos, args.invalidas)
+    print(f"CSV de {args.productos} productos ({os.path.getsize(ruta_csv) / 1e6:.1f} MB, {malas} filas inválidas)")
+
+    db = nueva_base("importar.db")
+    inicio = time.perf_counter()
+    resultado = importar_csv(db, "productos", ruta_csv)
+    alta = time.perf_counter() - inicio
+    assert resultado["aplicadas"] == args.productos - malas and len(resultado["errores"]) == malas
+    print(f"  alta (importar_csv)        {alta * 1000:9.1f} ms  {resultado['aplicadas'] / alta:10.0f} filas/s")
+
+    inicio = time.perf_counter()
+    resultado = importar_csv(db, "productos", ruta_csv)
+    actualizacion = time.perf_counter() - inicio
+    total = db.conn.execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+    assert total == args.productos - malas, total
+    print(f"  reimportación (upsert)     {actualizacion * 1000:9.1f} ms  {resultado['aplicadas'] / actualizacion:10.0f} filas/s")
+
+    ruta_conteo = ruta_temporal("conteo.csv")
+    rnd = random.Random(5)
+    with open(ruta_conteo, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["id_prod", "cantidad"])
+        for (id_prod,) in db.conn.execute("SELECT id_prod FROM productos"):
+            escritor.writerow([id_prod, rnd.randint(0, 50)])
+    inicio = time.perf_counter()
+    exito, mensaje, errores = importar_conteo_csv(db, ruta_conteo, "2025-01-01")
+    cierre = time.perf_counter() - inicio
+    assert exito and not errores, mensaje
+    print(f"  conteo CSV + cierre        {cierre * 1000:9.1f} ms")
+    db.close()
+
+    individual = nueva_base("individual.db")
+    inicio = time.perf_counter()
+    for i in range(args.muestra_individual):
+        individual.add_producto(f"Producto {i + 1:06d}", 10.0, 5, False)
+    uno_a_uno = time.perf_counter() - inicio
+    individual.close()
+    velocidad = args.muestra_individual / uno_a_uno
+    print(f"  add_producto x{args.muestra_individual:<10d} {uno_a_uno * 1000:9.1f} ms  {velocidad:10.0f} filas/s"
+          f"  (estimado para {args.productos}: {args.productos / velocidad:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
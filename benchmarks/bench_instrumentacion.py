@@ -0,0 +1,56 @@
+"""
+Benchmark del costo de la instrumentación de DatabaseManager (activa, desactivada y nunca activada).
+
+    python -m benchmarks.bench_instrumentacion [--llamadas 20000]
+"""
+import argparse
+import time
+
+from benchmarks.comun import nueva_base, sembrar_productos, sembrar_cierres
+
+
+def por_llamada(funcion, llamadas):
+    """Microsegundos por llamada (mejor de 3 tandas)."""
+    mejor = None
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        duracion = (time.perf_counter() - inicio) / llamadas * 1e6
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--llamadas", type=int, default=20000)
+    args = parser.parse_args()
+
+    db = nueva_base()
+    sembrar_productos(db, 50)
+    sembrar_cierres(db, 30)
+    db.reconstruir_resumenes()
+
+    # {método: argumentos}; el método se busca en cada llamada, como lo hace ServicioDB
+    casos = {
+        "get_ultimo_resumen_ingresos": (),
+        "contar_cierres": (),
+        "update_produccion_stock": (1, 1),
+    }
+
+    estados = [("nunca activada", lambda: None),
+               ("activa", db.activar_instrumentacion),
+               ("desactivada", db.desactivar_instrumentacion)]
+    print(f"  {'caso':<30}" + "".join(f"{nombre:>16}" for nombre, _ in estados) + "   (µs por llamada)")
+    medidas = {nombre: {} for nombre in casos}
+    for estado, preparar in estados:
+        preparar()
+        for nombre, argumentos in casos.items():
+            medidas[nombre][estado] = por_llamada(lambda: getattr(db, nombre)(*argumentos), args.llamadas)
+    for nombre, valores in medidas.items():
+        print(f"  {nombre:<30}" + "".join(f"{valores[estado]:16.2f}" for estado, _ in estados))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Cuenta las lecturas del catálogo y los refrescos de la interfaz que provoca cada acción.
+
+    python -m benchmarks.bench_invalidacion [--productos 2000]
+
+Con MainWindow (plataforma 'offscreen') sobre una base generada y las
+pestañas de stock, personal y reportes abiertas, ejecuta un cierre del
+día, un alta de producto, una producción y dos veces una importación de
+personal sin filas válidas. Para cada acción informa los avisos del
+catálogo, los refrescos que hizo el bus de invalidación (ui.invalidacion)
+y las lecturas del catálogo (get_productos/iter_productos). Falla si el
+cierre lee el catálogo más de una vez. Requiere PyQt6.
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.comun import ruta_temporal
+from benchmarks.generador import generar_base
+
+LECTURAS_CATALOGO = ("get_productos", "iter_productos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtWidgets import QApplication, QMessageBox
+    except ImportError:
+        raise SystemExit("PyQt6 no está instalado.")
+    from ui import main_window
+    from ui.main_window import MainWindow
+
+    ruta = ruta_temporal("invalidacion.db")
+    generar_base(ruta, productos=args.productos, anios=0.1)
+    ruta_csv = ruta_temporal("personal.csv")
+    with open(ruta_csv, "w", encoding="utf-8") as f:
+        f.write("nombre,salario_semanal\nSin salario,mucho\n")
+
+    # Diálogos sin interacción: el conteo suma 1 a cada producto y todo se confirma
+    class CierreAutomatico(main_window.CierreDialog):
+        def exec(self):
+            return 1
+
+        def get_conteo_final(self):
+            return {id_prod: cantidad + 1 for id_prod, cantidad in super().get_conteo_final().items()}
+
+    main_window.CierreDialog = CierreAutomatico
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.StandardButton.Yes)
+
+    app = QApplication(sys.argv)
+    ventana = MainWindow(precalentar_reportes=False, db_name=ruta)
+    ventana._show_message = lambda *a, **k: None
+    ventana.show()
+    for indice in (1, 2, 4):
+        ventana.tab_widget.setCurrentIndex(indice)
+
+    def esperar():
+        while ventana.servicio._callbacks or ventana.bus._programado:
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+
+    esperar()
+    avisos = []
+    refrescos = []
+    ventana.avisos_catalogo.cambio.connect(lambda evento, ids: avisos.append(evento))
+    ventana.bus.refrescado.connect(lambda conjunto, ids: refrescos.append(conjunto))
+    instrumentacion = ventana.db.activar_instrumentacion()
+
+    def medir(nombre, accion):
+        avisos.clear()
+        refrescos.clear()
+        omitidos = ventana.bus.omitidos
+        instrumentacion.reiniciar()
+        inicio = time.perf_counter()
+        accion()
+        esperar()
+        duracion = time.perf_counter() - inicio
+        metodos = instrumentacion.instantanea()["metodos"]
+        lecturas = sum(metodos[m]["llamadas"] for m in LECTURAS_CATALOGO if m in metodos)
+        print(f"  {nombre:<30} {duracion * 1000:8.1f} ms  avisos={len(avisos)}  "
+              f"refrescos={','.join(refrescos) or '-'}  omitidos={ventana.bus.omitidos - omitidos}  "
+              f"lecturas_catalogo={lecturas}")
+        return lecturas, refrescos[:]
+
+    print(f"MainWindow con {args.productos} productos:")
+    lecturas, refrescos_cierre = medir("cierre del día", ventana.slot_ejecutar_cierre)
+    medir("alta de producto", lambda: ventana.servicio.enviar("add_producto", "Producto nuevo", 2.5, 10, False))
+    medir("producción de uno", lambda: ventana.servicio.enviar("update_produccion_stock", 1, 5))
+    # La primera recarga porque la base cambió desde el último refresco del
+    # personal; la segunda no encuentra cambios en PRAGMA data_version
+    for vez in (1, 2):
+        medir(f"importar personal inválido {vez}", lambda: ventana.servicio.enviar(
+            main_window.importar_csv, "trabajadores", ruta_csv,
+            al_terminar=lambda r: ventana.bus.invalidar("trabajadores")))
+
+    ventana.close()
+    if lecturas != 1 or refrescos_cierre.count("productos") != 1:
+        print(f"FALLO: el cierre hizo {lecturas} lecturas del catálogo y "
+              f"{refrescos_cierre.count('productos')} refrescos de productos (se espera 1 y 1)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Verificación y benchmark de las migraciones de esquema (PRAGMA user_version).
+
+    python -m benchmarks.bench_migraciones [--base panaderia.db] [--anios 3]
+                                           [--repeticiones 20]
+
+Actualiza una copia de la base incluida en el repositorio y una base
+generada de varios años llevada a la forma anterior a las migraciones
+(sin user_version, con proveedores.pago_mensual y sin las columnas
+agregadas después). Comprueba el esquema, que no se pierdan datos y que
+las tablas de resumen cuadren; que un paso que falla no deje nada a medias;
+y que abrir una base al día ejecute solo la lectura de PRAGMA user_version.
+"""
+import argparse
+import shutil
+import sqlite3
+import time
+
+from benchmarks.comun import cronometrar, ruta_temporal
+from benchmarks.generador import generar_base
+from core import database
+from core.database import DatabaseManager, ESQUEMA_BASE, MIGRACIONES, VERSION_ESQUEMA
+
+COLUMNAS_ESPERADAS = {
+    "trabajadores": {"tipo_pago"},
+    "pagos": {"tipo_pago_realizado"},
+}
+TABLAS_MIGRADAS = ["resumen_ingresos_dia", "resumen_pagos_dia", "diario_cierres", "cambios_tablas"]
+
+
+def huella(conn):
+    """Filas y totales de las tablas con datos del usuario, para comparar antes y después."""
+    return {
+        "productos": conn.execute("SELECT COUNT(*), TOTAL(stock), TOTAL(precio) FROM productos").fetchone(),
+        "trabajadores": conn.execute("SELECT COUNT(*), TOTAL(salario_semanal) FROM trabajadores").fetchone(),
+        "proveedores": conn.execute("SELECT COUNT(*) FROM proveedores").fetchone(),
+        "pagos": conn.execute("SELECT COUNT(*), ROUND(TOTAL(monto), 2) FROM pagos").fetchone(),
+        "cierre_diario": conn.execute("SELECT COUNT(*), ROUND(TOTAL(ingresos_calculados), 2) FROM cierre_diario").fetchone(),
+    }
+
+
+def comprobar_actualizada(ruta, antes):
+    """Abre 'ruta' con DatabaseManager y verifica el resultado; devuelve los segundos de la migración."""
+    inicio = time.perf_counter()
+    db = DatabaseManager(ruta, usar_cache_productos=False)
+    duracion = time.perf_counter() - inicio
+    conn = db.conn
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == VERSION_ESQUEMA
+        for tabla, columnas in COLUMNAS_ESPERADAS.items():
+            faltan = columnas - database._columnas(conn.cursor(), tabla)
+            assert not faltan, f"{tabla}: faltan {faltan}"
+        assert "pago_mensual" not in database._columnas(conn.cursor(), "proveedores")
+        for tabla in TABLAS_MIGRADAS:
+            assert database._columnas(conn.cursor(), tabla), f"falta la tabla {tabla}"
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert huella(conn) == antes, (huella(conn), antes)
+
+        ingresos = conn.execute("SELECT ROUND(TOTAL(ingresos_calculados), 2) FROM cierre_diario").fetchone()[0]
+        resumen = conn.execute("SELECT ROUND(TOTAL(ingresos), 2) FROM resumen_ingresos_dia").fetchone()[0]
+        assert ingresos == resumen, (ingresos, resumen)
+        pagos = conn.execute("SELECT COUNT(*) FROM pagos").fetchone()[0]
+        assert conn.execute("SELECT TOTAL(cantidad) FROM resumen_pagos_dia").fetchone()[0] == pagos
+    finally:
+        db.close()
+    return duracion
+
+
+def envejecer(ruta):
+    """Lleva una base al día a la forma que tenía antes de las migraciones numeradas."""
+    conn = sqlite3.connect(ruta)
+    for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        conn.execute(f"DROP TRIGGER {trigger}")
+    for tabla in TABLAS_MIGRADAS:
+        conn.execute(f"DROP TABLE {tabla}")
+    for (indice,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall():
+        conn.execute(f"DROP INDEX {indice}")
+    conn.execute("ALTER TABLE trabajadores DROP COLUMN tipo_pago")
+    conn.execute("ALTER TABLE pagos DROP COLUMN tipo_pago_realizado")
+    conn.execute("ALTER TABLE proveedores ADD COLUMN pago_mensual REAL NOT NULL DEFAULT 0")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+
+
+def leer_huella(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return huella(conn)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", default="panaderia.db", help="Base incluida en el repositorio (se trabaja sobre una copia)")
+    parser.add_argument("--anios", type=float, default=3)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    # 1) La base incluida en el repositorio
+    copia = ruta_temporal("incluida.db")
+    shutil.copyfile(args.base, copia)
+    version = sqlite3.connect(copia).execute("PRAGMA user_version").fetchone()[0]
+    duracion = comprobar_actualizada(copia, leer_huella(copia))
+    print(f"  {args.base} (v{version} -> v{VERSION_ESQUEMA})        {duracion * 1000:9.1f} ms")
+
+    # 2) Base generada de varios años, en la forma previa a las migraciones
+    generada = ruta_temporal("historial.db")
+    filas = generar_base(generada, anios=args.anios)
+    envejecer(generada)
+    duracion = comprobar_actualizada(generada, leer_huella(generada))
+    print(f"  generada {args.anios:g} años ({filas['cierre_diario']} cierres, "
+          f"{filas['pagos']} pagos, v0 -> v{VERSION_ESQUEMA})  {duracion * 1000:9.1f} ms")
+
+    # 3) Un paso que falla se deshace entero y la versión no avanza
+    MIGRACIONES.append((VERSION_ESQUEMA + 1, "Paso roto a propósito", [
+        "CREATE TABLE tabla_a_medias (x INTEGER)",
+        "SELECT * FROM tabla_que_no_existe",
+    ]))
+    database.VERSION_ESQUEMA = VERSION_ESQUEMA + 1
+    try:
+        DatabaseManager(copia, usar_cache_productos=False).close()
+    finally:
+        MIGRACIONES.pop()
+        database.VERSION_ESQUEMA = VERSION_ESQUEMA
+    conn = sqlite3.connect(copia)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == VERSION_ESQUEMA
+    assert not database._columnas(conn.cursor(), "tabla_a_medias")
+    conn.close()
+    print("  paso fallido: revertido, versión sin cambios")
+
+    # 4) Arranque sobre una base al día: una sola lectura de PRAGMA
+    db = DatabaseManager(generada, usar_cache_productos=False)
+    sentencias = []
+    db.conn.set_trace_callback(sentencias.append)
+    db.create_tables()
+    db.conn.set_trace_callback(None)
+    assert sentencias == ["PRAGMA user_version"], sentencias
+
+    al_dia, _ = cronometrar(db.create_tables, args.repeticiones)
+
+    def todo_el_ddl():
+        # Referencia: lo que se ejecutaba en cada arranque antes (esquema + pasos), deshecho al final
+        cursor = db.conn.cursor()
+        cursor.execute("BEGIN")
+        for sentencia in ESQUEMA_BASE + [s for _, _, pasos in MIGRACIONES for s in pasos
+                                         if callable(s) or not s.lstrip().startswith(("INSERT", "DELETE"))]:
+            sentencia(cursor) if callable(sentencia) else cursor.execute(sentencia)
+        db.conn.rollback()
+
+    anterior, _ = cronometrar(todo_el_ddl, args.repeticiones)
+    db.close()
+    print(f"  arranque al día (create_tables)      {al_dia * 1e6:9.1f} µs")
+    print(f"  DDL completo en cada arranque        {anterior * 1e6:9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark de paginación del historial de cierres: clave (keyset) vs. OFFSET.
+
+    python -m benchmarks.bench_paginas [--productos 200] [--dias 3650] [--tamano 100]
+
+Mide cuánto tarda en leerse una página cerca del principio, del medio y del
+final del historial. Con paginación por clave el tiempo debe ser el mismo.
+"""
+import argparse
+
+from core.database import SQL_CIERRES_POR_RANGO, FECHA_MINIMA, FECHA_MAXIMA
+from benchmarks.comun import nueva_base, sembrar_productos, sembrar_cierres, cronometrar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=3650)
+    parser.add_argument("--tamano", type=int, default=100)
+    args = parser.parse_args()
+
+    db = nueva_base()
+    sembrar_productos(db, args.productos)
+    sembrar_cierres(db, args.dias)
+    paginas = db.contar_cierres() // args.tamano
+    rango = (FECHA_MINIMA, FECHA_MAXIMA)
+
+    print(f"{paginas} páginas de {args.tamano} filas")
+    print(f"  {'página':>8} {'clave ms':>9} {'OFFSET ms':>10}")
+    for numero in (1, paginas // 100, paginas // 2, paginas - 1):
+        numero = max(numero, 1)
+        # La clave de inicio sale de la última fila de la página anterior (no se cronometra)
+        cursor = None
+        if numero > 1:
+            fila = db.conn.execute(SQL_CIERRES_POR_RANGO + " LIMIT 1 OFFSET ?",
+                                   (*rango, (numero - 1) * args.tamano - 1)).fetchone()
+            cursor = (fila[0], fila[1])
+
+        t_clave, (pagina, _) = cronometrar(
+            lambda: db.get_pagina_cierres(*rango, cursor, args.tamano), repeticiones=5)
+        t_offset, esperada = cronometrar(
+            lambda: db.conn.execute(SQL_CIERRES_POR_RANGO + " LIMIT ? OFFSET ?",
+                                    (*rango, args.tamano, (numero - 1) * args.tamano)).fetchall(),
+            repeticiones=5)
+        if pagina != esperada:
+            raise SystemExit(f"ERROR: la página {numero} no coincide con OFFSET.")
+        print(f"  {numero:>8} {t_clave * 1000:9.2f} {t_offset * 1000:10.2f}")
+    print("  páginas idénticas a OFFSET: OK")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
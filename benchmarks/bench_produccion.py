@@ -0,0 +1,45 @@
+"""
+Benchmark de carga de producción: N entradas una por una vs. en un solo lote.
+
+    python -m benchmarks.bench_produccion [--entradas 500]
+"""
+import argparse
+import shutil
+
+from core.database import DatabaseManager
+from benchmarks.comun import nueva_base, sembrar_productos, cronometrar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entradas", type=int, default=500)
+    args = parser.parse_args()
+
+    base = nueva_base("semilla.db")
+    sembrar_productos(base, args.entradas)
+    entradas = [(id_prod, 10 + id_prod % 40) for id_prod in range(1, args.entradas + 1)]
+    base.close()
+
+    def por_item(db):
+        for id_prod, cantidad in entradas:
+            db.update_produccion_stock(id_prod, cantidad)
+
+    estados = {}
+    print(f"Producción de {args.entradas} productos")
+    for nombre, cargar in (("por_item", por_item),
+                           ("lote", lambda db: db.update_produccion_stock_lote(entradas))):
+        ruta = base.db_name.replace("semilla.db", f"{nombre}.db")
+        shutil.copyfile(base.db_name, ruta)
+        db = DatabaseManager(ruta)
+        tiempo, _ = cronometrar(lambda: cargar(db))
+        estados[nombre] = db.conn.execute("SELECT * FROM productos ORDER BY id_prod").fetchall()
+        db.close()
+        print(f"  {nombre:<10} {tiempo * 1000:9.1f} ms")
+
+    if estados["por_item"] != estados["lote"]:
+        raise SystemExit("ERROR: los dos caminos dejaron stocks distintos.")
+    print("  resultado idéntico: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Prueba de carga del tablero en vivo: varias cajas escriben y varios tableros leen el mismo archivo.
+
+    python -m benchmarks.bench_tablero [--escritores 2] [--tableros 2] [--segundos 10]
+                                       [--reposo 3] [--intervalo 0.2] [--escrituras 5]
+
+Cada escritor es un proceso con su DatabaseManager que registra pagos y
+producción ('--escrituras' por segundo). Cada tablero es otro proceso que
+repite lo que hace el tablero de la interfaz: core.vigilancia.DetectorCambios
+cada '--intervalo' segundos y, si otra caja cambió algo, vuelve a pedir el
+cuadre de caja o el catálogo. Los tableros arrancan '--reposo' segundos
+antes que los escritores para medir el costo de revisar sin cambios.
+
+Informa la latencia desde cada commit hasta que cada tablero terminó de
+refrescar los datos afectados, el costo de cada revisión y el uso de CPU
+de los tableros en reposo y con carga.
+"""
+import argparse
+import datetime
+import multiprocessing
+import random
+import statistics
+import time
+
+from benchmarks.comun import ruta_temporal
+from benchmarks.generador import generar_base
+
+# Tabla vigilada que toca cada escritura del benchmark
+ESCRITURAS = {"pago": "resumen_pagos_dia", "produccion": "productos"}
+
+
+def escritor(ruta, numero, inicio, fin, por_segundo, salida):
+    from core.database import DatabaseManager
+
+    db = DatabaseManager(ruta, usar_cache_productos=False)
+    rnd = random.Random(numero)
+    trabajadores = [(t["id_trab"], t["nombre"]) for t in db.get_trabajadores()]
+    productos = [p["id_prod"] for p in db.get_productos()]
+    commits, fallos = [], 0
+    time.sleep(max(0.0, inicio - time.time()))
+    while time.time() < fin:
+        tipo = rnd.choice(list(ESCRITURAS))
+        if tipo == "pago":
+            id_trab, nombre = rnd.choice(trabajadores)
+            exito, _ = db.registrar_pago_trabajador(id_trab, nombre, round(rnd.uniform(10, 100), 2), "Salario")
+        else:
+            exito, _ = db.update_produccion_stock(rnd.choice(productos), rnd.randint(1, 20))
+        if exito:
+            commits.append((time.time(), ESCRITURAS[tipo]))
+        else:
+            fallos += 1
+        time.sleep(rnd.expovariate(por_segundo))
+    db.close()
+    salida.put(("escritor", numero, {"commits": commits, "fallos": fallos}))
+
+
+def tablero(ruta, numero, inicio_escrituras, fin, intervalo, salida):
+    from core.database import DatabaseManager
+    from core.vigilancia import DetectorCambios
+
+    db = DatabaseManager(ruta)
+    hoy = datetime.date.today()
+    desde = (hoy - datetime.timedelta(days=6)).isoformat()
+    db.get_cuadre_caja(desde, hoy.isoformat())
+    db.get_productos()
+    detector = DetectorCambios(db)
+    refrescos = []  # (momento en que terminó el refresco, tablas)
+    revisiones = {"reposo": [], "carga": []}
+    cpu = {}
+
+    fase = "reposo"
+    cpu_inicio, pared_inicio = time.process_time(), time.perf_counter()
+    while time.time() < fin:
+        if fase == "reposo" and time.time() >= inicio_escrituras:
+            cpu["reposo"] = (time.process_time() - cpu_inicio, time.perf_counter() - pared_inicio)
+            cpu_inicio, pared_inicio = time.process_time(), time.perf_counter()
+            fase = "carga"
+        t0 = time.perf_counter()
+        tablas = detector.revisar()
+        if "resumen_pagos_dia" in tablas or "resumen_ingresos_dia" in tablas:
+            db.get_cuadre_caja(desde, hoy.isoformat())
+        if "productos" in tablas:
+            db.catalogo.invalidar()
+            db.get_productos()
+        revisiones[fase].append(time.perf_counter() - t0)
+        if tablas:
+            refrescos.append((time.time(), tablas))
+        time.sleep(intervalo)
+    cpu[fase] = (time.process_time() - cpu_inicio, time.perf_counter() - pared_inicio)
+    db.close()
+    salida.put(("tablero", numero, {"refrescos": refrescos, "revisiones": revisiones, "cpu": cpu}))
+
+
+def latencias(commits, refrescos):
+    """Para cada commit, segundos hasta el primer refresco posterior que incluyó su tabla."""
+    resultado = []
+    for momento, tabla in commits:
+        for refresco, tablas in refrescos:
+            if refresco >= momento and tabla in tablas:
+                resultado.append(refresco - momento)
+                break
+    return resultado
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))] if ordenados else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--tableros", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=10, help="Duración de la fase con escrituras")
+    parser.add_argument("--reposo", type=float, default=3, help="Segundos de tableros sin escrituras")
+    parser.add_argument("--intervalo", type=float, default=0.2, help="Segundos entre revisiones del tablero")
+    parser.add_argument("--escrituras", type=float, default=5, help="Escrituras por segundo de cada escritor")
+    parser.add_argument("--productos", type=int, default=500)
+    args = parser.parse_args()
+
+    ruta = ruta_temporal("tablero.db")
+    generar_base(ruta, productos=args.productos, anios=1)
+
+    contexto = multiprocessing.get_context("spawn")
+    salida = contexto.Queue()
+    arranque = time.time() + 2.0  # margen para que arranquen los procesos
+    inicio_escrituras = arranque + args.reposo
+    fin = inicio_escrituras + args.segundos
+    procesos = [contexto.Process(target=tablero, args=(ruta, i, inicio_escrituras, fin, args.intervalo, salida))
+                for i in range(args.tableros)]
+    procesos += [contexto.Process(target=escritor, args=(ruta, i, inicio_escrituras, fin, args.escrituras, salida))
+                 for i in range(args.escritores)]
+    for proceso in procesos:
+        proceso.start()
+    resultados = [salida.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+
+    escritores = [r for tipo, _, r in resultados if tipo == "escritor"]
+    tableros = [r for tipo, _, r in resultados if tipo == "tablero"]
+    commits = [c for e in escritores for c in e["commits"]]
+    fallos = sum(e["fallos"] for e in escritores)
+    print(f"{args.escritores} escritores, {args.tableros} tableros, revisión cada {args.intervalo * 1000:.0f} ms, "
+          f"{args.segundos:g} s de carga")
+    print(f"  escrituras: {len(commits)} confirmadas, {fallos} fallidas")
+
+    todas = [l for t in tableros for l in latencias(commits, t["refrescos"])]
+    esperadas = len(commits) * len(tableros)
+    print(f"  latencia commit -> tablero refrescado ({len(todas)} de {esperadas}): "
+          f"media {statistics.fmean(todas) * 1000 if todas else float('nan'):.1f} ms, "
+          f"p50 {percentil(todas, 50) * 1000:.1f} ms, p95 {percentil(todas, 95) * 1000:.1f} ms, "
+          f"máx {max(todas, default=float('nan')) * 1000:.1f} ms")
+    for fase in ("reposo", "carga"):
+        tiempos = [r for t in tableros for r in t["revisiones"][fase]]
+        cpu = sum(t["cpu"][fase][0] for t in tableros if fase in t["cpu"])
+        pared = sum(t["cpu"][fase][1] for t in tableros if fase in t["cpu"])
+        print(f"  {fase:<7} revisión: mediana {percentil(tiempos, 50) * 1e6:8.1f} µs, "
+              f"p95 {percentil(tiempos, 95) * 1e6:8.1f} µs  CPU por tablero {cpu / pared * 100 if pared else 0:5.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark del arranque de MainWindow: ventana visible y cada pestaña lista.
+
+    python -m benchmarks.bench_ventana [--productos 5000] [--anios 2] [--repeticiones 3]
+                                       [--referencia ventana.json] [--guardar ventana.json]
+
+Abre la ventana (plataforma 'offscreen') sobre una base generada y registra
+con ui.arranque.TrazaArranque el tiempo hasta el primer pintado, el fin de
+la precarga en segundo plano y la apertura de cada pestaña. Como
+referencia mide también la construcción anticipada (todas las pestañas
+cargadas antes de mostrar la ventana). Con --referencia falla (código 1) si
+la ventana tarda en quedar visible más que la medición guardada más el margen.
+Requiere PyQt6.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.comun import ruta_temporal
+from benchmarks.generador import generar_base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--anios", type=float, default=2)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--referencia", help="JSON con una medición anterior para comparar")
+    parser.add_argument("--margen", type=float, default=1.25, help="Tolerancia sobre la referencia (1.25 = +25%%)")
+    parser.add_argument("--guardar", help="Guardar la medición como JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        raise SystemExit("PyQt6 no está instalado.")
+    from ui.arranque import TrazaArranque
+    from ui.main_window import MainWindow
+
+    ruta = ruta_temporal("ventana.db")
+    generar_base(ruta, productos=args.productos, anios=args.anios)
+    app = QApplication(sys.argv)
+
+    def esperar(condicion, limite=30.0):
+        fin = time.perf_counter() + limite
+        while not condicion():
+            if time.perf_counter() > fin:
+                raise SystemExit("Tiempo de espera agotado.")
+            app.processEvents()
+            time.sleep(0.001)
+
+    def abrir(anticipado):
+        traza = TrazaArranque()
+        ventana = MainWindow(precalentar_reportes=False, db_name=ruta, traza=traza)
+        if anticipado:
+            # Como antes: todas las pestañas construidas y cargadas antes de mostrar
+            for indice in range(ventana.tab_widget.count()):
+                ventana._al_cambiar_pestana(indice)
+        ventana.show()
+        esperar(lambda: "precarga" in traza.marcas)
+        for indice in range(1, ventana.tab_widget.count()):
+            ventana.tab_widget.setCurrentIndex(indice)
+            app.processEvents()
+            esperar(lambda: not ventana.servicio._callbacks)
+        ventana.close()
+        ventana.deleteLater()
+        app.processEvents()
+        return traza.como_dict()
+
+    mejores = {}
+    for modo in ("a demanda", "anticipado"):
+        corridas = [abrir(modo == "anticipado") for _ in range(args.repeticiones)]
+        mejor = min(corridas, key=lambda marcas: marcas["ventana_visible"])
+        mejores[modo] = mejor
+        print(f"{modo} ({args.productos} productos, {args.anios:g} años):")
+        for evento, ms in sorted(mejor.items(), key=lambda kv: kv[1]):
+            print(f"  {ms:9.1f} ms  {evento}")
+
+    medicion = mejores["a demanda"]
+    fallos = []
+    if args.referencia:
+        with open(args.referencia, encoding="utf-8") as f:
+            referencia = json.load(f)
+        if medicion["ventana_visible"] > referencia["ventana_visible"] * args.margen:
+            fallos.append(f"ventana visible en {medicion['ventana_visible']:.1f} ms, referencia "
+                          f"{referencia['ventana_visible']:.1f} ms (+{(args.margen - 1) * 100:.0f}%)")
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(medicion, f, ensure_ascii=False, indent=2)
+
+    for fallo in fallos:
+        print(f"REGRESIÓN: {fallo}")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
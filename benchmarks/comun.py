@@ -0,0 +1,79 @@
+"""
+Utilidades compartidas por los benchmarks.
+Se ejecutan desde la raíz del repositorio, por ejemplo:
+    python -m benchmarks.bench_cierre
+"""
+import os
+import random
+import tempfile
+import time
+
+from core.database import DatabaseManager
+
+
+def ruta_temporal(nombre="bench.db"):
+    """Devuelve una ruta dentro de un directorio temporal nuevo."""
+    return os.path.join(tempfile.mkdtemp(prefix="panaderia_bench_"), nombre)
+
+
+def sembrar_productos(db, cantidad, semilla=1234):
+    """Inserta 'cantidad' productos con stock y producción aleatorios (deterministas)."""
+    rnd = random.Random(semilla)
+    filas = []
+    for i in range(cantidad):
+        produccion = rnd.randint(0, 200)
+        filas.append((
+            f"Producto {i:06d}",
+            round(rnd.uniform(1, 100), 2),
+            rnd.randint(0, 300) + produccion,
+            produccion,
+            1 if rnd.random() < 0.1 else 0,
+        ))
+    db.conn.executemany("""
+    INSERT INTO productos (nombre, precio, stock, produccion_dia, es_gaseosa)
+    VALUES (?, ?, ?, ?, ?)
+    """, filas)
+    db.conn.commit()
+
+
+def conteo_aleatorio(db, semilla=99):
+    """Genera un conteo final {id_prod: cantidad} para todos los productos."""
+    rnd = random.Random(semilla)
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT id_prod, stock FROM productos ORDER BY id_prod")
+    return {id_prod: rnd.randint(0, stock + 5) for id_prod, stock in cursor.fetchall()}
+
+
+def cronometrar(funcion, repeticiones=1):
+    """Ejecuta 'funcion' y devuelve (mejor_tiempo_en_segundos, ultimo_resultado)."""
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        if mejor is None or duracion < mejor:
+            mejor = duracion
+    return mejor, resultado
+
+
+def nueva_base(nombre="bench.db", **kwargs):
+    """Crea un DatabaseManager sobre una base de datos temporal vacía."""
+    return DatabaseManager(ruta_temporal(nombre), **kwargs)
+
+
+def sembrar_cierres(db, dias, fecha_inicial="2020-01-01"):
+    """
+    Llena cierre_diario con una fila por producto y día durante 'dias' días
+    (en SQL puro, para poder generar millones de filas rápido).
+    """
+    db.conn.execute("""
+    WITH RECURSIVE dias(d) AS (SELECT 0 UNION ALL SELECT d + 1 FROM dias WHERE d < ? - 1)
+    INSERT INTO cierre_diario (fecha, id_producto, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados)
+    SELECT date(?, '+' || d || ' days'), p.id_prod, p.nombre,
+           (p.id_prod * 7 + d) % 50, (p.id_prod + d * 3) % 120, (p.id_prod + d) % 20,
+           ((p.id_prod * 7 + d) % 50) + ((p.id_prod + d * 3) % 120) - ((p.id_prod + d) % 20),
+           (((p.id_prod * 7 + d) % 50) + ((p.id_prod + d * 3) % 120) - ((p.id_prod + d) % 20)) * p.precio
+    FROM dias, productos p
+    """, (dias, fecha_inicial))
+    db.conn.commit()
@@ -0,0 +1,158 @@
+"""
+Generador determinista de bases de datos de panadería de tamaño configurable.
+
+    python -m benchmarks.generador ruta.db [--productos 200] [--trabajadores 15]
+                                           [--proveedores 10] [--anios 3]
+                                           [--pagos-por-dia 4] [--semilla 2024]
+                                           [--fecha-final 2025-12-31]
+
+La base se crea con el esquema real (DatabaseManager.create_tables y sus
+migraciones). La misma semilla y la misma fecha final producen siempre el
+mismo contenido por fecha local; los pagos se guardan en UTC, como los
+registra la aplicación (CURRENT_TIMESTAMP).
+"""
+import argparse
+import datetime
+import os
+import random
+
+from core.database import DatabaseManager
+
+FECHA_FINAL = "2025-12-31"
+
+TIPOS_PRODUCTO = ["Pan", "Factura", "Torta", "Galleta", "Budín", "Medialuna", "Gaseosa"]
+CARGOS = ["Panadero", "Ayudante", "Cajero", "Repartidor", "Encargado"]
+TIPOS_PAGO_TRABAJADOR = ["Salario", "Salario", "Salario", "Bono/Horas Extra", "Aguinaldo"]
+
+
+def generar_base(ruta, productos=200, trabajadores=15, proveedores=10, anios=3,
+                 pagos_por_dia=4, semilla=2024, fecha_final=FECHA_FINAL):
+    """
+    Crea en 'ruta' (que no debe existir) una base con el catálogo, el personal,
+    los proveedores y 'anios' años de cierres diarios y pagos hasta
+    'fecha_final'. Devuelve un resumen {tabla: filas}.
+    """
+    if os.path.exists(ruta):
+        raise FileExistsError(f"La base '{ruta}' ya existe.")
+    rnd = random.Random(semilla)
+    db = DatabaseManager(ruta, usar_cache_productos=False)
+    try:
+        catalogo = _insertar_catalogo(db, rnd, productos)
+        entidades = _insertar_entidades(db, rnd, trabajadores, proveedores)
+
+        final = datetime.date.fromisoformat(fecha_final)
+        dias = [final - datetime.timedelta(days=d) for d in range(int(anios * 365) - 1, -1, -1)]
+        _insertar_cierres(db, rnd, catalogo, dias)
+        _insertar_pagos(db, rnd, entidades, dias, pagos_por_dia)
+        db.conn.commit()
+
+        ok, mensaje = db.reconstruir_resumenes()
+        if not ok:
+            raise RuntimeError(mensaje)
+        db.conn.execute("ANALYZE")
+        db.conn.commit()
+        return {tabla: db.conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+                for tabla in ("productos", "trabajadores", "proveedores", "cierre_diario", "pagos")}
+    finally:
+        db.close()
+
+
+def _insertar_catalogo(db, rnd, cantidad):
+    """Inserta los productos; devuelve [(id_prod, nombre, precio, es_gaseosa)]."""
+    filas = []
+    for i in range(cantidad):
+        tipo = TIPOS_PRODUCTO[i % len(TIPOS_PRODUCTO)]
+        filas.append((f"{tipo} {i + 1:05d}", round(rnd.uniform(0.5, 40), 2), 1 if tipo == "Gaseosa" else 0,
+                      1 if rnd.random() < 0.05 else 0))
+    db.conn.executemany("""
+    INSERT INTO productos (nombre, precio, es_gaseosa, oculto) VALUES (?, ?, ?, ?)
+    """, filas)
+    return db.conn.execute("SELECT id_prod, nombre, precio, es_gaseosa FROM productos ORDER BY id_prod").fetchall()
+
+
+def _insertar_entidades(db, rnd, trabajadores, proveedores):
+    """Inserta personal y proveedores; devuelve [(tipo, id, nombre, monto_habitual)]."""
+    db.conn.executemany("""
+    INSERT INTO trabajadores (nombre, contacto, cargo, salario_semanal, tipo_pago, activo)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, [(f"Trabajador {i + 1:04d}", f"555-{rnd.randint(1000, 9999)}", rnd.choice(CARGOS),
+           round(rnd.uniform(150, 600), 2), rnd.choice(["Semanal", "Diario"]),
+           0 if rnd.random() < 0.1 else 1) for i in range(trabajadores)])
+    db.conn.executemany("""
+    INSERT INTO proveedores (nombre, contacto, producto_suministrado, activo) VALUES (?, ?, ?, ?)
+    """, [(f"Proveedor {i + 1:04d}", f"proveedor{i + 1}@correo.com", rnd.choice(["Harina", "Azúcar", "Levadura", "Gaseosas"]),
+           0 if rnd.random() < 0.1 else 1) for i in range(proveedores)])
+
+    entidades = [("Trabajador", i, n, s) for i, n, s in
+                 db.conn.execute("SELECT id_trab, nombre, salario_semanal FROM trabajadores ORDER BY id_trab")]
+    entidades += [("Proveedor", i, n, rnd.uniform(50, 800)) for i, n in
+                  db.conn.execute("SELECT id_prov, nombre FROM proveedores ORDER BY id_prov")]
+    return entidades
+
+
+def _insertar_cierres(db, rnd, catalogo, dias):
+    """Un cierre por producto y día, encadenando el stock de un día al siguiente."""
+    stock = {id_prod: rnd.randint(0, 30) for id_prod, *_ in catalogo}
+
+    def filas():
+        for dia in dias:
+            fecha = dia.isoformat()
+            for id_prod, nombre, precio, es_gaseosa in catalogo:
+                inicial = stock[id_prod]
+                produccion = 0 if es_gaseosa else rnd.randint(0, 120)
+                disponible = inicial + produccion + (rnd.randint(0, 24) if es_gaseosa and inicial < 10 else 0)
+                final = rnd.randint(0, max(disponible // 3, 0))
+                ventas = disponible - final
+                stock[id_prod] = final
+                yield (fecha, id_prod, nombre, inicial, produccion, final, ventas, round(ventas * precio, 2))
+
+    db.conn.executemany("""
+    INSERT INTO cierre_diario (fecha, id_producto, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, filas())
+    db.conn.executemany("UPDATE productos SET stock = ? WHERE id_prod = ?",
+                        [(cantidad, id_prod) for id_prod, cantidad in stock.items()])
+
+
+def _insertar_pagos(db, rnd, entidades, dias, pagos_por_dia):
+    if not entidades:
+        return
+
+    def filas():
+        for dia in dias:
+            for _ in range(rnd.randint(0, pagos_por_dia * 2)):
+                tipo, id_entidad, nombre, habitual = rnd.choice(entidades)
+                tipo_pago = rnd.choice(TIPOS_PAGO_TRABAJADOR) if tipo == "Trabajador" else "Factura"
+                # Hora local del pago, guardada en UTC como CURRENT_TIMESTAMP
+                momento = datetime.datetime.combine(dia, datetime.time(
+                    rnd.randint(6, 21), rnd.randint(0, 59), rnd.randint(0, 59))).astimezone(datetime.timezone.utc)
+                yield (tipo, id_entidad, nombre, round(habitual * rnd.uniform(0.5, 1.5), 2),
+                       tipo_pago, momento.strftime("%Y-%m-%d %H:%M:%S"))
+
+    db.conn.executemany("""
+    INSERT INTO pagos (tipo, id_entidad, nombre_entidad, monto, tipo_pago_realizado, fecha)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, filas())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("ruta")
+    parser.add_argument("--productos", type=int, default=200)
+    parser.add_argument("--trabajadores", type=int, default=15)
+    parser.add_argument("--proveedores", type=int, default=10)
+    parser.add_argument("--anios", type=float, default=3)
+    parser.add_argument("--pagos-por-dia", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=2024)
+    parser.add_argument("--fecha-final", default=FECHA_FINAL)
+    args = parser.parse_args()
+
+    filas = generar_base(args.ruta, args.productos, args.trabajadores, args.proveedores,
+                         args.anios, args.pagos_por_dia, args.semilla, args.fecha_final)
+    print(f"Base generada en {args.ruta}")
+    for tabla, cantidad in filas.items():
+        print(f"  {tabla:<14} {cantidad:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Suite de benchmarks de DatabaseManager sobre una base generada (benchmarks.generador).
+
+    python -m benchmarks.suite [--productos 200] [--anios 3] [--pagos-por-dia 4]
+                               [--repeticiones 5] [--guardar resultados.json]
+                               [--referencia anterior.json] [--margen 1.25]
+
+Cubre todos los métodos públicos de DatabaseManager y los caminos de
+cierre, exportación y gráfico. Con '--guardar' escribe los tiempos en JSON;
+con '--referencia' compara contra otra corrida y termina con código 1 si
+algún caso empeoró más que el margen.
+"""
+import argparse
+import datetime
+import importlib.util
+import inspect
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import time
+
+from core.database import DatabaseManager
+from core.exportar import exportar_cierres
+from core.importar import importar_csv
+from benchmarks.comun import ruta_temporal
+from benchmarks.generador import generar_base
+
+
+def casos(db, ruta, dir_salida):
+    """
+    Lista de (nombre, métodos de DatabaseManager que cubre, función).
+    Las lecturas van primero; las escrituras se acumulan sobre la misma base.
+    """
+    hoy = datetime.date.today()
+    hace_30 = (hoy - datetime.timedelta(days=30)).isoformat()
+    hace_730 = (hoy - datetime.timedelta(days=730)).isoformat()
+    ids_prod = [p["id_prod"] for p in db.get_productos(ver_ocultos=True)]
+    id_trab = db.get_trabajadores(ver_inactivos=True)[0]["id_trab"]
+    id_prov = db.get_proveedores(ver_inactivos=True)[0]["id_prov"]
+    contador = itertools.count(1)
+    dias_cierre = itertools.count(1)
+    rnd = random.Random(7)
+
+    def consumir(lotes):
+        for _ in lotes:
+            pass
+
+    def abrir_y_cerrar():
+        DatabaseManager(ruta).close()
+
+    def get_productos_sin_cache():
+        base = DatabaseManager(ruta, usar_cache_productos=False)
+        base.get_productos()
+        base.close()
+
+    def con_instrumentacion():
+        db.activar_instrumentacion()
+        db.get_productos()
+        db.contar_cierres()
+        db.desactivar_instrumentacion()
+
+    # CSV de 1000 filas por tipo; al repetirse, cada importación actualiza las mismas filas
+    archivos_csv = {}
+    for tipo, cabecera, fila in (
+        ("productos", "nombre,precio,stock", lambda i: f"Importado {i:04d},{i % 40 + 0.5},{i % 30}"),
+        ("trabajadores", "id_trab,nombre,cargo,salario_semanal", lambda i: f"{i + 1000},Importado {i},Ayudante,250"),
+        ("proveedores", "id_prov,nombre,producto_suministrado", lambda i: f"{i + 1000},Importado {i},Harina"),
+    ):
+        archivos_csv[tipo] = os.path.join(dir_salida, f"importar_{tipo}.csv")
+        with open(archivos_csv[tipo], "w", encoding="utf-8") as f:
+            f.write(cabecera + "\n" + "\n".join(fila(i) for i in range(1000)) + "\n")
+
+    def cierre():
+        fecha = (hoy + datetime.timedelta(days=next(dias_cierre))).isoformat()
+        conteo = {id_prod: rnd.randint(0, 40) for id_prod in ids_prod}
+        return db.realizar_cierre_diario(fecha, conteo)
+
+    def rafaga_agrupada():
+        # Diez escrituras chicas con un solo commit
+        with db.agrupar():
+            for i in range(5):
+                db.registrar_pago_trabajador(id_trab, "Bench", 50.0 + i, "Salario")
+                db.update_produccion_stock(ids_prod[i % len(ids_prod)], 2)
+
+    def corregir_ultimo_cierre():
+        # Cambia unos pocos conteos del último cierre: corrección incremental
+        registro = db.get_diario_cierres(db.get_ultimo_resumen_ingresos()[0])[-1]
+        conteo = dict(registro["conteo"])
+        for id_prod in rnd.sample(sorted(conteo), min(10, len(conteo))):
+            conteo[id_prod] += 1
+        return db.realizar_cierre_diario(registro["fecha"], conteo)
+
+    def grafico():
+        if importlib.util.find_spec("PyQt6") is not None:
+            from ui.grafico import CacheGraficoIngresos
+            CacheGraficoIngresos().actualizar(db, 730)
+        else:
+            # Mismas consultas que CacheGraficoIngresos en una carga completa
+            db.get_ultimo_resumen_ingresos()
+            db.get_ingresos_por_dia(hace_730)
+
+    lista = [
+        ("abrir_y_cerrar", ["create_tables", "close"], abrir_y_cerrar),
+        ("verificar_planes_consulta", ["verificar_planes_consulta"], db.verificar_planes_consulta),
+        ("get_productos", ["get_productos"], lambda: db.get_productos(ver_ocultos=True)),
+        ("get_productos_sin_cache", [], get_productos_sin_cache),
+        ("iter_productos", ["iter_productos"], lambda: consumir(db.iter_productos(True))),
+        ("get_trabajadores", ["get_trabajadores"], lambda: db.get_trabajadores(True)),
+        ("iter_trabajadores", ["iter_trabajadores"], lambda: consumir(db.iter_trabajadores(True))),
+        ("get_proveedores", ["get_proveedores"], lambda: db.get_proveedores(True)),
+        ("iter_proveedores", ["iter_proveedores"], lambda: consumir(db.iter_proveedores(True))),
+        ("get_cierres_por_rango_30d", ["get_cierres_por_rango"], lambda: db.get_cierres_por_rango(hace_30, hoy.isoformat())),
+        ("get_pagina_cierres", ["get_pagina_cierres"], lambda: db.get_pagina_cierres(hace_730, hoy.isoformat())),
+        ("iter_cierres_por_rango_30d", ["iter_cierres_por_rango"],
+         lambda: consumir(db.iter_cierres_por_rango(hace_30, hoy.isoformat()))),
+        ("get_ingresos_calculados_semana", ["get_ingresos_calculados_semana"], db.get_ingresos_calculados_semana),
+        ("get_pagos_semana", ["get_pagos_semana"], db.get_pagos_semana),
+        ("get_cuadre_caja_dia_30d", ["get_cuadre_caja"], lambda: db.get_cuadre_caja(hace_30, hoy, "dia")),
+        ("get_cuadre_caja_semana_730d", [], lambda: db.get_cuadre_caja(hace_730, hoy, "semana")),
+        ("get_cuadre_caja_mes_730d", [], lambda: db.get_cuadre_caja(hace_730, hoy, "mes")),
+        ("contar_cierres", ["contar_cierres"], db.contar_cierres),
+        ("get_datos_reporte_ventas", ["get_datos_reporte_ventas"], db.get_datos_reporte_ventas),
+        ("iter_datos_reporte_ventas", ["iter_datos_reporte_ventas"], lambda: consumir(db.iter_datos_reporte_ventas())),
+        ("get_ultimo_resumen_ingresos", ["get_ultimo_resumen_ingresos"], db.get_ultimo_resumen_ingresos),
+        ("get_primer_dia_cerrado_desde", ["get_primer_dia_cerrado_desde"], db.get_primer_dia_cerrado_desde),
+        ("get_ingresos_por_dia_730d", ["get_ingresos_por_dia"], lambda: db.get_ingresos_por_dia(hace_730)),
+        ("get_datos_grafico_ventas", ["get_datos_grafico_ventas"], db.get_datos_grafico_ventas),
+        ("grafico_730d", [], grafico),
+        ("verificar_resumenes", ["verificar_resumenes"], db.verificar_resumenes),
+        ("get_estadisticas", ["get_estadisticas"], db.get_estadisticas),
+        ("version_datos", ["version_datos"], db.version_datos),
+        ("get_cambios_tablas", ["get_cambios_tablas"], db.get_cambios_tablas),
+        ("instrumentacion_ida_y_vuelta", ["activar_instrumentacion", "desactivar_instrumentacion"], con_instrumentacion),
+        ("exportar_csv", [], lambda: exportar_cierres(db, os.path.join(dir_salida, "cierres.csv"))),
+        # --- Escrituras ---
+        ("add_producto", ["add_producto"], lambda: db.add_producto(f"Bench {next(contador)}", 10.0, 5, False)),
+        ("toggle_producto_oculto", ["toggle_producto_oculto"], lambda: db.toggle_producto_oculto(ids_prod[0])),
+        ("update_produccion_stock", ["update_produccion_stock"], lambda: db.update_produccion_stock(ids_prod[0], 5)),
+        ("update_produccion_stock_lote", ["update_produccion_stock_lote"],
+         lambda: db.update_produccion_stock_lote([(i, 3) for i in ids_prod])),
+        ("add_trabajador", ["add_trabajador"], lambda: db.add_trabajador("Bench", "", "Ayudante", 100.0, "Semanal")),
+        ("toggle_trabajador_activo", ["toggle_trabajador_activo"], lambda: db.toggle_trabajador_activo(id_trab)),
+        ("registrar_pago_trabajador", ["registrar_pago_trabajador"],
+         lambda: db.registrar_pago_trabajador(id_trab, "Bench", 50.0, "Salario")),
+        ("add_proveedor", ["add_proveedor"], lambda: db.add_proveedor("Bench", "", "Harina")),
+        ("toggle_proveedor_activo", ["toggle_proveedor_activo"], lambda: db.toggle_proveedor_activo(id_prov)),
+        ("registrar_pago_proveedor", ["registrar_pago_proveedor"], lambda: db.registrar_pago_proveedor(id_prov, "Bench", 80.0)),
+        ("agrupar_10_escrituras", ["agrupar"], rafaga_agrupada),
+        ("importar_csv_productos_1000", ["importar_productos"],
+         lambda: importar_csv(db, "productos", archivos_csv["productos"])),
+        ("importar_csv_trabajadores_1000", ["importar_trabajadores"],
+         lambda: importar_csv(db, "trabajadores", archivos_csv["trabajadores"])),
+        ("importar_csv_proveedores_1000", ["importar_proveedores"],
+         lambda: importar_csv(db, "proveedores", archivos_csv["proveedores"])),
+        ("realizar_cierre_diario", ["realizar_cierre_diario"], cierre),
+        ("get_diario_cierres", ["get_diario_cierres"], db.get_diario_cierres),
+        ("reaplicar_cierre_sin_cambios", ["reaplicar_cierre"],
+         lambda: db.reaplicar_cierre(db.get_ultimo_resumen_ingresos()[0])),
+        ("corregir_ultimo_cierre", [], corregir_ultimo_cierre),
+        ("reconstruir_resumenes", ["reconstruir_resumenes"], db.reconstruir_resumenes),
+    ]
+    if importlib.util.find_spec("openpyxl") is not None:
+        lista.insert(lista.index(next(c for c in lista if c[0] == "exportar_csv")) + 1,
+                     ("exportar_xlsx", [], lambda: exportar_cierres(db, os.path.join(dir_salida, "cierres.xlsx"))))
+    return lista
+
+
+def metodos_publicos():
+    return {nombre for nombre, _ in inspect.getmembers(DatabaseManager, inspect.isfunction)
+            if not nombre.startswith("_")}
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {"mejor_ms": min(tiempos) * 1000, "mediana_ms": statistics.median(tiempos) * 1000}
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=200)
+    parser.add_argument("--anios", type=float, default=3)
+    parser.add_argument("--pagos-por-dia", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=2024)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--guardar", help="Guardar los resultados como JSON")
+    parser.add_argument("--referencia", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--margen", type=float, default=1.25, help="Tolerancia sobre la referencia (1.25 = +25%%)")
+    args = parser.parse_args()
+
+    ruta = ruta_temporal("suite.db")
+    # La historia termina hoy para que los reportes de la última semana tengan datos
+    filas = generar_base(ruta, args.productos, anios=args.anios, pagos_por_dia=args.pagos_por_dia,
+                         semilla=args.semilla, fecha_final=datetime.date.today().isoformat())
+    print("Base: " + ", ".join(f"{tabla}={cantidad}" for tabla, cantidad in filas.items()))
+
+    db = DatabaseManager(ruta)
+    lista = casos(db, ruta, os.path.dirname(ruta))
+    cubiertos = {metodo for _, metodos, _ in lista for metodo in metodos}
+    faltantes = sorted(metodos_publicos() - cubiertos)
+    if faltantes:
+        print(f"AVISO: métodos públicos sin caso: {', '.join(faltantes)}")
+
+    resultados = {}
+    print(f"  {'caso':<32} {'mejor ms':>10} {'mediana ms':>11}")
+    for nombre, _, funcion in lista:
+        resultados[nombre] = medir(funcion, args.repeticiones)
+        print(f"  {nombre:<32} {resultados[nombre]['mejor_ms']:10.3f} {resultados[nombre]['mediana_ms']:11.3f}")
+    db.close()
+
+    fallos = []
+    if args.referencia:
+        with open(args.referencia, encoding="utf-8") as f:
+            referencia = json.load(f)
+        for nombre, medida in resultados.items():
+            anterior = referencia["resultados"].get(nombre)
+            # Por debajo de 0.05 ms el ruido del reloj domina la comparación
+            if anterior and medida["mejor_ms"] > max(anterior["mejor_ms"], 0.05) * args.margen:
+                fallos.append(f"{nombre}: {medida['mejor_ms']:.3f} ms vs {anterior['mejor_ms']:.3f} ms")
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": commit_actual(),
+                "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "parametros": vars(args) | {"filas": filas},
+                "resultados": resultados,
+            }, f, indent=2, ensure_ascii=False)
+
+    for fallo in fallos:
+        print(f"REGRESIÓN: {fallo}")
+    raise SystemExit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Verifica con EXPLAIN QUERY PLAN que cada consulta de reportes use un índice.
+
+    python -m benchmarks.verificar_planes [--base ruta.db]
+
+Sin '--base' se usa una base temporal sembrada. Termina con código 1 si
+alguna consulta recorre una tabla completa.
+"""
+import argparse
+import sys
+
+from core.database import DatabaseManager
+from benchmarks.comun import nueva_base, sembrar_productos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", help="Base de datos a verificar (no se modifica su contenido)")
+    args = parser.parse_args()
+
+    if args.base:
+        db = DatabaseManager(args.base)
+    else:
+        db = nueva_base("planes.db")
+        sembrar_productos(db, 200)
+        db.conn.execute("ANALYZE")
+
+    fallos = 0
+    for nombre, (usa_indice, detalles) in db.verificar_planes_consulta().items():
+        print(f"{'OK   ' if usa_indice else 'FALLO'} {nombre}")
+        for detalle in detalles:
+            print(f"        {detalle}")
+        fallos += 0 if usa_indice else 1
+    db.close()
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
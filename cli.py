@@ -0,0 +1,170 @@
+"""
+Línea de comandos de la panadería: cierres, reportes y estadísticas sin interfaz gráfica.
+
+    python cli.py [--db panaderia.db] [--perfil seguro] COMANDO ...
+
+    cierre CONTEO.csv [--fecha AAAA-MM-DD] [--sin-completar]
+    exportar ARCHIVO.csv|ARCHIVO.xlsx [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD]
+    cuadre [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD] [--periodo dia|semana|mes] [--json]
+    importar productos|trabajadores|proveedores ARCHIVO.csv
+    estadisticas [--json]
+
+Pensado para cron: nunca importa PyQt6, y openpyxl solo se carga al
+exportar a .xlsx. Termina con código 0 si todo salió bien, 1 si el comando
+falló o hubo filas con errores y 2 si los argumentos no son válidos.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from core.database import DatabaseManager, PERIODOS_CUADRE
+
+
+def _fecha(texto):
+    try:
+        return datetime.date.fromisoformat(texto).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida: '{texto}' (se espera AAAA-MM-DD)") from None
+
+
+def _informar_errores(errores, maximo=50):
+    for linea, mensaje in errores[:maximo]:
+        print(f"  línea {linea}: {mensaje}", file=sys.stderr)
+    if len(errores) > maximo:
+        print(f"  ... y {len(errores) - maximo} errores más", file=sys.stderr)
+
+
+# --- Comandos ---
+# Cada uno recibe (db, args) y devuelve el código de salida.
+
+def comando_cierre(db, args):
+    from core.importar import importar_conteo_csv
+
+    exito, mensaje, errores = importar_conteo_csv(db, args.conteo, args.fecha, not args.sin_completar)
+    print(mensaje, file=sys.stdout if exito else sys.stderr)
+    _informar_errores(errores)
+    return 0 if exito else 1
+
+
+def comando_exportar(db, args):
+    from core.exportar import exportar_cierres
+
+    filas = exportar_cierres(db, args.archivo, args.desde, args.hasta)
+    print(f"{filas} filas exportadas a {args.archivo}")
+    return 0
+
+
+def comando_cuadre(db, args):
+    baldes = db.get_cuadre_caja(args.desde, args.hasta, args.periodo)
+    if args.json:
+        for balde in baldes:
+            for clave in ("ingresos", "pagos", "balance"):
+                balde[clave] = round(balde[clave], 2)
+            balde["pagos_por_tipo"] = [{"tipo": tipo, "tipo_pago": tipo_pago, "total": round(total, 2)}
+                                       for (tipo, tipo_pago), total in balde["pagos_por_tipo"].items()]
+        json.dump(baldes, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"{'Período':<12} {'Ingresos':>14} {'Pagos':>14} {'Balance':>14}")
+    for balde in baldes:
+        print(f"{balde['periodo']:<12} {balde['ingresos']:14.2f} {balde['pagos']:14.2f} {balde['balance']:14.2f}")
+    ingresos = sum(balde["ingresos"] for balde in baldes)
+    pagos = sum(balde["pagos"] for balde in baldes)
+    print(f"{'TOTAL':<12} {ingresos:14.2f} {pagos:14.2f} {ingresos - pagos:14.2f}")
+    return 0
+
+
+def comando_importar(db, args):
+    from core.importar import importar_csv
+
+    resultado = importar_csv(db, args.tipo, args.archivo)
+    print(f"{resultado['aplicadas']} de {resultado['leidas']} filas importadas en {args.tipo}")
+    _informar_errores(resultado["errores"])
+    return 1 if resultado["errores"] else 0
+
+
+def comando_estadisticas(db, args):
+    estadisticas = db.get_estadisticas()
+    if args.json:
+        json.dump(estadisticas, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    e = estadisticas
+    print(f"Base:          {db.db_name} ({e['tamano_bytes'] / 1e6:.1f} MB, esquema v{e['version_esquema']})")
+    print(f"Productos:     {e['productos']} ({e['productos_visibles']} visibles)")
+    print(f"Trabajadores:  {e['trabajadores']} ({e['trabajadores_visibles']} activos)")
+    print(f"Proveedores:   {e['proveedores']} ({e['proveedores_visibles']} activos)")
+    if e["dias_cerrados"]:
+        print(f"Cierres:       {e['dias_cerrados']} días ({e['primer_cierre']} a {e['ultimo_cierre']}), "
+              f"{e['filas_cierre']} filas")
+    else:
+        print("Cierres:       ninguno")
+    print(f"Ingresos:      {e['ingresos_total']:.2f}")
+    print(f"Pagos:         {e['pagos']} por {e['pagos_total']:.2f}")
+    return 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default="panaderia.db", help="Archivo de la base (por defecto panaderia.db)")
+    parser.add_argument("--perfil", help="Perfil de conexión (ver core.conexion.PERFILES)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    cierre = comandos.add_parser("cierre", help="Cierre del día desde un CSV de conteo")
+    cierre.add_argument("conteo", help="CSV con columnas 'cantidad' e 'id_prod' o 'nombre'")
+    cierre.add_argument("--fecha", type=_fecha, default=datetime.date.today().isoformat())
+    cierre.add_argument("--sin-completar", action="store_true",
+                        help="Contar como 0 los productos que no están en el archivo (por defecto conservan su stock)")
+    cierre.set_defaults(funcion=comando_cierre)
+
+    exportar = comandos.add_parser("exportar", help="Exportar el reporte de cierres (.csv o .xlsx)")
+    exportar.add_argument("archivo")
+    exportar.add_argument("--desde", type=_fecha)
+    exportar.add_argument("--hasta", type=_fecha)
+    exportar.set_defaults(funcion=comando_exportar)
+
+    hoy = datetime.date.today()
+    cuadre = comandos.add_parser("cuadre", help="Cuadre de caja por período")
+    cuadre.add_argument("--desde", type=_fecha, default=(hoy - datetime.timedelta(days=6)).isoformat())
+    cuadre.add_argument("--hasta", type=_fecha, default=hoy.isoformat())
+    cuadre.add_argument("--periodo", choices=list(PERIODOS_CUADRE), default="dia")
+    cuadre.add_argument("--json", action="store_true")
+    cuadre.set_defaults(funcion=comando_cuadre)
+
+    importar = comandos.add_parser("importar", help="Importar productos, personal o proveedores desde CSV")
+    importar.add_argument("tipo", choices=["productos", "trabajadores", "proveedores"])
+    importar.add_argument("archivo")
+    importar.set_defaults(funcion=comando_importar)
+
+    estadisticas = comandos.add_parser("estadisticas", help="Resumen del contenido de la base")
+    estadisticas.add_argument("--json", action="store_true")
+    estadisticas.set_defaults(funcion=comando_estadisticas)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if not os.path.exists(args.db):
+        # DatabaseManager crearía una base vacía: en un cron eso oculta un error de ruta
+        print(f"No existe la base '{args.db}'.", file=sys.stderr)
+        return 1
+    try:
+        db = DatabaseManager(args.db, perfil=args.perfil)
+    except Exception as e:
+        print(f"No se pudo abrir la base '{args.db}': {e}", file=sys.stderr)
+        return 1
+    try:
+        return args.funcion(db, args)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
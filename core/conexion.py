@@ -0,0 +1,151 @@
+import queue
+import sqlite3
+import threading
+
+# --- Perfiles de conexión ---
+# Cada perfil define los PRAGMA que se aplican al abrir una conexión, cuántas
+# conexiones de solo lectura se reservan para consultas (0 = se usa la principal)
+# y cómo esperan las escrituras cuando otro proceso (otra caja) tiene la base:
+#   busy_timeout         ms que SQLite reintenta un bloqueo antes de "database is locked";
+#                        es el piso de toda escritura (migraciones, transacciones implícitas)
+#   escritura_inmediata  cada escritura empieza con BEGIN IMMEDIATE (toma el bloqueo
+#                        de escritura antes de leer nada, sin fallos por instantánea vieja)
+#   reintentos_escritura intentos cortos de BEGIN IMMEDIATE antes del que espera busy_timeout
+#   espera_bloqueo_ms    cuánto espera el bloqueo cada intento corto
+#   espera_reintento_ms  base de la espera aleatoria entre intentos (se duplica en cada uno)
+PERFILES = {
+    # Comportamiento original: journal en modo DELETE, synchronous FULL, sin pool.
+    "compatible": {
+        "journal_mode": None,
+        "synchronous": None,
+        "cache_size": None,
+        "mmap_size": None,
+        "temp_store": None,
+        "cached_statements": 128,
+        "conexiones_lectura": 0,
+        "busy_timeout": 5000,  # el valor por defecto de sqlite3.connect
+        "escritura_inmediata": False,
+        "reintentos_escritura": 0,
+        "espera_bloqueo_ms": 5000,
+        "espera_reintento_ms": 0,
+    },
+    # Perfil por defecto de la aplicación: WAL + synchronous NORMAL, preparado
+    # para varias cajas escribiendo sobre el mismo archivo.
+    "rendimiento": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,           # ~16 MB de caché de páginas
+        "mmap_size": 64 * 1024 * 1024,  # 64 MB mapeados en memoria
+        "temp_store": "MEMORY",
+        "cached_statements": 256,
+        "conexiones_lectura": 2,
+        "busy_timeout": 5000,
+        "escritura_inmediata": True,
+        "reintentos_escritura": 8,
+        "espera_bloqueo_ms": 100,
+        "espera_reintento_ms": 10,
+    },
+    # WAL pero con fsync en cada commit (cajas sin UPS, discos poco fiables).
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "cached_statements": 256,
+        "conexiones_lectura": 2,
+        "busy_timeout": 5000,
+        "escritura_inmediata": True,
+        "reintentos_escritura": 8,
+        "espera_bloqueo_ms": 100,
+        "espera_reintento_ms": 10,
+    },
+}
+
+PERFIL_POR_DEFECTO = "rendimiento"
+
+
+def resolver_perfil(perfil=None):
+    """
+    Devuelve un diccionario de perfil completo.
+    'perfil' puede ser el nombre de un perfil de PERFILES o un diccionario
+    con claves a sobrescribir sobre el perfil por defecto.
+    """
+    if perfil is None:
+        perfil = PERFIL_POR_DEFECTO
+    if isinstance(perfil, str):
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de conexión desconocido: {perfil}")
+        return dict(PERFILES[perfil])
+    resuelto = dict(PERFILES[perfil.get("base", PERFIL_POR_DEFECTO)])
+    resuelto.update({k: v for k, v in perfil.items() if k != "base"})
+    return resuelto
+
+
+def es_memoria(db_name):
+    """Las bases en memoria no se pueden compartir entre varias conexiones."""
+    return db_name == ":memory:" or str(db_name).startswith("file::memory:")
+
+
+def abrir_conexion(db_name, perfil, solo_lectura=False):
+    """Abre una conexión y le aplica los PRAGMA del perfil."""
+    conn = sqlite3.connect(
+        db_name,
+        timeout=perfil["busy_timeout"] / 1000,
+        cached_statements=perfil["cached_statements"],
+        check_same_thread=False,
+    )
+    if solo_lectura:
+        # Las lecturas no necesitan transacciones implícitas
+        conn.isolation_level = None
+    else:
+        if perfil["escritura_inmediata"]:
+            # También las transacciones que abre sqlite3 por su cuenta toman el bloqueo al empezar
+            conn.isolation_level = "IMMEDIATE"
+        if perfil["journal_mode"] and not es_memoria(db_name):
+            # El modo WAL es persistente en el archivo; basta con fijarlo desde la conexión principal
+            conn.execute(f"PRAGMA journal_mode = {perfil['journal_mode']}")
+
+    for pragma in ("synchronous", "cache_size", "mmap_size", "temp_store"):
+        valor = perfil[pragma]
+        if valor is not None:
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+    if solo_lectura:
+        conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+class PoolLectura:
+    """
+    Pool pequeño de conexiones de solo lectura.
+    Las conexiones se crean a demanda hasta 'tamano'; si todas están en uso,
+    'tomar' espera a que alguna sea devuelta.
+    """
+    def __init__(self, db_name, perfil, tamano):
+        self.db_name = db_name
+        self.perfil = perfil
+        self.tamano = tamano
+        self._libres = queue.LifoQueue()
+        self._todas = []
+        self._bloqueo = threading.Lock()
+
+    def tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._bloqueo:
+            if len(self._todas) < self.tamano:
+                conn = abrir_conexion(self.db_name, self.perfil, solo_lectura=True)
+                self._todas.append(conn)
+                return conn
+        return self._libres.get()
+
+    def devolver(self, conn):
+        self._libres.put(conn)
+
+    def cerrar(self):
+        with self._bloqueo:
+            for conn in self._todas:
+                conn.close()
+            self._todas = []
@@ -1,127 +1,764 @@
 import sqlite3
 import datetime
 import os
+import functools
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from core.conexion import resolver_perfil, abrir_conexion, es_memoria, PoolLectura
+from core import filas
+
+
+def _escritura(metodo, agrupable=False):
+    """
+    Serializa los métodos que escriben sobre la conexión principal y, si el
+    perfil lo pide, los corre dentro de BEGIN IMMEDIATE (ver
+    DatabaseManager._transaccion_escritura).
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._bloqueo_escritura, self._transaccion_escritura(agrupable):
+            return metodo(self, *args, **kwargs)
+    envoltura.agrupable = agrupable
+    return envoltura
+
+
+def _escritura_agrupable(metodo):
+    """
+    Como _escritura, para escrituras chicas que dentro de
+    DatabaseManager.agrupar() comparten el commit del grupo (ui.servicio_db
+    junta así las que se encolan seguidas). El método debe
+    terminar con self._confirmar() / self._revertir() en vez de
+    commit() / rollback().
+    """
+    return _escritura(metodo, agrupable=True)
+
+
+def _es_bloqueo(error):
+    """True si 'error' es SQLITE_BUSY: otra conexión tiene el bloqueo de escritura."""
+    return getattr(error, "sqlite_errorcode", None) == sqlite3.SQLITE_BUSY or "database is locked" in str(error)
+
+
+# --- Migraciones versionadas ---
+
+def _columnas(cursor, tabla):
+    cursor.execute("SELECT name FROM pragma_table_info(?)", (tabla,))
+    return {nombre for (nombre,) in cursor.fetchall()}
+
+
+def _agregar_columna(tabla, columna, definicion):
+    """Paso de migración: ALTER TABLE ... ADD COLUMN, solo si la columna falta."""
+    def paso(cursor):
+        if columna not in _columnas(cursor, tabla):
+            cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+    return paso
+
+
+def _quitar_columna(tabla, columna):
+    """
+    Paso de migración: ALTER TABLE ... DROP COLUMN, solo si la columna existe.
+    SQLite anterior a 3.35 no sabe quitar columnas: ahí la columna queda (sin uso).
+    """
+    def paso(cursor):
+        if sqlite3.sqlite_version_info >= (3, 35, 0) and columna in _columnas(cursor, tabla):
+            cursor.execute(f"ALTER TABLE {tabla} DROP COLUMN {columna}")
+    return paso
+
+
+# Esquema de partida de las migraciones numeradas (versión 0). Las bases
+# anteriores a PRAGMA user_version ya tienen estas tablas, en alguna de sus
+# formas viejas: por eso todo es IF NOT EXISTS y las columnas que se
+# agregaron o quitaron con el tiempo se ajustan solo si hace falta. Va antes
+# del paso 1 (y en su misma transacción) porque el paso 2 ya lee
+# pagos.tipo_pago_realizado.
+ESQUEMA_BASE = [
+    """
+    CREATE TABLE IF NOT EXISTS productos (
+        id_prod INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL UNIQUE,
+        precio REAL NOT NULL DEFAULT 0,
+        stock INTEGER NOT NULL DEFAULT 0,
+        produccion_dia INTEGER NOT NULL DEFAULT 0,
+        vendido_dia INTEGER NOT NULL DEFAULT 0,
+        es_gaseosa BOOLEAN NOT NULL DEFAULT 0,
+        oculto BOOLEAN NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trabajadores (
+        id_trab INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        contacto TEXT,
+        cargo TEXT,
+        salario_semanal REAL NOT NULL DEFAULT 0,
+        activo BOOLEAN NOT NULL DEFAULT 1,
+        tipo_pago TEXT NOT NULL DEFAULT 'Semanal'
+    )
+    """,
+    _agregar_columna("trabajadores", "tipo_pago", "TEXT NOT NULL DEFAULT 'Semanal'"),
+    """
+    CREATE TABLE IF NOT EXISTS proveedores (
+        id_prov INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        contacto TEXT,
+        producto_suministrado TEXT,
+        activo BOOLEAN NOT NULL DEFAULT 1
+    )
+    """,
+    # Los proveedores se pagan por factura desde la versión 2.1
+    _quitar_columna("proveedores", "pago_mensual"),
+    # La tabla 'ventas' ya no se usa (la reemplaza 'cierre_diario'); las
+    # bases viejas la conservan
+    """
+    CREATE TABLE IF NOT EXISTS pagos (
+        id_pago INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL, -- 'Trabajador' o 'Proveedor'
+        id_entidad INTEGER NOT NULL,
+        nombre_entidad TEXT NOT NULL,
+        monto REAL NOT NULL,
+        tipo_pago_realizado TEXT NOT NULL DEFAULT 'Salario', -- Salario, Bono, Aguinaldo, Factura
+        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    _agregar_columna("pagos", "tipo_pago_realizado", "TEXT NOT NULL DEFAULT 'Salario'"),
+    """
+    CREATE TABLE IF NOT EXISTS cierre_diario (
+        id_cierre INTEGER PRIMARY KEY AUTOINCREMENT,
+        fecha DATE NOT NULL,
+        id_producto INTEGER NOT NULL,
+        nombre_producto TEXT NOT NULL,
+        stock_inicial INTEGER NOT NULL,
+        produccion_dia INTEGER NOT NULL,
+        stock_final_conteo INTEGER NOT NULL,
+        ventas_calculadas INTEGER NOT NULL,
+        ingresos_calculados REAL NOT NULL,
+        UNIQUE(fecha, id_producto)
+    )
+    """,
+]
+
+# Tablas con contador de cambios (ver get_cambios_tablas). cierre_diario y
+# pagos, mucho más grandes, quedan representadas por sus tablas de resumen:
+# todo cierre o pago también escribe su resumen.
+TABLAS_VIGILADAS = ("productos", "trabajadores", "proveedores", "resumen_ingresos_dia", "resumen_pagos_dia")
+
+
+def _triggers_contadores(tabla_contadores, temporal=False):
+    """
+    Triggers que suman 1 en 'tabla_contadores' por cada fila insertada,
+    modificada o borrada de TABLAS_VIGILADAS. Los temporales existen solo
+    en la conexión que los crea, así que cuentan únicamente sus cambios.
+    """
+    sentencias = []
+    for tabla in TABLAS_VIGILADAS:
+        for operacion in ("INSERT", "UPDATE", "DELETE"):
+            sentencias.append(
+                f"CREATE {'TEMP ' if temporal else ''}TRIGGER IF NOT EXISTS "
+                f"{tabla_contadores}_{tabla}_{operacion.lower()} AFTER {operacion} ON main.{tabla} "
+                f"BEGIN UPDATE {tabla_contadores} SET version = version + 1 WHERE tabla = '{tabla}'; END"
+            )
+    return sentencias
+
+
+# Cada paso (versión, descripción, sentencias) se aplica una sola vez, en su
+# propia transacción, y deja registrada su versión en PRAGMA user_version.
+# Una sentencia puede ser SQL o una función que recibe el cursor.
+MIGRACIONES = [
+    (1, "Índices de cobertura para reportes de cierres y pagos", [
+        "CREATE INDEX IF NOT EXISTS idx_cierre_fecha_ingresos ON cierre_diario(fecha, ingresos_calculados)",
+        "CREATE INDEX IF NOT EXISTS idx_pagos_fecha_monto ON pagos(fecha, monto)",
+        "CREATE INDEX IF NOT EXISTS idx_pagos_entidad_fecha ON pagos(tipo, id_entidad, fecha)",
+    ]),
+    (2, "Tablas de resumen diario de ingresos y pagos", [
+        """
+        CREATE TABLE IF NOT EXISTS resumen_ingresos_dia (
+            fecha DATE PRIMARY KEY,
+            ingresos REAL NOT NULL DEFAULT 0,
+            ventas INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS resumen_pagos_dia (
+            fecha DATE NOT NULL,
+            tipo TEXT NOT NULL,
+            tipo_pago_realizado TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            cantidad INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (fecha, tipo, tipo_pago_realizado)
+        )
+        """,
+        "DELETE FROM resumen_ingresos_dia",
+        "DELETE FROM resumen_pagos_dia",
+        "INSERT INTO resumen_ingresos_dia (fecha, ingresos, ventas) "
+        "SELECT fecha, SUM(ingresos_calculados), SUM(ventas_calculadas) FROM cierre_diario GROUP BY fecha",
+        "INSERT INTO resumen_pagos_dia (fecha, tipo, tipo_pago_realizado, total, cantidad) "
+        "SELECT date(fecha), tipo, tipo_pago_realizado, SUM(monto), COUNT(*) FROM pagos GROUP BY 1, 2, 3",
+    ]),
+    (3, "Índice en el orden del historial de cierres (paginación por clave)", [
+        "CREATE INDEX IF NOT EXISTS idx_cierre_fecha_desc_nombre ON cierre_diario(fecha DESC, nombre_producto ASC)",
+    ]),
+    (4, "Diario de auditoría de los conteos de cada cierre", [
+        """
+        CREATE TABLE IF NOT EXISTS diario_cierres (
+            id_registro INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha DATE NOT NULL,
+            momento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            accion TEXT NOT NULL, -- 'cierre' o 'correccion'
+            huella TEXT NOT NULL, -- sha256 del conteo normalizado
+            productos INTEGER NOT NULL,
+            conteo TEXT NOT NULL -- JSON {id_prod: cantidad} tal como se ingresó
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_diario_cierres_fecha ON diario_cierres(fecha, id_registro)",
+    ]),
+    (5, "Contadores de cambios por tabla para los tableros de varias cajas", [
+        """
+        CREATE TABLE IF NOT EXISTS cambios_tablas (
+            tabla TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """,
+        *(f"INSERT OR IGNORE INTO cambios_tablas (tabla) VALUES ('{tabla}')" for tabla in TABLAS_VIGILADAS),
+        *_triggers_contadores("cambios_tablas"),
+    ]),
+    # CURRENT_TIMESTAMP guarda los pagos en UTC; el paso 2 los agrupó por su
+    # fecha UTC y los cierres usan la fecha local
+    (6, "Resumen de pagos agrupado por fecha local", [
+        "DELETE FROM resumen_pagos_dia",
+        "INSERT INTO resumen_pagos_dia (fecha, tipo, tipo_pago_realizado, total, cantidad) "
+        "SELECT date(fecha, 'localtime'), tipo, tipo_pago_realizado, SUM(monto), COUNT(*) FROM pagos GROUP BY 1, 2, 3",
+    ]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+# --- Consultas de reportes ---
+SQL_CIERRES_POR_RANGO = """
+SELECT fecha, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados
+FROM cierre_diario
+WHERE fecha BETWEEN ? AND ?
+ORDER BY fecha DESC, nombre_producto ASC
+"""
+
+# Página siguiente a la clave (fecha, nombre_producto) de la última fila vista
+# (?1, ?2: rango; ?3, ?4: clave; ?5: tamaño). Como el orden mezcla DESC y ASC,
+# una comparación de filas no sirve de búsqueda en el índice: la página se arma
+# con el resto del día de la clave (búsqueda por fecha y nombre) seguido de los
+# días anteriores (búsqueda por fecha con un único límite superior). Cada parte
+# empieza justo en la clave de idx_cierre_fecha_desc_nombre, así que el costo
+# no depende de cuántas páginas o filas del mismo día se hayan leído antes.
+SQL_PAGINA_CIERRES = """
+SELECT * FROM (
+    SELECT fecha, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados
+    FROM cierre_diario
+    WHERE fecha = ?3 AND nombre_producto > ?4 AND fecha BETWEEN ?1 AND ?2
+    ORDER BY nombre_producto ASC
+    LIMIT ?5
+)
+UNION ALL
+SELECT * FROM (
+    SELECT fecha, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados
+    FROM cierre_diario
+    WHERE fecha BETWEEN ?1 AND MIN(?2, date(?3, '-1 day'))
+    ORDER BY fecha DESC, nombre_producto ASC
+    LIMIT ?5
+)
+LIMIT ?5
+"""
+
+# Cuadre de caja por períodos, en una sola pasada sobre las tablas de resumen
+# (ver MIGRACIONES, paso 2). {periodo} es la clave del balde (PERIODOS_CUADRE);
+# cada fila es un (periodo, tipo, tipo_pago_realizado) y los ingresos vienen
+# en las filas con tipo NULL.
+PERIODOS_CUADRE = {
+    "dia": "fecha",
+    "semana": "date(fecha, 'weekday 0', '-6 days')",  # lunes de la semana
+    "mes": "substr(fecha, 1, 8) || '01'",
+}
+
+SQL_CUADRE_CAJA = """
+WITH movimientos (periodo, tipo, tipo_pago_realizado, ingresos, pagos, cantidad) AS (
+    SELECT {periodo}, NULL, NULL, ingresos, 0, 0
+    FROM resumen_ingresos_dia WHERE fecha BETWEEN ? AND ?
+    UNION ALL
+    SELECT {periodo}, tipo, tipo_pago_realizado, 0, total, cantidad
+    FROM resumen_pagos_dia WHERE fecha BETWEEN ? AND ?
+)
+SELECT periodo, tipo, tipo_pago_realizado, SUM(ingresos), SUM(pagos), SUM(cantidad)
+FROM movimientos
+GROUP BY periodo, tipo, tipo_pago_realizado
+ORDER BY periodo
+"""
+
+SQL_GRAFICO_VENTAS = """
+SELECT fecha as dia, ingresos as total_dia
+FROM resumen_ingresos_dia
+WHERE fecha >= date('now', 'localtime', '-30 days')
+ORDER BY dia ASC
+"""
+
+# Reporte de cierres para exportar: las filas de SQL_CIERRES_POR_RANGO, en su
+# orden (sin límite de rango = todo el historial)
+COLUMNAS_REPORTE_VENTAS = [
+    "fecha", "nombre_producto", "stock_inicial", "produccion_dia",
+    "stock_final_conteo", "ventas_calculadas", "ingresos_calculados",
+]
+
+FECHA_MINIMA = "0000-01-01"
+FECHA_MAXIMA = "9999-12-31"
+
+# Recalculo completo de los resúmenes desde las tablas originales
+SQL_RESUMEN_INGRESOS_ORIGEN = """
+SELECT fecha, SUM(ingresos_calculados), SUM(ventas_calculadas)
+FROM cierre_diario GROUP BY fecha
+"""
+
+# Los pagos se guardan en UTC (CURRENT_TIMESTAMP) y se resumen por fecha local
+SQL_RESUMEN_PAGOS_ORIGEN = """
+SELECT date(fecha, 'localtime'), tipo, tipo_pago_realizado, SUM(monto), COUNT(*)
+FROM pagos GROUP BY 1, 2, 3
+"""
+
+# Consultas de catálogo en el orden de columnas que muestran las tablas de la interfaz
+SQL_TABLA_PRODUCTOS = """
+SELECT id_prod, nombre, precio, stock, produccion_dia, es_gaseosa, oculto
+FROM productos {filtro}
+ORDER BY id_prod
+"""
+
+SQL_TABLA_TRABAJADORES = """
+SELECT id_trab, nombre, contacto, cargo, tipo_pago, salario_semanal, activo
+FROM trabajadores {filtro}
+ORDER BY id_trab
+"""
+
+SQL_TABLA_PROVEEDORES = """
+SELECT id_prov, nombre, contacto, producto_suministrado, activo
+FROM proveedores {filtro}
+ORDER BY id_prov
+"""
+
+# Importación masiva (ver core.importar). Un None en un campo opcional
+# deja el valor actual al actualizar y el valor por defecto al insertar.
+SQL_IMPORTAR_PRODUCTOS = """
+INSERT INTO productos (nombre, precio, stock, es_gaseosa, oculto)
+VALUES (:nombre, :precio, COALESCE(:stock, 0), COALESCE(:es_gaseosa, 0), COALESCE(:oculto, 0))
+ON CONFLICT(nombre) DO UPDATE SET
+    precio = excluded.precio,
+    stock = COALESCE(:stock, stock),
+    es_gaseosa = COALESCE(:es_gaseosa, es_gaseosa),
+    oculto = COALESCE(:oculto, oculto)
+"""
+
+SQL_IMPORTAR_TRABAJADORES = """
+INSERT INTO trabajadores (id_trab, nombre, contacto, cargo, salario_semanal, tipo_pago, activo)
+VALUES (:id_trab, :nombre, :contacto, :cargo, COALESCE(:salario_semanal, 0),
+        COALESCE(:tipo_pago, 'Semanal'), COALESCE(:activo, 1))
+ON CONFLICT(id_trab) DO UPDATE SET
+    nombre = excluded.nombre,
+    contacto = COALESCE(:contacto, contacto),
+    cargo = COALESCE(:cargo, cargo),
+    salario_semanal = COALESCE(:salario_semanal, salario_semanal),
+    tipo_pago = COALESCE(:tipo_pago, tipo_pago),
+    activo = COALESCE(:activo, activo)
+"""
+
+SQL_IMPORTAR_PROVEEDORES = """
+INSERT INTO proveedores (id_prov, nombre, contacto, producto_suministrado, activo)
+VALUES (:id_prov, :nombre, :contacto, :producto_suministrado, COALESCE(:activo, 1))
+ON CONFLICT(id_prov) DO UPDATE SET
+    nombre = excluded.nombre,
+    contacto = COALESCE(:contacto, contacto),
+    producto_suministrado = COALESCE(:producto_suministrado, producto_suministrado),
+    activo = COALESCE(:activo, activo)
+"""
+
+# Consultas que deben resolverse con un índice: {nombre: (sql, parámetros de ejemplo)}
+CONSULTAS_REPORTES = {
+    "get_cierres_por_rango": (SQL_CIERRES_POR_RANGO, ("2000-01-01", "2000-01-31")),
+    "get_pagina_cierres": (SQL_PAGINA_CIERRES, ("2000-01-01", "2000-01-31", "2000-01-15", "Pan", 200)),
+    "get_cuadre_caja": (SQL_CUADRE_CAJA.format(periodo=PERIODOS_CUADRE["mes"]),
+                        ("2000-01-01", "2002-12-31") * 2),
+    "get_datos_grafico_ventas": (SQL_GRAFICO_VENTAS, ()),
+}
+
+
+# --- Catálogo de productos en memoria ---
+
+class Producto:
+    """Registro compacto de una fila de 'productos'."""
+    __slots__ = ("id_prod", "nombre", "precio", "stock", "produccion_dia", "vendido_dia", "es_gaseosa", "oculto")
+
+    def __init__(self, *valores):
+        for campo, valor in zip(self.__slots__, valores):
+            setattr(self, campo, valor)
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def como_tupla(self):
+        """Tupla en el orden de columnas de la tabla 'productos'."""
+        return tuple(getattr(self, campo) for campo in self.__slots__)
+
+    def como_fila_tabla(self):
+        """Tupla en el orden de columnas de SQL_TABLA_PRODUCTOS."""
+        return (self.id_prod, self.nombre, self.precio, self.stock,
+                self.produccion_dia, self.es_gaseosa, self.oculto)
+
+
+def _alternar_oculto(producto):
+    producto.oculto = 0 if producto.oculto else 1
+
+
+class CatalogoProductos:
+    """
+    Caché write-through de la tabla 'productos', indexada por id_prod.
+    Los mutadores de DatabaseManager la actualizan en el lugar después de
+    cada commit, incrementan 'version' y avisan a los suscriptores con
+    oyente(evento, ids), donde evento es "agregado", "modificado" o
+    "recargado" (caché invalidada: hay que volver a leer; ids es None).
+    La carga inicial no avisa, porque siempre la provoca una lectura.
+    """
+    def __init__(self):
+        self._productos = {}
+        self._bloqueo = threading.RLock()
+        self._oyentes = []
+        self.cargado = False
+        self.version = 0
+
+    def suscribir(self, oyente):
+        self._oyentes.append(oyente)
+
+    def _notificar(self, evento, ids):
+        self.version += 1
+        for oyente in self._oyentes:
+            oyente(evento, ids)
+
+    def cargar(self, filas):
+        with self._bloqueo:
+            self._productos = {fila[0]: Producto(*fila) for fila in filas}
+            self.cargado = True
+            self.version += 1
+
+    def invalidar(self):
+        """Marca la caché como vieja (p. ej. si otra caja escribió en la base)."""
+        with self._bloqueo:
+            self.cargado = False
+        self._notificar("recargado", None)
+
+    def agregar(self, producto):
+        with self._bloqueo:
+            if not self.cargado:
+                return
+            self._productos[producto.id_prod] = producto
+        self._notificar("agregado", {producto.id_prod})
+
+    def modificar(self, ids, cambio):
+        """Aplica cambio(producto) a cada id presente y notifica."""
+        with self._bloqueo:
+            if not self.cargado:
+                return
+            modificados = set()
+            for id_prod in ids:
+                producto = self._productos.get(id_prod)
+                if producto is not None:
+                    cambio(producto)
+                    modificados.add(id_prod)
+        if modificados:
+            self._notificar("modificado", modificados)
+
+    def obtener(self, id_prod):
+        with self._bloqueo:
+            return self._productos.get(id_prod)
+
+    def listar(self, ver_ocultos=False):
+        with self._bloqueo:
+            return [p for _, p in sorted(self._productos.items())
+                    if ver_ocultos or not p.oculto]
+
 
 class DatabaseManager:
     """
     Clase que maneja toda la comunicación con la base de datos SQLite.
     Versión 2.1 - Pagos a proveedores por factura.
+
+    'perfil' selecciona el ajuste de la conexión (ver core.conexion.PERFILES):
+    un nombre ("rendimiento", "compatible", "seguro") o un diccionario con
+    los valores a sobrescribir.
+
+    'modo_filas' elige cómo devuelven sus filas los métodos get_* (ver
+    core.filas.MODOS); cada uno acepta además 'modo' para una sola llamada.
     """
-    def __init__(self, db_name="panaderia.db"):
-# ... (código existente sin cambios) ...
+    def __init__(self, db_name="panaderia.db", perfil=None, usar_cache_productos=True, modo_filas="dict"):
         self.db_name = db_name
-        self.conn = sqlite3.connect(self.db_name)
+        self.perfil = resolver_perfil(perfil)
+        self.modo_filas = filas.validar_modo(modo_filas)
+        self.conn = abrir_conexion(self.db_name, self.perfil)
+        self._bloqueo_escritura = threading.RLock()
+
+        # Las lecturas usan su propio pool para no esperar detrás de las escrituras
+        self._pool = None
+        if self.perfil["conexiones_lectura"] > 0 and not es_memoria(self.db_name):
+            self._pool = PoolLectura(self.db_name, self.perfil, self.perfil["conexiones_lectura"])
+
+        # Catálogo de productos cacheado (None = leer siempre de la base)
+        self.catalogo = CatalogoProductos() if usar_cache_productos else None
+
+        # Métricas de llamadas y consultas (None = desactivadas, sin costo)
+        self.instrumentacion = None
+
+        # Conexión que solo lee PRAGMA data_version (ver version_datos)
+        self._conn_version = None
+        self._bloqueo_version = threading.Lock()
+        # Contadores de los cambios propios (ver get_cambios_tablas), a demanda
+        self._cambios_propios = False
+
+        # Dentro de agrupar(): las escrituras agrupables comparten un commit
+        self._agrupando = False
+        self._punto_guardado = False
+        # BEGIN IMMEDIATE reintentados porque otro proceso tenía la base
+        self.reintentos_bloqueo = 0
+
         self.create_tables()
 
-    def create_tables(self):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+    def activar_instrumentacion(self, umbral_lento_ms=100.0):
+        """
+        Empieza a medir cada método público y cada sentencia SQL (ver
+        core.instrumentacion). Devuelve la Instrumentacion, cuya instantanea()
+        entrega las métricas y el registro de consultas lentas.
+        """
+        if self.instrumentacion is None:
+            # Se importa a demanda: arrastra logging e inspect, que el resto no usa
+            from core.instrumentacion import Instrumentacion
+            self.instrumentacion = Instrumentacion(umbral_lento_ms)
+            self.instrumentacion.instalar(self)
+        return self.instrumentacion
+
+    def desactivar_instrumentacion(self):
+        if self.instrumentacion is not None:
+            self.instrumentacion.desinstalar()
+            self.instrumentacion = None
+
+    @contextmanager
+    def _conexion_lectura(self):
+        """Presta una conexión para consultas (del pool, o la principal si no hay pool)."""
+        if self._pool is None:
+            with self._bloqueo_escritura:
+                yield self.conn
+            return
+        conn = self._pool.tomar()
         try:
-            # --- Tabla de Productos (sin cambios en estructura) ---
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS productos (
-                id_prod INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL UNIQUE,
-# ... (código existente sin cambios) ...
-                precio REAL NOT NULL DEFAULT 0,
-                stock INTEGER NOT NULL DEFAULT 0,
-                produccion_dia INTEGER NOT NULL DEFAULT 0,
-                vendido_dia INTEGER NOT NULL DEFAULT 0,
-# ... (código existente sin cambios) ...
-                es_gaseosa BOOLEAN NOT NULL DEFAULT 0,
-                oculto BOOLEAN NOT NULL DEFAULT 0
-            )
-            """)
+            yield conn
+        finally:
+            self._pool.devolver(conn)
 
-            # --- Tabla de Trabajadores (MODIFICADA) ---
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS trabajadores (
-# ... (código existente sin cambios) ...
-                id_trab INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                contacto TEXT,
-                cargo TEXT,
-                salario_semanal REAL NOT NULL DEFAULT 0,
-# ... (código existente sin cambios) ...
-                activo BOOLEAN NOT NULL DEFAULT 1,
-                tipo_pago TEXT NOT NULL DEFAULT 'Semanal' 
-            )
-            """)
-            # Intentar añadir la columna tipo_pago si no existe (para migraciones)
-            try:
-# ... (código existente sin cambios) ...
-                cursor.execute("ALTER TABLE trabajadores ADD COLUMN tipo_pago TEXT NOT NULL DEFAULT 'Semanal'")
-            except sqlite3.OperationalError:
-                pass # La columna ya existe
+    def _leer(self, sql, parametros, tabla, modo=None):
+        """Ejecuta una consulta de lectura y devuelve sus filas en el modo pedido."""
+        modo = modo or self.modo_filas
+        with self._conexion_lectura() as conn:
+            cursor = filas.preparar(conn.cursor(), modo)
+            cursor.execute(sql, parametros)
+            return filas.leer(cursor, modo, tabla)
 
-            # --- Tabla de Proveedores (MODIFICADA) ---
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS proveedores (
-                id_prov INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                contacto TEXT,
-                producto_suministrado TEXT,
-                activo BOOLEAN NOT NULL DEFAULT 1
-            )
-            """)
-            # Intentar eliminar la columna pago_mensual si existe (para migraciones)
-            try:
-                cursor.execute("ALTER TABLE proveedores DROP COLUMN pago_mensual")
-            except sqlite3.OperationalError:
-                pass # La columna no existía o no se puede eliminar
+    # --- Transacciones de escritura ---
 
-            
-            # --- Tabla de Ventas (ELIMINADA) ---
-# ... (código existente sin cambios) ...
-            # Esta tabla ya no se usa, la reemplaza 'cierre_diario'
-            # cursor.execute("DROP TABLE IF EXISTS ventas")
-            
-            # --- Tabla de Pagos (MODIFICADA) ---
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS pagos (
-# ... (código existente sin cambios) ...
-                id_pago INTEGER PRIMARY KEY AUTOINCREMENT,
-                tipo TEXT NOT NULL, -- 'Trabajador' o 'Proveedor'
-                id_entidad INTEGER NOT NULL,
-                nombre_entidad TEXT NOT NULL,
-# ... (código existente sin cambios) ...
-                monto REAL NOT NULL,
-                tipo_pago_realizado TEXT NOT NULL DEFAULT 'Salario', -- Salario, Bono, Aguinaldo, Factura
-                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
+    @contextmanager
+    def _transaccion_escritura(self, agrupable):
+        """
+        Envuelve cada método @_escritura (ya bajo _bloqueo_escritura). Con
+        'escritura_inmediata' en el perfil abre BEGIN IMMEDIATE antes de
+        llamarlo; si el método sale sin commit, se revierte para no retener
+        el bloqueo. Dentro de agrupar(), las escrituras agrupables corren en
+        un SAVEPOINT de la transacción del grupo y las demás confirman antes
+        lo acumulado.
+        """
+        if self._agrupando:
+            if not agrupable:
+                if self.conn.in_transaction:
+                    self.conn.commit()
+            elif self.conn.in_transaction or self._comenzar_inmediata():
+                self.conn.execute("SAVEPOINT escritura")
+                self._punto_guardado = True
+                try:
+                    yield
+                finally:
+                    if self._punto_guardado:
+                        self._revertir()
+                return
+            else:
+                # Sin el bloqueo no hay grupo: la escritura hace su propio commit o informa el error
+                yield
+                return
+        if not self.perfil["escritura_inmediata"] or self.conn.in_transaction:
+            yield
+            return
+        self._comenzar_inmediata()
+        try:
+            yield
+        finally:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+
+    def _comenzar_inmediata(self):
+        """
+        BEGIN IMMEDIATE. Los primeros 'reintentos_escritura' intentos esperan
+        el bloqueo solo 'espera_bloqueo_ms'; si otra caja lo sigue teniendo,
+        duermen un tiempo aleatorio entre 0 y espera_reintento_ms * 2^intento
+        para que las cajas que chocaron no vuelvan a chocar a la vez. El
+        último intento espera el busy_timeout completo del perfil: con
+        'escritura_inmediata' es el BEGIN IMMEDIATE implícito del propio
+        método. Devuelve False si no tomó el bloqueo; el método corre igual
+        e informa el error como siempre.
+        """
+        reintentos = self.perfil["reintentos_escritura"]
+        if reintentos:
+            espera = self.perfil["espera_reintento_ms"] / 1000
+            self.conn.execute(f"PRAGMA busy_timeout = {self.perfil['espera_bloqueo_ms']}")
             try:
-# ... (código existente sin cambios) ...
-                cursor.execute("ALTER TABLE pagos ADD COLUMN tipo_pago_realizado TEXT NOT NULL DEFAULT 'Salario'")
-            except sqlite3.OperationalError:
-                pass # La columna ya existe
+                for intento in range(reintentos):
+                    try:
+                        self.conn.execute("BEGIN IMMEDIATE")
+                        return True
+                    except sqlite3.OperationalError as e:
+                        if not _es_bloqueo(e):
+                            return False
+                    self.reintentos_bloqueo += 1
+                    time.sleep(random.uniform(0, espera * 2 ** intento))
+            finally:
+                self.conn.execute(f"PRAGMA busy_timeout = {self.perfil['busy_timeout']}")
+        if self.perfil["escritura_inmediata"]:
+            return False
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            return True
+        except sqlite3.OperationalError:
+            return False
 
-            # --- NUEVA TABLA: Cierre Diario ---
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS cierre_diario (
-# ... (código existente sin cambios) ...
-                id_cierre INTEGER PRIMARY KEY AUTOINCREMENT,
-                fecha DATE NOT NULL,
-                id_producto INTEGER NOT NULL,
-                nombre_producto TEXT NOT NULL,
-# ... (código existente sin cambios) ...
-                stock_inicial INTEGER NOT NULL,
-                produccion_dia INTEGER NOT NULL,
-                stock_final_conteo INTEGER NOT NULL,
-                ventas_calculadas INTEGER NOT NULL,
-# ... (código existente sin cambios) ...
-                ingresos_calculados REAL NOT NULL,
-                UNIQUE(fecha, id_producto)
-            )
-            """)
-            
+    def _confirmar(self):
+        """commit() de una escritura agrupable; dentro de agrupar() solo libera su SAVEPOINT."""
+        if self._punto_guardado:
+            self._punto_guardado = False
+            self.conn.execute("RELEASE escritura")
+        else:
             self.conn.commit()
+
+    def _revertir(self):
+        """rollback() de una escritura agrupable; dentro de agrupar() deshace solo esa escritura."""
+        if self._punto_guardado:
+            self._punto_guardado = False
+            self.conn.execute("ROLLBACK TO escritura")
+            self.conn.execute("RELEASE escritura")
+        else:
+            self.conn.rollback()
+
+    @contextmanager
+    def agrupar(self):
+        """
+        Confirma con un solo commit las escrituras agrupables hechas dentro
+        del bloque (registrar_pago_trabajador, registrar_pago_proveedor,
+        update_produccion_stock): una ráfaga de escrituras chicas paga un
+        fsync y toma el bloqueo de escritura una vez. Cada una sigue
+        devolviendo su (success, message); si falla se deshace solo ella.
+
+        Las demás escrituras dentro del bloque confirman antes lo acumulado.
+        Si el commit final falla se revierte todo el grupo, se invalida el
+        catálogo y la excepción sigue su curso. Mientras dure el bloque, las
+        otras conexiones no ven las escrituras del grupo.
+        """
+        with self._bloqueo_escritura:
+            if self._agrupando:
+                yield
+                return
+            self._agrupando = True
+            try:
+                yield
+                if self.conn.in_transaction:
+                    self.conn.commit()
+            except BaseException:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                    if self.catalogo is not None:
+                        self.catalogo.invalidar()
+                raise
+            finally:
+                self._agrupando = False
+
+    def create_tables(self):
+        """
+        Lleva el esquema a VERSION_ESQUEMA. En una base al día solo lee
+        PRAGMA user_version; si no, aplica ESQUEMA_BASE (bases nuevas o
+        anteriores a las migraciones) y los pasos de MIGRACIONES pendientes.
+        """
 # ... (código existente sin cambios) ...
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        version_actual = cursor.fetchone()[0]
+        if version_actual >= VERSION_ESQUEMA:
+            return
+        try:
+            self._aplicar_migraciones(cursor, version_actual)
         except sqlite3.Error as e:
             print(f"Error al crear tablas: {e}")
             self.conn.rollback()
 
+    def _aplicar_migraciones(self, cursor, version_actual):
+        """
+        Aplica, en orden y una sola vez, los pasos de MIGRACIONES pendientes.
+        Cada paso empieza con BEGIN IMMEDIATE y vuelve a leer user_version ya
+        con el bloqueo: si otra caja abrió la misma base vieja a la vez, los
+        pasos que ella aplicó se saltan en lugar de chocar al escribir.
+        """
+        for version, descripcion, sentencias in MIGRACIONES:
+            if version <= version_actual:
+                continue
+            if not self._comenzar_inmediata():
+                # Último intento con el busy_timeout completo; si falla, lo informa create_tables
+                cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("PRAGMA user_version")
+            version_actual = cursor.fetchone()[0]
+            if version <= version_actual:
+                self.conn.rollback()
+                continue
+            if version_actual == 0:
+                sentencias = ESQUEMA_BASE + sentencias
+            for sentencia in sentencias:
+                if callable(sentencia):
+                    sentencia(cursor)
+                else:
+                    cursor.execute(sentencia)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            self.conn.commit()
+            version_actual = version
+
+    def verificar_planes_consulta(self):
+        """
+        Ejecuta EXPLAIN QUERY PLAN sobre cada consulta de CONSULTAS_REPORTES.
+        Devuelve {nombre: (usa_indice, [detalles del plan])}; 'usa_indice' es
+        False si algún paso recorre una tabla completa sin índice (recorrer
+        el resultado de una subconsulta o CTE no cuenta).
+        """
+        resultado = {}
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            for nombre, (sql, parametros) in CONSULTAS_REPORTES.items():
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros)
+                detalles = [fila[3] for fila in cursor.fetchall()]
+                subconsultas = {detalle.split()[-1] for detalle in detalles
+                                if detalle.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+                usa_indice = not any(
+                    detalle.startswith("SCAN ") and "INDEX" not in detalle
+                    and detalle.split()[1] not in subconsultas
+                    for detalle in detalles
+                )
+                resultado[nombre] = (usa_indice, detalles)
+        return resultado
+
     # --- Métodos de Productos (sin cambios) ---
+    @_escritura
     def add_producto(self, nombre, precio, stock, es_gaseosa):
 # ... (código existente sin cambios) ...
         try:
@@ -132,6 +769,8 @@ class DatabaseManager:
             """, (nombre, precio, stock, es_gaseosa))
 # ... (código existente sin cambios) ...
             self.conn.commit()
+            if self.catalogo is not None:
+                self.catalogo.agregar(Producto(cursor.lastrowid, nombre, float(precio), int(stock), 0, 0, int(es_gaseosa), 0))
             return True, "Producto agregado."
         except sqlite3.IntegrityError:
 # ... (código existente sin cambios) ...
@@ -142,23 +781,105 @@ class DatabaseManager:
             self.conn.rollback()
             return False, f"Error de base de datos: {e}"
 
-    def get_productos(self, ver_ocultos=False):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+    def get_productos(self, ver_ocultos=False, modo=None):
+        modo = modo or self.modo_filas
+        # El catálogo sirve los modos que no necesitan un cursor
+        if self.catalogo is not None and modo != "row":
+            productos = self._catalogo_cargado().listar(ver_ocultos)
+            if modo == "dict":
+                return [p.como_dict() for p in productos]
+            return filas.convertir(Producto.__slots__, [p.como_tupla() for p in productos], modo, "productos")
+
         query = "SELECT * FROM productos"
         if not ver_ocultos:
             query += " WHERE oculto = 0"
-        cursor.execute(query)
-# ... (código existente sin cambios) ...
-        columnas = [desc[0] for desc in cursor.description]
-        return [dict(zip(columnas, row)) for row in cursor.fetchall()]
+        return self._leer(query, (), "productos", modo)
 
+    def version_datos(self):
+        """
+        Número que cambia cada vez que se confirma una escritura en la base,
+        hecha por esta instancia o por otro proceso. Es PRAGMA data_version
+        de una conexión propia que nunca escribe: sirve para saber, sin leer
+        ninguna tabla, si algo pudo haber cambiado desde la última vez.
+        """
+        if es_memoria(self.db_name):
+            # Ninguna otra conexión puede escribir en una base en memoria
+            return self.conn.total_changes
+        with self._bloqueo_version:
+            if self._conn_version is None:
+                self._conn_version = abrir_conexion(self.db_name, self.perfil, solo_lectura=True)
+            return self._conn_version.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_cambios_tablas(self, bloquear=True):
+        """
+        Devuelve {tabla: (cambios, propios)} para TABLAS_VIGILADAS. 'cambios'
+        cuenta las filas insertadas, modificadas o borradas por cualquier
+        conexión (triggers de la migración 5); 'propios', las de esta
+        instancia desde la primera llamada. Entre dos lecturas, si 'cambios'
+        creció más que 'propios', otro proceso tocó esa tabla.
+
+        Con bloquear=False devuelve None si hay una escritura en curso, en
+        vez de esperar a que termine.
+        """
+        if not self._bloqueo_escritura.acquire(blocking=bloquear):
+            return None
+        try:
+            if not self._cambios_propios:
+                self._instalar_cambios_propios()
+            # Bajo el bloqueo de escritura ambos contadores se leen en el mismo estado
+            cursor = self.conn.execute("""
+            SELECT c.tabla, c.version, p.version
+            FROM main.cambios_tablas c JOIN temp.cambios_propios p ON p.tabla = c.tabla
+            """)
+            return {tabla: (cambios, propios) for tabla, cambios, propios in cursor}
+        finally:
+            self._bloqueo_escritura.release()
+
+    def _instalar_cambios_propios(self):
+        """
+        Crea temp.cambios_propios y sus triggers TEMP. Solo toca el esquema
+        temporal, así que corre en modo autocommit: sin BEGIN IMMEDIATE no
+        espera el bloqueo de escritura que puede tener otra caja.
+        """
+        nivel = self.conn.isolation_level
+        if not self.conn.in_transaction:
+            # Con una transacción abierta (dentro de agrupar()) cambiar el nivel haría commit
+            self.conn.isolation_level = None
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS cambios_propios (tabla TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)")
+            cursor.executemany("INSERT OR IGNORE INTO temp.cambios_propios (tabla) VALUES (?)",
+                               [(tabla,) for tabla in TABLAS_VIGILADAS])
+            for sentencia in _triggers_contadores("cambios_propios", temporal=True):
+                cursor.execute(sentencia)
+        finally:
+            self.conn.isolation_level = nivel
+        self._cambios_propios = True
+
+    def _catalogo_cargado(self):
+        """
+        Devuelve el catálogo, cargándolo con una sola consulta si hace falta.
+        La carga toma el bloqueo de escritura: una escritura confirmada entre
+        la consulta y cargar() no actualizaría el catálogo (todavía sin cargar)
+        y la instantánea anterior quedaría instalada.
+        """
+        if not self.catalogo.cargado:
+            with self._bloqueo_escritura, self._conexion_lectura() as conn:
+                if not self.catalogo.cargado:
+                    cursor = conn.cursor()
+                    cursor.execute(f"SELECT {', '.join(Producto.__slots__)} FROM productos")
+                    self.catalogo.cargar(cursor.fetchall())
+        return self.catalogo
+
+    @_escritura
     def toggle_producto_oculto(self, id_prod):
 # ... (código existente sin cambios) ...
         try:
             cursor = self.conn.cursor()
             cursor.execute("UPDATE productos SET oculto = NOT oculto WHERE id_prod = ?", (id_prod,))
             self.conn.commit()
+            if self.catalogo is not None:
+                self.catalogo.modificar([id_prod], _alternar_oculto)
 # ... (código existente sin cambios) ...
             return True, "Estado de producto actualizado."
         except sqlite3.Error as e:
@@ -166,134 +887,457 @@ class DatabaseManager:
 # ... (código existente sin cambios) ...
             return False, f"Error: {e}"
 
+    @_escritura_agrupable
     def update_produccion_stock(self, id_prod, cantidad):
 # ... (código existente sin cambios) ...
         try:
             cursor = self.conn.cursor()
-            cursor.execute("""
-            UPDATE productos SET stock = stock + ?, produccion_dia = produccion_dia + ? 
-            WHERE id_prod = ? AND es_gaseosa = 0
-            """, (cantidad, cantidad, id_prod))
-            
-            # Gaseosas se compran, no se producen
-            cursor.execute("""
-            UPDATE productos SET stock = stock + ?
-            WHERE id_prod = ? AND es_gaseosa = 1
-            """, (cantidad, id_prod))
-            
-            self.conn.commit()
-# ... (código existente sin cambios) ...
+            self._aplicar_produccion(cursor, [(id_prod, cantidad)])
+            self._confirmar()
+            self._catalogo_sumar_produccion([(id_prod, cantidad)])
             return True, "Producción/Compra registrada."
+        except sqlite3.Error as e:
+            self._revertir()
+            return False, f"Error: {e}"
+
+    @_escritura
+    def update_produccion_stock_lote(self, entradas):
+        """
+        Registra varias entradas de producción/compra en una sola transacción.
+        'entradas' es una lista de (id_prod, cantidad).
+        """
+        try:
+            cursor = self.conn.cursor()
+            actualizados = self._aplicar_produccion(cursor, entradas)
+            self.conn.commit()
+            self._catalogo_sumar_produccion(entradas)
+            return True, f"Producción/Compra registrada ({actualizados} productos)."
         except sqlite3.Error as e:
             self.conn.rollback()
-# ... (código existente sin cambios) ...
             return False, f"Error: {e}"
 
+    def _aplicar_produccion(self, cursor, entradas):
+        """Suma las cantidades al stock; solo los panes (no gaseosas) suman a produccion_dia."""
+        # Gaseosas se compran, no se producen
+        cursor.executemany("""
+        UPDATE productos SET
+            stock = stock + ?,
+            produccion_dia = produccion_dia + CASE WHEN es_gaseosa = 0 THEN ? ELSE 0 END
+        WHERE id_prod = ? AND es_gaseosa IN (0, 1)
+        """, [(cantidad, cantidad, id_prod) for id_prod, cantidad in entradas])
+        return cursor.rowcount
+
+    def _catalogo_sumar_produccion(self, entradas):
+        if self.catalogo is None:
+            return
+        cantidades = {}
+        for id_prod, cantidad in entradas:
+            cantidades[id_prod] = cantidades.get(id_prod, 0) + cantidad
+
+        def sumar(producto):
+            producto.stock += cantidades[producto.id_prod]
+            if producto.es_gaseosa == 0:
+                producto.produccion_dia += cantidades[producto.id_prod]
+
+        self.catalogo.modificar(cantidades, sumar)
+
     # --- LÓGICA DE CIERRE (NUEVO) ---
 
+    @_escritura
     def realizar_cierre_diario(self, fecha, conteo_final):
-# ... (código existente sin cambios) ...
         """
         Calcula las ventas basado en el conteo final y guarda el cierre.
         'conteo_final' es un diccionario: {id_prod: cantidad_contada}
+
+        El cierre se resuelve por conjuntos: el conteo se carga en una tabla
+        temporal y todos los productos se cierran con un único INSERT ... SELECT
+        y un único UPDATE, sin importar el tamaño del catálogo.
+
+        Cada conteo aplicado queda en 'diario_cierres'. Repetir el cierre de
+        una fecha ya cerrada es seguro: si el conteo coincide con el guardado
+        no se reescribe nada, y si difiere se corrige ese día (ver
+        _corregir_cierre) en lugar de recalcularlo contra la producción ya
+        reiniciada.
         """
+        fecha = str(fecha)
         cursor = self.conn.cursor()
-# ... (código existente sin cambios) ...
         try:
-            productos = self.get_productos(ver_ocultos=True)
-            
-            for prod in productos:
-                id_prod = prod['id_prod']
-                
-                # Si el producto no está en el conteo, se asume 0
-                stock_final_conteo = conteo_final.get(id_prod, 0) 
-                
-                # Stock_inicial = stock_actual - produccion_hoy
-# ... (código existente sin cambios) ...
-                stock_inicial_dia = prod['stock'] - prod['produccion_dia']
-                produccion_dia = prod['produccion_dia']
-                
-                stock_disponible = stock_inicial_dia + produccion_dia
-                
-                # Ventas = Disponible - Contado
-                ventas_calculadas = stock_disponible - stock_final_conteo
-                
-                # Evitar ventas negativas si el conteo es mayor (ej. error)
-# ... (código existente sin cambios) ...
-                if ventas_calculadas < 0:
-                    ventas_calculadas = 0 
-                    
-                ingresos_calculados = ventas_calculadas * prod['precio']
-
-                # Insertar o reemplazar el cierre de este producto para este día
-                cursor.execute("""
-                INSERT INTO cierre_diario (fecha, id_producto, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados)
-# ... (código existente sin cambios) ...
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(fecha, id_producto) DO UPDATE SET
-                    stock_inicial=excluded.stock_inicial,
-                    produccion_dia=excluded.produccion_dia,
-# ... (código existente sin cambios) ...
-                    stock_final_conteo=excluded.stock_final_conteo,
-                    ventas_calculadas=excluded.ventas_calculadas,
-                    ingresos_calculados=excluded.ingresos_calculados
-                """, (fecha, id_prod, prod['nombre'], stock_inicial_dia, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados))
-                
-                # Actualizar el stock principal del producto al conteo final
-# ... (código existente sin cambios) ...
-                cursor.execute("""
-                UPDATE productos SET stock = ?, produccion_dia = 0, vendido_dia = 0 
-                WHERE id_prod = ?
-                """, (stock_final_conteo, id_prod))
+            self._cargar_conteo_temporal(cursor, conteo_final)
+
+            cursor.execute("SELECT MAX(fecha) FROM cierre_diario")
+            ultimo = cursor.fetchone()[0]
+            cursor.execute("SELECT 1 FROM cierre_diario WHERE fecha = ? LIMIT 1", (fecha,))
+            if cursor.fetchone():
+                if not self._conteo_difiere(cursor, fecha):
+                    self.conn.rollback()
+                    return True, f"El cierre del {fecha} ya estaba aplicado con este mismo conteo; no se modificó nada."
+                deltas, toca_stock = self._corregir_cierre(cursor, fecha)
+                self._registrar_diario_cierre(cursor, fecha, "correccion", conteo_final)
+                self.conn.commit()
+                if self.catalogo is not None and toca_stock:
+                    self._catalogo_sumar_stock(deltas)
+                return True, f"Cierre del {fecha} corregido ({len(deltas)} productos con conteo distinto)."
+            if ultimo is not None and fecha < ultimo:
+                self.conn.rollback()
+                return False, f"Error en el cierre: ya existe un cierre posterior ({ultimo})."
+
+            # Stock_inicial = stock_actual - produccion_hoy
+            # Ventas = Disponible - Contado (nunca negativas, ej. error de conteo)
+            # Si el producto no está en el conteo, se asume 0
+            cursor.execute("""
+            INSERT INTO cierre_diario (fecha, id_producto, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados)
+            SELECT ?, p.id_prod, p.nombre,
+                   p.stock - p.produccion_dia,
+                   p.produccion_dia,
+                   COALESCE(c.cantidad, 0),
+                   MAX(p.stock - COALESCE(c.cantidad, 0), 0),
+                   MAX(p.stock - COALESCE(c.cantidad, 0), 0) * p.precio
+            FROM productos p
+            LEFT JOIN temp.conteo_cierre c ON c.id_prod = p.id_prod
+            WHERE 1
+            ON CONFLICT(fecha, id_producto) DO UPDATE SET
+                stock_inicial=excluded.stock_inicial,
+                produccion_dia=excluded.produccion_dia,
+                stock_final_conteo=excluded.stock_final_conteo,
+                ventas_calculadas=excluded.ventas_calculadas,
+                ingresos_calculados=excluded.ingresos_calculados
+            """, (fecha,))
+            self._actualizar_resumen_ingresos(cursor, fecha)
+
+            # Actualizar el stock principal de todos los productos al conteo final
+            cursor.execute("""
+            UPDATE productos SET
+                stock = COALESCE((SELECT c.cantidad FROM temp.conteo_cierre c WHERE c.id_prod = productos.id_prod), 0),
+                produccion_dia = 0,
+                vendido_dia = 0
+            """)
+            self._registrar_diario_cierre(cursor, fecha, "cierre", conteo_final)
 
             self.conn.commit()
-# ... (código existente sin cambios) ...
+            if self.catalogo is not None:
+                self._catalogo_aplicar_cierre(conteo_final)
             return True, f"Cierre del {fecha} realizado con éxito."
-            
+
         except sqlite3.Error as e:
             self.conn.rollback()
-# ... (código existente sin cambios) ...
             return False, f"Error en el cierre: {e}"
-            
-    def get_cierres_por_rango(self, fecha_inicio, fecha_fin):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+
+    def _conteo_difiere(self, cursor, fecha):
+        """True si el conteo de temp.conteo_cierre no coincide con el cierre guardado de 'fecha'."""
         cursor.execute("""
-        SELECT fecha, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados
-        FROM cierre_diario
-# ... (código existente sin cambios) ...
-        WHERE fecha BETWEEN ? AND ?
-        ORDER BY fecha DESC, nombre_producto ASC
-        """, (fecha_inicio, fecha_fin))
-        
-        columnas = [desc[0] for desc in cursor.description]
-# ... (código existente sin cambios) ...
-        return [dict(zip(columnas, row)) for row in cursor.fetchall()]
+        SELECT 1 FROM cierre_diario cd
+        LEFT JOIN temp.conteo_cierre c ON c.id_prod = cd.id_producto
+        WHERE cd.fecha = ? AND cd.stock_final_conteo != COALESCE(c.cantidad, 0)
+        LIMIT 1
+        """, (fecha,))
+        return cursor.fetchone() is not None
 
-    def get_ingresos_calculados_semana(self):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+    def _corregir_cierre(self, cursor, fecha):
+        """
+        Reemplaza el conteo final de un día ya cerrado por el de temp.conteo_cierre
+        y propaga la diferencia solo hasta donde llega:
+        - el día corregido recalcula ventas e ingresos;
+        - el siguiente día cerrado empieza con esa diferencia de stock y
+          recalcula sus ventas (los posteriores no cambian: su stock inicial
+          viene del conteo del día anterior, que no se tocó);
+        - si no hay un día posterior, la diferencia se suma al stock actual.
+        Devuelve ({id_prod: diferencia}, True si se tocó el stock actual).
+        """
         cursor.execute("""
-        SELECT SUM(ingresos_calculados) FROM cierre_diario
-        WHERE fecha >= date('now', '-7 days')
+        CREATE TEMP TABLE IF NOT EXISTS delta_cierre (
+            id_prod INTEGER PRIMARY KEY,
+            delta INTEGER NOT NULL
+        )
         """)
-        resultado = cursor.fetchone()[0]
-# ... (código existente sin cambios) ...
-        return resultado if resultado else 0
+        cursor.execute("DELETE FROM temp.delta_cierre")
+        cursor.execute("""
+        INSERT INTO temp.delta_cierre (id_prod, delta)
+        SELECT cd.id_producto, COALESCE(c.cantidad, 0) - cd.stock_final_conteo
+        FROM cierre_diario cd
+        LEFT JOIN temp.conteo_cierre c ON c.id_prod = cd.id_producto
+        WHERE cd.fecha = ? AND cd.stock_final_conteo != COALESCE(c.cantidad, 0)
+        """, (fecha,))
 
-    def get_pagos_semana(self):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+        # Precio unitario con el que se cerró (el del catálogo si ese día no hubo ventas)
+        delta = "(SELECT d.delta FROM temp.delta_cierre d WHERE d.id_prod = cierre_diario.id_producto)"
+        precio = """CASE WHEN ventas_calculadas > 0 THEN ingresos_calculados / ventas_calculadas
+                    ELSE (SELECT p.precio FROM productos p WHERE p.id_prod = cierre_diario.id_producto) END"""
+        cursor.execute(f"""
+        UPDATE cierre_diario SET
+            stock_final_conteo = stock_final_conteo + {delta},
+            ventas_calculadas = MAX(stock_inicial + produccion_dia - stock_final_conteo - {delta}, 0),
+            ingresos_calculados = MAX(stock_inicial + produccion_dia - stock_final_conteo - {delta}, 0) * {precio}
+        WHERE fecha = ? AND id_producto IN (SELECT id_prod FROM temp.delta_cierre)
+        """, (fecha,))
+        self._actualizar_resumen_ingresos(cursor, fecha)
+
+        cursor.execute("SELECT MIN(fecha) FROM cierre_diario WHERE fecha > ?", (fecha,))
+        siguiente = cursor.fetchone()[0]
+        if siguiente is not None:
+            cursor.execute(f"""
+            UPDATE cierre_diario SET
+                stock_inicial = stock_inicial + {delta},
+                ventas_calculadas = MAX(stock_inicial + {delta} + produccion_dia - stock_final_conteo, 0),
+                ingresos_calculados = MAX(stock_inicial + {delta} + produccion_dia - stock_final_conteo, 0) * {precio}
+            WHERE fecha = ? AND id_producto IN (SELECT id_prod FROM temp.delta_cierre)
+            """, (siguiente,))
+            self._actualizar_resumen_ingresos(cursor, siguiente)
+        else:
+            cursor.execute("""
+            UPDATE productos SET
+                stock = stock + (SELECT d.delta FROM temp.delta_cierre d WHERE d.id_prod = productos.id_prod)
+            WHERE id_prod IN (SELECT id_prod FROM temp.delta_cierre)
+            """)
+
+        cursor.execute("SELECT id_prod, delta FROM temp.delta_cierre")
+        return dict(cursor.fetchall()), siguiente is None
+
+    def _registrar_diario_cierre(self, cursor, fecha, accion, conteo_final):
+        conteo = json.dumps({str(id_prod): cantidad for id_prod, cantidad in sorted(conteo_final.items())},
+                            separators=(",", ":"))
+        cursor.execute("""
+        INSERT INTO diario_cierres (fecha, accion, huella, productos, conteo)
+        VALUES (?, ?, ?, ?, ?)
+        """, (fecha, accion, hashlib.sha256(conteo.encode()).hexdigest(), len(conteo_final), conteo))
+
+    def get_diario_cierres(self, fecha=None):
+        """
+        Registros del diario de cierres (de 'fecha', o todos), del más antiguo
+        al más reciente; 'conteo' vuelve como {id_prod: cantidad}.
+        """
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            query = "SELECT id_registro, fecha, momento, accion, huella, productos, conteo FROM diario_cierres"
+            parametros = ()
+            if fecha is not None:
+                query += " WHERE fecha = ?"
+                parametros = (str(fecha),)
+            cursor.execute(query + " ORDER BY id_registro", parametros)
+            columnas = [desc[0] for desc in cursor.description]
+            registros = [dict(zip(columnas, row)) for row in cursor.fetchall()]
+        for registro in registros:
+            registro["conteo"] = {int(k): v for k, v in json.loads(registro["conteo"]).items()}
+        return registros
+
+    def reaplicar_cierre(self, fecha):
+        """Vuelve a aplicar el último conteo registrado para 'fecha' (no hace nada si ya está aplicado)."""
+        registros = self.get_diario_cierres(fecha)
+        if not registros:
+            return False, f"No hay conteos registrados para el {fecha}."
+        return self.realizar_cierre_diario(fecha, registros[-1]["conteo"])
+
+    def _catalogo_sumar_stock(self, deltas):
+        def sumar(producto):
+            producto.stock += deltas[producto.id_prod]
+
+        self.catalogo.modificar(deltas, sumar)
+
+    def _catalogo_aplicar_cierre(self, conteo_final):
+        def cerrar(producto):
+            producto.stock = conteo_final.get(producto.id_prod, 0)
+            producto.produccion_dia = 0
+            producto.vendido_dia = 0
+
+        self.catalogo.modificar([p.id_prod for p in self.catalogo.listar(ver_ocultos=True)], cerrar)
+
+    def _cargar_conteo_temporal(self, cursor, conteo_final):
+        """Carga el conteo {id_prod: cantidad} en la tabla temporal 'conteo_cierre'."""
         cursor.execute("""
-        SELECT SUM(monto) FROM pagos
-        WHERE fecha >= date('now', '-7 days')
+        CREATE TEMP TABLE IF NOT EXISTS conteo_cierre (
+            id_prod INTEGER PRIMARY KEY,
+            cantidad INTEGER NOT NULL
+        )
         """)
-        resultado = cursor.fetchone()[0]
-# ... (código existente sin cambios) ...
-        return resultado if resultado else 0
+        cursor.execute("DELETE FROM temp.conteo_cierre")
+        cursor.executemany(
+            "INSERT INTO temp.conteo_cierre (id_prod, cantidad) VALUES (?, ?)",
+            conteo_final.items()
+        )
+
+    # --- Resúmenes diarios ---
+
+    def _actualizar_resumen_ingresos(self, cursor, fecha):
+        """Recalcula la fila de resumen de ingresos de 'fecha' (dentro de la transacción en curso)."""
+        cursor.execute("""
+        INSERT INTO resumen_ingresos_dia (fecha, ingresos, ventas)
+        SELECT fecha, SUM(ingresos_calculados), SUM(ventas_calculadas)
+        FROM cierre_diario WHERE fecha = ? GROUP BY fecha
+        ON CONFLICT(fecha) DO UPDATE SET
+            ingresos=excluded.ingresos,
+            ventas=excluded.ventas
+        """, (fecha,))
+
+    def _sumar_pago_resumen(self, cursor, id_pago):
+        """Acumula el pago recién insertado en su fila de resumen (dentro de la transacción en curso)."""
+        cursor.execute("""
+        INSERT INTO resumen_pagos_dia (fecha, tipo, tipo_pago_realizado, total, cantidad)
+        SELECT date(fecha, 'localtime'), tipo, tipo_pago_realizado, monto, 1
+        FROM pagos WHERE id_pago = ?
+        ON CONFLICT(fecha, tipo, tipo_pago_realizado) DO UPDATE SET
+            total = total + excluded.total,
+            cantidad = cantidad + 1
+        """, (id_pago,))
+
+    def verificar_resumenes(self):
+        """
+        Compara las tablas de resumen con un recálculo desde 'cierre_diario' y 'pagos'.
+        Devuelve una lista de diferencias (vacía si todo coincide).
+        """
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_RESUMEN_INGRESOS_ORIGEN)
+            ingresos_origen = {f: (i, v) for f, i, v in cursor.fetchall()}
+            cursor.execute("SELECT fecha, ingresos, ventas FROM resumen_ingresos_dia")
+            ingresos_resumen = {f: (i, v) for f, i, v in cursor.fetchall()}
+            cursor.execute(SQL_RESUMEN_PAGOS_ORIGEN)
+            pagos_origen = {(f, t, tp): (m, c) for f, t, tp, m, c in cursor.fetchall()}
+            cursor.execute("SELECT fecha, tipo, tipo_pago_realizado, total, cantidad FROM resumen_pagos_dia")
+            pagos_resumen = {(f, t, tp): (m, c) for f, t, tp, m, c in cursor.fetchall()}
+
+        diferencias = []
+        for nombre, origen, resumen in (("ingresos", ingresos_origen, ingresos_resumen),
+                                        ("pagos", pagos_origen, pagos_resumen)):
+            for clave in sorted(set(origen) | set(resumen)):
+                esperado = origen.get(clave, (0, 0))
+                guardado = resumen.get(clave, (0, 0))
+                # Las sumas en coma flotante pueden diferir en el último decimal según el orden
+                if abs(esperado[0] - guardado[0]) > 1e-6 or esperado[1] != guardado[1]:
+                    diferencias.append((nombre, clave, esperado, guardado))
+        return diferencias
+
+    @_escritura
+    def reconstruir_resumenes(self):
+        """Recalcula las tablas de resumen desde cero y verifica el resultado."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM resumen_ingresos_dia")
+            cursor.execute("DELETE FROM resumen_pagos_dia")
+            cursor.execute("INSERT INTO resumen_ingresos_dia (fecha, ingresos, ventas) " + SQL_RESUMEN_INGRESOS_ORIGEN)
+            dias = cursor.rowcount
+            cursor.execute("INSERT INTO resumen_pagos_dia (fecha, tipo, tipo_pago_realizado, total, cantidad) " + SQL_RESUMEN_PAGOS_ORIGEN)
+            filas_pagos = cursor.rowcount
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            return False, f"Error al reconstruir resúmenes: {e}"
+
+        diferencias = self.verificar_resumenes()
+        if diferencias:
+            return False, f"Resúmenes reconstruidos pero con {len(diferencias)} diferencias."
+        return True, f"Resúmenes reconstruidos y verificados: {dias} días de ingresos, {filas_pagos} filas de pagos."
+
+    def get_cierres_por_rango(self, fecha_inicio, fecha_fin, modo=None):
+        return self._leer(SQL_CIERRES_POR_RANGO, (fecha_inicio, fecha_fin), "cierre_diario", modo)
+
+    # --- Lectura por lotes (para modelos de tabla) ---
+
+    def _paginar(self, sql, parametros, tamano_lote):
+        """
+        Genera lotes de tuplas de 'sql' con una consulta corta por lote, de modo
+        que ninguna conexión de lectura queda retenida entre un lote y el siguiente.
+        """
+        desplazamiento = 0
+        while True:
+            with self._conexion_lectura() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql + " LIMIT ? OFFSET ?", (*parametros, tamano_lote, desplazamiento))
+                lote = cursor.fetchall()
+            if lote:
+                yield lote
+            if len(lote) < tamano_lote:
+                return
+            desplazamiento += tamano_lote
+
+    def get_pagina_cierres(self, fecha_inicio, fecha_fin, cursor=None, tamano_pagina=500):
+        """
+        Una página del historial de cierres en el orden de get_cierres_por_rango.
+        'cursor' es la clave (fecha, nombre_producto) devuelta por la página
+        anterior (None = primera página). Devuelve (filas, siguiente_cursor),
+        con siguiente_cursor None cuando ya no quedan filas.
+        """
+        fecha, nombre = cursor or (FECHA_MAXIMA, "")
+        with self._conexion_lectura() as conn:
+            cur = conn.cursor()
+            cur.execute(SQL_PAGINA_CIERRES, (fecha_inicio, fecha_fin, fecha, nombre, tamano_pagina))
+            pagina = cur.fetchall()
+        siguiente = (pagina[-1][0], pagina[-1][1]) if len(pagina) == tamano_pagina else None
+        return pagina, siguiente
+
+    def iter_cierres_por_rango(self, fecha_inicio, fecha_fin, tamano_lote=500):
+        """Mismas filas que get_cierres_por_rango, como lotes de tuplas (una página por lote)."""
+        cursor = None
+        while True:
+            pagina, cursor = self.get_pagina_cierres(fecha_inicio, fecha_fin, cursor, tamano_lote)
+            if pagina:
+                yield pagina
+            if cursor is None:
+                return
+
+    def iter_productos(self, ver_ocultos=False, tamano_lote=500):
+        if self.catalogo is not None:
+            # Los registros se convierten al pedir cada lote, así reflejan cambios posteriores
+            productos = self._catalogo_cargado().listar(ver_ocultos)
+            return ([p.como_fila_tabla() for p in productos[i:i + tamano_lote]]
+                    for i in range(0, len(productos), tamano_lote))
+        filtro = "" if ver_ocultos else "WHERE oculto = 0"
+        return self._paginar(SQL_TABLA_PRODUCTOS.format(filtro=filtro), (), tamano_lote)
+
+    def iter_trabajadores(self, ver_inactivos=False, tamano_lote=500):
+        filtro = "" if ver_inactivos else "WHERE activo = 1"
+        return self._paginar(SQL_TABLA_TRABAJADORES.format(filtro=filtro), (), tamano_lote)
+
+    def iter_proveedores(self, ver_inactivos=False, tamano_lote=500):
+        filtro = "" if ver_inactivos else "WHERE activo = 1"
+        return self._paginar(SQL_TABLA_PROVEEDORES.format(filtro=filtro), (), tamano_lote)
+
+    def get_cuadre_caja(self, desde, hasta, periodo="dia"):
+        """
+        Cuadre de caja entre 'desde' y 'hasta' (inclusive) agrupado por
+        'periodo' ("dia", "semana" o "mes"). Devuelve una lista ordenada de
+        dicts, uno por período con movimientos:
+        {"periodo": primer día del período, "ingresos", "pagos",
+         "pagos_por_tipo": {(tipo, tipo_pago_realizado): total},
+         "cantidad_pagos", "balance"}.
+        """
+        if periodo not in PERIODOS_CUADRE:
+            raise ValueError(f"Período desconocido: {periodo} (opciones: {', '.join(PERIODOS_CUADRE)})")
+        rango = (str(desde), str(hasta))
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_CUADRE_CAJA.format(periodo=PERIODOS_CUADRE[periodo]), rango * 2)
+            filas_cuadre = cursor.fetchall()
+
+        baldes = {}
+        for clave, tipo, tipo_pago, ingresos, pagos, cantidad in filas_cuadre:
+            balde = baldes.get(clave)
+            if balde is None:
+                balde = baldes[clave] = {"periodo": clave, "ingresos": 0.0, "pagos": 0.0,
+                                         "pagos_por_tipo": {}, "cantidad_pagos": 0, "balance": 0.0}
+            if tipo is None:
+                balde["ingresos"] += ingresos
+            else:
+                balde["pagos"] += pagos
+                balde["pagos_por_tipo"][(tipo, tipo_pago)] = pagos
+                balde["cantidad_pagos"] += cantidad
+        for balde in baldes.values():
+            balde["balance"] = balde["ingresos"] - balde["pagos"]
+        return list(baldes.values())
+
+    def _ultimos_siete_dias(self):
+        hoy = datetime.date.today()
+        return self.get_cuadre_caja(hoy - datetime.timedelta(days=6), hoy, "mes")
+
+    def get_ingresos_calculados_semana(self):
+        """Ingresos de los últimos 7 días (hoy incluido)."""
+        return sum(balde["ingresos"] for balde in self._ultimos_siete_dias())
+
+    def get_pagos_semana(self):
+        """Pagos de los últimos 7 días (hoy incluido)."""
+        return sum(balde["pagos"] for balde in self._ultimos_siete_dias())
 
     # --- Métodos de Trabajadores (MODIFICADOS) ---
 
+    @_escritura
     def add_trabajador(self, nombre, contacto, cargo, salario, tipo_pago):
 # ... (código existente sin cambios) ...
         try:
@@ -310,17 +1354,13 @@ class DatabaseManager:
             self.conn.rollback()
             return False, f"Error: {e}"
 
-    def get_trabajadores(self, ver_inactivos=False):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+    def get_trabajadores(self, ver_inactivos=False, modo=None):
         query = "SELECT * FROM trabajadores"
         if not ver_inactivos:
             query += " WHERE activo = 1"
-        cursor.execute(query)
-# ... (código existente sin cambios) ...
-        columnas = [desc[0] for desc in cursor.description]
-        return [dict(zip(columnas, row)) for row in cursor.fetchall()]
+        return self._leer(query, (), "trabajadores", modo)
 
+    @_escritura
     def toggle_trabajador_activo(self, id_trab):
 # ... (código existente sin cambios) ...
         try:
@@ -334,6 +1374,7 @@ class DatabaseManager:
 # ... (código existente sin cambios) ...
             return False, f"Error: {e}"
 
+    @_escritura_agrupable
     def registrar_pago_trabajador(self, id_trab, nombre, monto, tipo_pago_realizado):
 # ... (código existente sin cambios) ...
         try:
@@ -342,16 +1383,18 @@ class DatabaseManager:
             INSERT INTO pagos (tipo, id_entidad, nombre_entidad, monto, tipo_pago_realizado) 
             VALUES ('Trabajador', ?, ?, ?, ?)
             """, (id_trab, nombre, monto, tipo_pago_realizado))
+            self._sumar_pago_resumen(cursor, cursor.lastrowid)
 # ... (código existente sin cambios) ...
-            self.conn.commit()
+            self._confirmar()
             return True, f"Pago de ${monto} ({tipo_pago_realizado}) registrado a {nombre}."
         except sqlite3.Error as e:
 # ... (código existente sin cambios) ...
-            self.conn.rollback()
+            self._revertir()
             return False, f"Error: {e}"
 
     # --- Métodos de Proveedores (MODIFICADOS) ---
 
+    @_escritura
     def add_proveedor(self, nombre, contacto, producto_suministrado):
         try:
             cursor = self.conn.cursor()
@@ -365,17 +1408,13 @@ class DatabaseManager:
             self.conn.rollback()
             return False, f"Error: {e}"
             
-    def get_proveedores(self, ver_inactivos=False):
-# ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
+    def get_proveedores(self, ver_inactivos=False, modo=None):
         query = "SELECT * FROM proveedores"
         if not ver_inactivos:
             query += " WHERE activo = 1"
-        cursor.execute(query)
-# ... (código existente sin cambios) ...
-        columnas = [desc[0] for desc in cursor.description]
-        return [dict(zip(columnas, row)) for row in cursor.fetchall()]
+        return self._leer(query, (), "proveedores", modo)
 
+    @_escritura
     def toggle_proveedor_activo(self, id_prov):
 # ... (código existente sin cambios) ...
         try:
@@ -389,6 +1428,7 @@ class DatabaseManager:
 # ... (código existente sin cambios) ...
             return False, f"Error: {e}"
             
+    @_escritura_agrupable
     def registrar_pago_proveedor(self, id_prov, nombre, monto):
 # ... (código existente sin cambios) ...
         try:
@@ -398,40 +1438,153 @@ class DatabaseManager:
             INSERT INTO pagos (tipo, id_entidad, nombre_entidad, monto, tipo_pago_realizado) 
             VALUES ('Proveedor', ?, ?, ?, 'Factura')
             """, (id_prov, nombre, monto))
+            self._sumar_pago_resumen(cursor, cursor.lastrowid)
 # ... (código existente sin cambios) ...
-            self.conn.commit()
+            self._confirmar()
             return True, f"Pago de ${monto} registrado a {nombre}."
         except sqlite3.Error as e:
 # ... (código existente sin cambios) ...
-            self.conn.rollback()
+            self._revertir()
             return False, f"Error: {e}"
             
-    # --- Métodos de Reportes (MODIFICADOS) ---
-    def get_datos_reporte_ventas(self):
-# ... (código existente sin cambios) ...
+    def get_estadisticas(self):
+        """
+        Resumen del contenido de la base: cantidades por tabla (total y
+        visibles/activos), rango de días cerrados, totales de ingresos y
+        pagos, versión del esquema y tamaño del archivo en bytes.
+        """
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            estadisticas = {}
+            for tabla, filtro in (("productos", "oculto = 0"), ("trabajadores", "activo = 1"),
+                                  ("proveedores", "activo = 1")):
+                cursor.execute(f"SELECT COUNT(*), COALESCE(SUM({filtro}), 0) FROM {tabla}")
+                estadisticas[tabla], estadisticas[f"{tabla}_visibles"] = cursor.fetchone()
+            cursor.execute("SELECT COUNT(*) FROM cierre_diario")
+            estadisticas["filas_cierre"] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*), MIN(fecha), MAX(fecha), COALESCE(SUM(ingresos), 0) FROM resumen_ingresos_dia")
+            (estadisticas["dias_cerrados"], estadisticas["primer_cierre"],
+             estadisticas["ultimo_cierre"], estadisticas["ingresos_total"]) = cursor.fetchone()
+            cursor.execute("SELECT COALESCE(SUM(cantidad), 0), COALESCE(SUM(total), 0) FROM resumen_pagos_dia")
+            estadisticas["pagos"], estadisticas["pagos_total"] = cursor.fetchone()
+            cursor.execute("PRAGMA user_version")
+            estadisticas["version_esquema"] = cursor.fetchone()[0]
+            cursor.execute("SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()")
+            estadisticas["tamano_bytes"] = cursor.fetchone()[0]
+        return estadisticas
+
+    # --- Importación masiva (ver core.importar) ---
+
+    @_escritura
+    def importar_productos(self, filas):
+        """
+        Inserta o actualiza por nombre un lote de productos en una sola
+        transacción. 'filas' son dicts con las claves de SQL_IMPORTAR_PRODUCTOS.
+        Devuelve (aplicadas, [(posición en el lote, mensaje de error)]).
+        """
+        aplicadas, errores = self._importar_lote(SQL_IMPORTAR_PRODUCTOS, filas)
+        if self.catalogo is not None and aplicadas:
+            self.catalogo.invalidar()
+        return aplicadas, errores
+
+    @_escritura
+    def importar_trabajadores(self, filas):
+        """Como importar_productos; actualiza por id_trab si viene, si no inserta."""
+        return self._importar_lote(SQL_IMPORTAR_TRABAJADORES, filas)
+
+    @_escritura
+    def importar_proveedores(self, filas):
+        """Como importar_productos; actualiza por id_prov si viene, si no inserta."""
+        return self._importar_lote(SQL_IMPORTAR_PROVEEDORES, filas)
+
+    def _importar_lote(self, sql, filas):
         cursor = self.conn.cursor()
-        cursor.execute("""
-        SELECT fecha, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados
-        FROM cierre_diario ORDER BY fecha DESC
-        """)
-        columnas = [desc[0] for desc in cursor.description]
-# ... (código existente sin cambios) ...
-        return [dict(zip(columnas, row)) for row in cursor.fetchall()]
+        try:
+            cursor.executemany(sql, filas)
+            self.conn.commit()
+            return len(filas), []
+        except sqlite3.Error:
+            self.conn.rollback()
+
+        # Alguna fila falló: se repite el lote de a una para aislar los errores
+        # sin perder las demás (una sentencia fallida no deshace la transacción)
+        errores = []
+        try:
+            for posicion, fila in enumerate(filas):
+                try:
+                    cursor.execute(sql, fila)
+                except sqlite3.Error as e:
+                    errores.append((posicion, f"Error de base de datos: {e}"))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            return 0, [(posicion, f"Error de base de datos: {e}") for posicion in range(len(filas))]
+        return len(filas) - len(errores), errores
+
+    # --- Métodos de Reportes (MODIFICADOS) ---
+    def get_datos_reporte_ventas(self, modo=None):
+        return self._leer(SQL_CIERRES_POR_RANGO, (FECHA_MINIMA, FECHA_MAXIMA), "cierre_diario", modo)
+
+    def contar_cierres(self, fecha_inicio=None, fecha_fin=None):
+        """Cantidad de filas de cierre_diario en el rango (todo el historial si no se indica)."""
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM cierre_diario WHERE fecha BETWEEN ? AND ?",
+                           (fecha_inicio or FECHA_MINIMA, fecha_fin or FECHA_MAXIMA))
+            return cursor.fetchone()[0]
+
+    def iter_datos_reporte_ventas(self, fecha_inicio=None, fecha_fin=None, tamano_lote=5000):
+        """
+        Recorre el reporte de cierres en lotes de tuplas (columnas de
+        COLUMNAS_REPORTE_VENTAS) sin materializar todo el historial.
+        Cada lote es una página de get_pagina_cierres: ninguna conexión (ni,
+        sin pool, el bloqueo de escritura) queda tomada entre un lote y otro.
+        """
+        yield from self.iter_cierres_por_rango(fecha_inicio or FECHA_MINIMA, fecha_fin or FECHA_MAXIMA, tamano_lote)
+
+    def get_ultimo_resumen_ingresos(self):
+        """(fecha, ingresos) del último día cerrado, o None si no hay cierres."""
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT fecha, ingresos FROM resumen_ingresos_dia ORDER BY fecha DESC LIMIT 1")
+            return cursor.fetchone()
+
+    def get_primer_dia_cerrado_desde(self, id_registro=0):
+        """
+        (último id_registro de diario_cierres, fecha más antigua cerrada o
+        corregida después de 'id_registro', o None si no hubo ninguna). Una
+        corrección cambia los ingresos de ese día y del siguiente cerrado: se
+        releen los resúmenes desde la fecha devuelta.
+        """
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+            SELECT COALESCE(MAX(id_registro), ?), MIN(fecha) FROM diario_cierres WHERE id_registro > ?
+            """, (id_registro, id_registro))
+            return cursor.fetchone()
+
+    def get_ingresos_por_dia(self, desde, hasta=None):
+        """Lista de (fecha, ingresos) por día cerrado entre 'desde' y 'hasta' (inclusive)."""
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+            SELECT fecha, ingresos FROM resumen_ingresos_dia
+            WHERE fecha BETWEEN ? AND ?
+            ORDER BY fecha ASC
+            """, (desde, hasta or FECHA_MAXIMA))
+            return cursor.fetchall()
 
     def get_datos_grafico_ventas(self):
 # ... (código existente sin cambios) ...
-        cursor = self.conn.cursor()
-        # Agrupar ingresos por día
-        cursor.execute("""
-        SELECT fecha as dia, SUM(ingresos_calculados) as total_dia
-        FROM cierre_diario
-# ... (código existente sin cambios) ...
-        WHERE fecha >= date('now', '-30 days')
-        GROUP BY dia
-        ORDER BY dia ASC
-        """)
-        return cursor.fetchall()
-        
+        with self._conexion_lectura() as conn:
+            cursor = conn.cursor()
+            # Agrupar ingresos por día
+            cursor.execute(SQL_GRAFICO_VENTAS)
+            return cursor.fetchall()
+            
     def close(self):
-# ... (código existente sin cambios) ...
+        if self._pool is not None:
+            self._pool.cerrar()
+        if self._conn_version is not None:
+            self._conn_version.close()
         self.conn.close()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import csv
+import importlib.util
+import os
+
+from core.database import COLUMNAS_REPORTE_VENTAS
+
+# Límite de filas de una hoja de Excel (incluida la cabecera)
+MAX_FILAS_HOJA = 1048576
+
+
+def formatos_disponibles():
+    """Extensiones que se pueden exportar; .xlsx solo si openpyxl está instalado (sin importarlo)."""
+    return [".csv"] + ([".xlsx"] if importlib.util.find_spec("openpyxl") is not None else [])
+
+
+def exportar_cierres(db, ruta, fecha_inicio=None, fecha_fin=None, progreso=None, tamano_lote=5000):
+    """
+    Exporta el reporte de cierres a 'ruta' (.csv o .xlsx) en streaming: las
+    filas se leen del cursor por lotes y se escriben directamente, así que la
+    memoria no crece con el tamaño del historial.
+
+    'progreso(hecho, total)' se llama después de cada lote. El archivo se
+    escribe en una ruta temporal y solo reemplaza al destino si termina bien.
+    Devuelve la cantidad de filas exportadas.
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in (".csv", ".xlsx"):
+        raise ValueError(f"Formato no soportado: '{extension}'. Use .csv o .xlsx")
+    if extension not in formatos_disponibles():
+        raise ValueError("No se puede exportar a .xlsx: instale openpyxl o use .csv")
+
+    total = db.contar_cierres(fecha_inicio, fecha_fin)
+    lotes = db.iter_datos_reporte_ventas(fecha_inicio, fecha_fin, tamano_lote)
+    temporal = ruta + ".tmp"
+    try:
+        if extension == ".csv":
+            filas = _escribir_csv(temporal, lotes, total, progreso)
+        else:
+            filas = _escribir_xlsx(temporal, lotes, total, progreso)
+        os.replace(temporal, ruta)
+        return filas
+    finally:
+        lotes.close()
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _escribir_csv(ruta, lotes, total, progreso):
+    filas = 0
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS_REPORTE_VENTAS)
+        for lote in lotes:
+            escritor.writerows(lote)
+            filas += len(lote)
+            if progreso:
+                progreso(filas, total)
+    return filas
+
+
+def _escribir_xlsx(ruta, lotes, total, progreso):
+    # openpyxl solo se importa si de verdad se exporta a Excel
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = None
+    filas_hoja = MAX_FILAS_HOJA
+    filas = 0
+    for lote in lotes:
+        for fila in lote:
+            if filas_hoja >= MAX_FILAS_HOJA:
+                # Hoja llena (o primera hoja): continuar en una nueva
+                numero = len(libro.worksheets) + 1
+                hoja = libro.create_sheet("CierresDiarios" if numero == 1 else f"CierresDiarios_{numero}")
+                hoja.append(COLUMNAS_REPORTE_VENTAS)
+                filas_hoja = 1
+            hoja.append(fila)
+            filas_hoja += 1
+        filas += len(lote)
+        if progreso:
+            progreso(filas, total)
+
+    if hoja is None:
+        hoja = libro.create_sheet("CierresDiarios")
+        hoja.append(COLUMNAS_REPORTE_VENTAS)
+    libro.save(ruta)
+    return filas
@@ -0,0 +1,91 @@
+import sqlite3
+import sys
+from array import array
+from collections import namedtuple
+
+# --- Representación de filas de las lecturas ---
+# "dict"      lista de diccionarios {columna: valor} (compatibilidad, el más costoso)
+# "row"       lista de sqlite3.Row (acceso por índice y por nombre, sin copiar)
+# "registro"  lista de namedtuple por tabla (compacto, acceso por atributo)
+# "columnar"  un solo namedtuple por tabla cuyos campos son columnas completas:
+#             array('q') para enteros, array('d') para reales, listas para el resto
+#             (y para todas si no hay filas: sin valores no se sabe el tipo)
+MODOS = ("dict", "row", "registro", "columnar")
+
+_registros = {}
+
+
+def validar_modo(modo):
+    if modo not in MODOS:
+        raise ValueError(f"Modo de filas desconocido: {modo} (opciones: {', '.join(MODOS)})")
+    return modo
+
+
+def registro(tabla, columnas):
+    """namedtuple para las columnas de 'tabla', creado una vez por combinación de columnas."""
+    clave = (tabla, columnas)
+    tipo = _registros.get(clave)
+    if tipo is None:
+        nombre = "".join(parte.capitalize() for parte in tabla.split("_"))
+        tipo = _registros[clave] = namedtuple(nombre, columnas)
+    return tipo
+
+
+def preparar(cursor, modo):
+    """Ajusta el cursor antes de ejecutar la consulta (solo el modo "row" lo necesita)."""
+    if validar_modo(modo) == "row":
+        cursor.row_factory = sqlite3.Row
+    return cursor
+
+
+def leer(cursor, modo, tabla, tamano_lote=10000):
+    """Lee todas las filas pendientes de un cursor ya ejecutado en el modo pedido."""
+    if modo == "row":
+        return cursor.fetchall()
+    columnas = tuple(desc[0] for desc in cursor.description)
+    if modo == "columnar":
+        buffers = None
+        while True:
+            lote = cursor.fetchmany(tamano_lote)
+            if not lote:
+                break
+            buffers = [_agregar(buffer, valores) for buffer, valores
+                       in zip(buffers or [array('q') for _ in columnas], zip(*lote))]
+        return registro(tabla, columnas)(*(buffers or [[] for _ in columnas]))
+    return convertir(columnas, cursor.fetchall(), modo, tabla)
+
+
+def convertir(columnas, filas, modo, tabla):
+    """Convierte tuplas ya leídas (p. ej. de una caché) a los modos "dict", "registro" o "columnar"."""
+    if modo == "dict":
+        return [dict(zip(columnas, fila)) for fila in filas]
+    if modo == "registro":
+        return list(map(registro(tabla, columnas)._make, filas))
+    if modo == "columnar":
+        buffers = [_agregar(array('q'), valores) for valores in zip(*filas)] if filas else [[] for _ in columnas]
+        return registro(tabla, columnas)(*buffers)
+    raise ValueError(f"El modo {modo} no admite filas ya leídas")
+
+
+def _agregar(buffer, valores):
+    """
+    Agrega 'valores' al final de la columna. Si no entran en su tipo actual la
+    columna pasa a uno más general: enteros -> reales -> lista de objetos.
+    """
+    tipo = buffer.typecode if isinstance(buffer, array) else None
+    while tipo is not None:
+        try:
+            nuevos = array(tipo, valores)
+        except (TypeError, OverflowError):
+            tipo = "d" if tipo == "q" else None
+            continue
+        if tipo != buffer.typecode:
+            buffer = array(tipo, buffer)
+        buffer.extend(nuevos)
+        return buffer
+
+    if isinstance(buffer, array):
+        buffer = list(buffer)
+    # Fechas y nombres se repiten mucho: internarlos evita una copia por fila
+    buffer.extend(sys.intern(v) if isinstance(v, str) else v for v in valores)
+    return buffer
@@ -0,0 +1,262 @@
+import csv
+import os
+
+# Filas por transacción al importar
+TAMANO_LOTE = 5000
+
+# Separadores de columna aceptados, en orden de preferencia
+SEPARADORES = (",", ";", "\t")
+
+
+# --- Conversores de celdas ---
+# Reciben el texto ya sin espacios (nunca vacío) y lanzan ValueError con un
+# mensaje para el usuario si el valor no sirve.
+
+def _texto(valor):
+    return valor
+
+
+def _entero(valor):
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ValueError(f"'{valor}' no es un número entero") from None
+    if numero < 0:
+        raise ValueError(f"{numero} no puede ser negativo")
+    return numero
+
+
+def _real(valor):
+    # Acepta coma decimal ("12,50"), habitual en planillas en español, y
+    # separador de miles si también hay decimales ("1.234,50" o "1,234.50"):
+    # el último de los dos signos es el decimal
+    texto = valor
+    if "," in texto and "." in texto:
+        decimal = "," if texto.rfind(",") > texto.rfind(".") else "."
+        entero, _, fraccion = texto.rpartition(decimal)
+        grupos = entero.split("." if decimal == "," else ",")
+        if not (1 <= len(grupos[0].lstrip("+-")) <= 3 and all(len(g) == 3 for g in grupos[1:])):
+            raise ValueError(f"'{valor}' no es un número")
+        texto = "".join(grupos) + "." + fraccion
+    elif "," in texto:
+        texto = texto.replace(",", ".")
+    try:
+        numero = float(texto)
+    except ValueError:
+        raise ValueError(f"'{valor}' no es un número") from None
+    if numero < 0:
+        raise ValueError(f"{numero} no puede ser negativo")
+    return numero
+
+
+def _booleano(valor):
+    normal = valor.lower()
+    if normal in ("1", "si", "sí", "s", "true", "verdadero", "x"):
+        return 1
+    if normal in ("0", "no", "n", "false", "falso"):
+        return 0
+    raise ValueError(f"'{valor}' no es sí/no")
+
+
+def _tipo_pago(valor):
+    for opcion in ("Semanal", "Diario"):
+        if valor.lower() == opcion.lower():
+            return opcion
+    raise ValueError(f"'{valor}' no es Semanal ni Diario")
+
+
+# {tipo: (método de DatabaseManager, {columna: (conversor, obligatoria)})}
+# Las cabeceras del CSV son los nombres de columna de la tabla.
+TIPOS = {
+    "productos": ("importar_productos", {
+        "nombre": (_texto, True),
+        "precio": (_real, True),
+        "stock": (_entero, False),
+        "es_gaseosa": (_booleano, False),
+        "oculto": (_booleano, False),
+    }),
+    "trabajadores": ("importar_trabajadores", {
+        "id_trab": (_entero, False),
+        "nombre": (_texto, True),
+        "contacto": (_texto, False),
+        "cargo": (_texto, False),
+        "salario_semanal": (_real, False),
+        "tipo_pago": (_tipo_pago, False),
+        "activo": (_booleano, False),
+    }),
+    "proveedores": ("importar_proveedores", {
+        "id_prov": (_entero, False),
+        "nombre": (_texto, True),
+        "contacto": (_texto, False),
+        "producto_suministrado": (_texto, False),
+        "activo": (_booleano, False),
+    }),
+}
+
+COLUMNAS_CONTEO = {
+    "id_prod": (_entero, False),
+    "nombre": (_texto, False),
+    "cantidad": (_entero, True),
+}
+
+
+def _detectar_separador(linea, columnas):
+    """
+    Elige el separador de SEPARADORES con el que la línea de cabecera se parte
+    en columnas conocidas (si ninguno lo logra, el que da más columnas).
+    Mirar solo la cabecera evita que una fila corta o en blanco confunda la
+    detección, y que la coma decimal de los precios pase por separador.
+    """
+    mejor, puntaje_mejor = SEPARADORES[0], None
+    for separador in SEPARADORES:
+        celdas = [c.strip().lower() for c in next(csv.reader([linea], delimiter=separador), [])]
+        puntaje = (all(c in columnas for c in celdas), len(celdas))
+        if puntaje_mejor is None or puntaje > puntaje_mejor:
+            mejor, puntaje_mejor = separador, puntaje
+    return mejor
+
+
+def _leer_filas(archivo, columnas):
+    """
+    Recorre el CSV abierto y genera (línea, fila convertida o None, error o None).
+    La cabecera debe usar nombres de 'columnas'; el separador (',', ';' o
+    tabulador) se detecta en ella.
+    """
+    separador = _detectar_separador(archivo.readline(), columnas)
+    archivo.seek(0)
+    lector = csv.reader(archivo, delimiter=separador)
+
+    cabecera = [c.strip().lower() for c in next(lector, [])]
+    desconocidas = [c for c in cabecera if c not in columnas]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)} "
+                         f"(se esperan: {', '.join(columnas)})")
+    faltantes = [c for c, (_, obligatoria) in columnas.items() if obligatoria and c not in cabecera]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+    plan = [(columna, *columnas[columna]) for columna in cabecera]
+    for celdas in lector:
+        if len(celdas) != len(plan):
+            if celdas and any(c.strip() for c in celdas):
+                yield lector.line_num, None, f"se esperaban {len(plan)} columnas y hay {len(celdas)}"
+            continue  # líneas en blanco
+        fila = dict.fromkeys(columnas)
+        error = None
+        for (columna, conversor, obligatoria), celda in zip(plan, celdas):
+            celda = celda.strip()
+            if celda:
+                try:
+                    fila[columna] = conversor(celda)
+                except ValueError as e:
+                    error = f"{columna}: {e}"
+                    break
+            elif obligatoria:
+                error = f"{columna}: falta el valor"
+                break
+        if error is not None:
+            yield lector.line_num, None, error
+        else:
+            yield lector.line_num, fila, None
+
+
+def importar_csv(db, tipo, ruta, progreso=None, tamano_lote=TAMANO_LOTE):
+    """
+    Importa un CSV de 'tipo' ("productos", "trabajadores" o "proveedores")
+    en streaming: las filas se validan al leerlas y se insertan o actualizan
+    por lotes de 'tamano_lote', cada uno en su propia transacción.
+
+    Una fila inválida no detiene la importación: se informa con su número
+    de línea y se sigue con las demás. 'progreso(hecho, total)' se llama
+    después de cada lote con los bytes leídos del archivo; si lanza una
+    excepción (p. ej. al cancelar) los lotes ya aplicados quedan guardados.
+
+    Devuelve {"leidas": filas de datos, "aplicadas": filas guardadas,
+    "errores": [(línea, mensaje)]}.
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de importación desconocido: {tipo} (opciones: {', '.join(TIPOS)})")
+    nombre_metodo, columnas = TIPOS[tipo]
+    importar_lote = getattr(db, nombre_metodo)
+    total = os.path.getsize(ruta)
+    resultado = {"leidas": 0, "aplicadas": 0, "errores": []}
+
+    with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+        lote, lineas = [], []
+
+        def aplicar():
+            aplicadas, errores = importar_lote(lote)
+            resultado["aplicadas"] += aplicadas
+            resultado["errores"].extend((lineas[posicion], mensaje) for posicion, mensaje in errores)
+            lote.clear()
+            lineas.clear()
+            if progreso:
+                progreso(archivo.buffer.tell(), total)
+
+        for linea, fila, error in _leer_filas(archivo, columnas):
+            resultado["leidas"] += 1
+            if error is not None:
+                resultado["errores"].append((linea, error))
+                continue
+            lote.append(fila)
+            lineas.append(linea)
+            if len(lote) >= tamano_lote:
+                aplicar()
+        if lote:
+            aplicar()
+
+    resultado["errores"].sort()
+    return resultado
+
+
+def leer_conteo_csv(db, ruta, completar_con_stock=True):
+    """
+    Lee un CSV de conteo de stock con columnas 'cantidad' y 'id_prod' o
+    'nombre'. Devuelve (conteo {id_prod: cantidad}, [(línea, mensaje)]).
+
+    Con 'completar_con_stock', los productos visibles que no figuran en el
+    archivo se cuentan con su stock actual (como en CierreDialog); si no,
+    el cierre los toma como 0.
+    """
+    productos = db.get_productos(ver_ocultos=True)
+    por_nombre = {p["nombre"].lower(): p["id_prod"] for p in productos}
+    existentes = {p["id_prod"] for p in productos}
+    conteo, errores = {}, []
+
+    with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+        for linea, fila, error in _leer_filas(archivo, COLUMNAS_CONTEO):
+            if error is None:
+                id_prod = fila["id_prod"]
+                if id_prod is None and fila["nombre"] is not None:
+                    id_prod = por_nombre.get(fila["nombre"].lower())
+                if id_prod is None or id_prod not in existentes:
+                    error = f"producto desconocido: {fila['id_prod'] if fila['id_prod'] is not None else fila['nombre']}"
+                elif id_prod in conteo:
+                    error = f"el producto {id_prod} ya fue contado en otra línea"
+            if error is not None:
+                errores.append((linea, error))
+                continue
+            conteo[id_prod] = fila["cantidad"]
+
+    if completar_con_stock:
+        for p in productos:
+            if not p["oculto"]:
+                conteo.setdefault(p["id_prod"], p["stock"])
+    return conteo, errores
+
+
+def importar_conteo_csv(db, ruta, fecha, completar_con_stock=True, progreso=None):
+    """
+    Carga un CSV de conteo (ver leer_conteo_csv) y ejecuta con él
+    realizar_cierre_diario(fecha). Si alguna línea tiene errores el cierre
+    no se ejecuta. Devuelve (éxito, mensaje, [(línea, mensaje)]).
+    """
+    conteo, errores = leer_conteo_csv(db, ruta, completar_con_stock)
+    if progreso:
+        progreso(1, 2)
+    if errores:
+        return False, f"El conteo tiene {len(errores)} líneas con errores; no se realizó el cierre.", errores
+    exito, mensaje = db.realizar_cierre_diario(fecha, conteo)
+    if progreso:
+        progreso(2, 2)
+    return exito, mensaje, []
@@ -0,0 +1,308 @@
+import bisect
+import datetime
+import functools
+import inspect
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (ms) de los baldes del histograma de latencias; el último balde es "más lento"
+LIMITES_MS = (0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000)
+
+# Métodos de DatabaseManager que no se miden
+# version_datos y get_cambios_tablas se consultan a cada rato para decidir si
+# refrescar: medirlas solo agrega ruido. agrupar devuelve un administrador de
+# contexto; sus escrituras se miden una por una
+NO_MEDIR = {"close", "activar_instrumentacion", "desactivar_instrumentacion", "version_datos", "get_cambios_tablas",
+            "agrupar"}
+
+
+class _Estadistica:
+    """Acumulado de una operación: llamadas, errores, latencias y filas."""
+    __slots__ = ("llamadas", "errores", "total_ms", "max_ms", "filas", "histograma")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.filas = 0
+        self.histograma = [0] * (len(LIMITES_MS) + 1)
+
+    def agregar(self, ms, filas, error):
+        self.llamadas += 1
+        self.errores += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.filas += filas
+        self.histograma[bisect.bisect_left(LIMITES_MS, ms)] += 1
+
+    def percentil(self, p):
+        """Límite superior del balde donde cae el percentil 'p' (0-100); None si es el último."""
+        objetivo = self.llamadas * p / 100
+        acumulado = 0
+        for limite, cantidad in zip(LIMITES_MS, self.histograma):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return limite
+        return None
+
+    def como_dict(self):
+        return {
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "total_ms": self.total_ms,
+            "media_ms": self.total_ms / self.llamadas if self.llamadas else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "filas": self.filas,
+            "histograma": list(self.histograma),
+        }
+
+
+class Instrumentacion:
+    """
+    Mide las llamadas a los métodos públicos de un DatabaseManager y cada
+    sentencia que ejecutan sus cursores. Las sentencias que superan
+    'umbral_lento_ms' se guardan (con su EXPLAIN QUERY PLAN) en un registro
+    circular y se informan por logging.
+
+    Se instala reemplazando, solo en la instancia, los métodos y las
+    conexiones por envolturas; al desinstalarla la instancia vuelve a usar
+    los originales, así que desactivada no agrega ningún costo.
+    """
+    def __init__(self, umbral_lento_ms=100.0, max_lentas=200):
+        self.umbral_lento_ms = umbral_lento_ms
+        self._bloqueo = threading.Lock()
+        self._metodos = {}
+        self._sentencias = {}
+        self._lentas = deque(maxlen=max_lentas)
+        self._instalada_en = None
+        self._conn_original = None
+
+    # --- Instalación ---
+
+    def instalar(self, db):
+        self._instalada_en = db
+        self._conn_original = db.conn
+        db.conn = ConexionInstrumentada(db.conn, self)
+
+        conexion_lectura = db._conexion_lectura
+
+        @contextmanager
+        def conexion_lectura_instrumentada():
+            with conexion_lectura() as conn:
+                yield conn if isinstance(conn, ConexionInstrumentada) else ConexionInstrumentada(conn, self)
+
+        db._conexion_lectura = conexion_lectura_instrumentada
+        for nombre, _ in inspect.getmembers(type(db), inspect.isfunction):
+            if not nombre.startswith("_") and nombre not in NO_MEDIR:
+                setattr(db, nombre, self._envolver(nombre, getattr(db, nombre)))
+
+    def desinstalar(self):
+        db = self._instalada_en
+        if db is None:
+            return
+        for nombre, valor in list(vars(db).items()):
+            if nombre == "_conexion_lectura" or getattr(valor, "_instrumentado", False):
+                delattr(db, nombre)
+        db.conn = self._conn_original
+        self._instalada_en = None
+
+    def _envolver(self, nombre, metodo):
+        @functools.wraps(metodo)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            error = True
+            resultado = None
+            try:
+                resultado = metodo(*args, **kwargs)
+                # Los mutadores informan errores como (False, mensaje)
+                error = isinstance(resultado, tuple) and len(resultado) == 2 and resultado[0] is False
+                return resultado
+            finally:
+                ms = (time.perf_counter() - inicio) * 1000
+                filas = len(resultado) if isinstance(resultado, list) else 0
+                self._registrar(self._metodos, nombre, ms, filas, error)
+        envoltura._instrumentado = True
+        return envoltura
+
+    # --- Registro ---
+
+    def _registrar(self, tabla, clave, ms, filas, error=False):
+        with self._bloqueo:
+            estadistica = tabla.get(clave)
+            if estadistica is None:
+                estadistica = tabla[clave] = _Estadistica()
+            estadistica.agregar(ms, filas, error)
+
+    def registrar_sentencia(self, conn, sql, parametros, ms, filas, error):
+        sql_normal = " ".join(sql.split())
+        self._registrar(self._sentencias, sql_normal, ms, filas, error)
+        if ms < self.umbral_lento_ms:
+            return
+        plan = None
+        if parametros is not None:
+            try:
+                plan = [fila[3] for fila in conn.execute("EXPLAIN QUERY PLAN " + sql, parametros)]
+            except sqlite3.Error:
+                pass
+        lenta = {
+            "momento": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "sql": sql_normal,
+            "parametros": repr(parametros) if parametros is not None else None,
+            "ms": ms,
+            "filas": filas,
+            "plan": plan,
+        }
+        with self._bloqueo:
+            self._lentas.append(lenta)
+        logger.warning("Consulta lenta (%.1f ms, %d filas): %s | plan: %s", ms, filas, sql_normal, plan)
+
+    # --- Consulta ---
+
+    def instantanea(self):
+        """Copia de las métricas: {"metodos": {...}, "sentencias": {...}, "lentas": [...]}."""
+        with self._bloqueo:
+            return {
+                "umbral_lento_ms": self.umbral_lento_ms,
+                "limites_ms": list(LIMITES_MS),
+                "metodos": {n: e.como_dict() for n, e in self._metodos.items()},
+                "sentencias": {s: e.como_dict() for s, e in self._sentencias.items()},
+                "lentas": list(self._lentas),
+            }
+
+    def reiniciar(self):
+        with self._bloqueo:
+            self._metodos.clear()
+            self._sentencias.clear()
+            self._lentas.clear()
+
+
+class ConexionInstrumentada:
+    """Envoltura de sqlite3.Connection cuyos cursores miden cada sentencia."""
+    def __init__(self, conn, instrumentacion):
+        self._conn = conn
+        self._instrumentacion = instrumentacion
+
+    def cursor(self):
+        return CursorInstrumentado(self._conn.cursor(), self._conn, self._instrumentacion)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+    def __setattr__(self, nombre, valor):
+        # isolation_level, row_factory, etc. se aplican a la conexión real
+        if nombre.startswith("_"):
+            object.__setattr__(self, nombre, valor)
+        else:
+            setattr(self._conn, nombre, valor)
+
+
+class CursorInstrumentado:
+    """
+    Envoltura de sqlite3.Cursor. El tiempo de una sentencia incluye su
+    execute y todos los fetch hasta agotarla (o hasta la siguiente sentencia).
+    """
+    def __init__(self, cursor, conn, instrumentacion):
+        vars(self).update(_cursor=cursor, _conn=conn, _instrumentacion=instrumentacion,
+                          _sql=None, _parametros=None, _ms=0.0, _filas=0, _error=False)
+
+    def _medir(self, funcion, *args):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        except sqlite3.Error:
+            vars(self)["_error"] = True
+            raise
+        finally:
+            vars(self)["_ms"] += (time.perf_counter() - inicio) * 1000
+
+    def _empezar(self, sql, parametros):
+        self._terminar()
+        vars(self).update(_sql=sql, _parametros=parametros, _ms=0.0, _filas=0, _error=False)
+
+    def _terminar(self):
+        if self._sql is not None:
+            sql = self._sql
+            vars(self)["_sql"] = None
+            self._instrumentacion.registrar_sentencia(self._conn, sql, self._parametros,
+                                                      self._ms, self._filas, self._error)
+
+    def execute(self, sql, parametros=()):
+        self._empezar(sql, parametros)
+        try:
+            self._medir(self._cursor.execute, sql, parametros)
+        finally:
+            if self._error or self._cursor.description is None:
+                # Sin filas que leer: la sentencia ya terminó
+                vars(self)["_filas"] = max(self._cursor.rowcount, 0)
+                self._terminar()
+        return self
+
+    def executemany(self, sql, secuencia):
+        # El plan no se puede reconstruir sin los parámetros, que son un iterador
+        self._empezar(sql, None)
+        try:
+            self._medir(self._cursor.executemany, sql, secuencia)
+            vars(self)["_filas"] = max(self._cursor.rowcount, 0)
+        finally:
+            self._terminar()
+        return self
+
+    def fetchone(self):
+        fila = self._medir(self._cursor.fetchone)
+        if fila is None:
+            self._terminar()
+        else:
+            vars(self)["_filas"] += 1
+        return fila
+
+    def fetchmany(self, tamano=None):
+        lote = self._medir(self._cursor.fetchmany, *(() if tamano is None else (tamano,)))
+        vars(self)["_filas"] += len(lote)
+        if not lote:
+            self._terminar()
+        return lote
+
+    def fetchall(self):
+        filas = self._medir(self._cursor.fetchall)
+        vars(self)["_filas"] += len(filas)
+        self._terminar()
+        return filas
+
+    def __iter__(self):
+        while True:
+            lote = self.fetchmany(500)
+            if not lote:
+                return
+            yield from lote
+
+    def close(self):
+        self._terminar()
+        self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._terminar()
+        except Exception:
+            pass
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __setattr__(self, nombre, valor):
+        # row_factory, arraysize, etc. se aplican al cursor real
+        setattr(self._cursor, nombre, valor)
@@ -0,0 +1,36 @@
+class DetectorCambios:
+    """
+    Detecta qué tablas de core.database.TABLAS_VIGILADAS cambió otro proceso
+    (otra caja sobre el mismo archivo) desde la revisión anterior.
+
+    En reposo cada revisión es solo DatabaseManager.version_datos() (una
+    lectura de PRAGMA data_version); los contadores por tabla se leen
+    únicamente cuando esa versión cambió. Los cambios hechos por la misma
+    instancia de DatabaseManager no se informan: quien los hizo ya refrescó.
+    """
+    def __init__(self, db):
+        self.db = db
+        self._version = db.version_datos()
+        self._contadores = db.get_cambios_tablas()
+        self.revisiones = 0
+        self.lecturas_contadores = 0
+
+    def revisar(self):
+        """Devuelve el conjunto de tablas que cambió otra conexión (vacío si ninguna)."""
+        self.revisiones += 1
+        version = self.db.version_datos()
+        if version == self._version:
+            return set()
+        contadores = self.db.get_cambios_tablas(bloquear=False)
+        if contadores is None:
+            # Hay una escritura propia en curso: se revisa en la próxima vuelta
+            return set()
+        self.lecturas_contadores += 1
+        self._version = version
+        cambiadas = set()
+        for tabla, (cambios, propios) in contadores.items():
+            cambios_antes, propios_antes = self._contadores.get(tabla, (cambios, propios))
+            if cambios - cambios_antes > propios - propios_antes:
+                cambiadas.add(tabla)
+        self._contadores = contadores
+        return cambiadas
@@ -1,7 +1,10 @@
 import sys
 import os
+import time
+_INICIO = time.perf_counter()  # Origen de la traza de arranque (incluye importar la interfaz)
 from PyQt6.QtWidgets import QApplication
 from ui.main_window import MainWindow # ¡Importa nuestra ventana!
+from ui.arranque import TrazaArranque
 
 def load_stylesheet(app):
     """Carga la hoja de estilos QSS."""
@@ -42,7 +45,17 @@ if __name__ == "__main__":
     # Cargar nuestra hoja de estilos personalizada
     load_stylesheet(app)
     
-    window = MainWindow()
+    # Con PANADERIA_TRAZA_ARRANQUE=archivo.json se guardan los tiempos de arranque al salir
+    ruta_traza = os.environ.get("PANADERIA_TRAZA_ARRANQUE")
+    traza = TrazaArranque(_INICIO) if ruta_traza else None
+
+    # Con PANADERIA_DIAGNOSTICO=1 se miden las consultas y se habilita el panel de diagnóstico
+    window = MainWindow(diagnostico=os.environ.get("PANADERIA_DIAGNOSTICO") == "1", traza=traza)
     window.show()
     
-    sys.exit(app.exec())
\ No newline at end of file
+    codigo = app.exec()
+    if traza is not None:
+        traza.guardar(ruta_traza)
+        print("--- TRAZA DE ARRANQUE ---")
+        print(traza.resumen())
+    sys.exit(codigo)
\ No newline at end of file
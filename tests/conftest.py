@@ -0,0 +1,51 @@
+import datetime
+import os
+import sys
+import time
+
+import pytest
+
+# Las pruebas importan core/ y ui/ desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """DatabaseManager sobre un archivo nuevo con el perfil por defecto."""
+    db = DatabaseManager(str(tmp_path / "panaderia.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def zona_horaria(monkeypatch):
+    """Cambia la zona horaria del proceso (la usan date.today() y el 'localtime' de SQLite)."""
+    def cambiar(zona):
+        monkeypatch.setenv("TZ", zona)
+        time.tzset()
+    yield cambiar
+    monkeypatch.undo()
+    time.tzset()
+
+
+def dias_atras(dias):
+    return (datetime.date.today() - datetime.timedelta(days=dias)).isoformat()
+
+
+def cerrar_dias(db, fechas, productos=3, produccion=40, vendidos=7):
+    """
+    Da de alta 'productos' (si faltan) y, para cada fecha, registra
+    'produccion' de cada uno y lo cierra con 'vendidos' menos que lo disponible.
+    """
+    if not db.get_productos(ver_ocultos=True):
+        for i in range(productos):
+            db.add_producto(f"Pan {i}", 10.0 + i, 20, False)
+    for fecha in fechas:
+        stock = {}
+        for producto in db.get_productos(ver_ocultos=True):
+            db.update_produccion_stock(producto["id_prod"], produccion)
+            stock[producto["id_prod"]] = producto["stock"] + produccion
+        exito, mensaje = db.realizar_cierre_diario(fecha, {i: s - vendidos for i, s in stock.items()})
+        assert exito, mensaje
@@ -0,0 +1,73 @@
+import threading
+
+from core.database import DatabaseManager
+
+
+def test_catalogo_sigue_a_la_base_y_avisa(db):
+    sin_cache = DatabaseManager(db.db_name, usar_cache_productos=False)
+    avisos = []
+    db.catalogo.suscribir(lambda evento, ids: avisos.append((evento, sorted(ids))))
+    for i in range(4):
+        db.add_producto(f"Pan {i}", 10.0 + i, 5, i == 3)
+    db.get_productos()
+
+    acciones = [
+        (lambda: db.update_produccion_stock(1, 7), ("modificado", [1])),
+        (lambda: db.update_produccion_stock_lote([(2, 3), (4, 9)]), ("modificado", [2, 4])),
+        (lambda: db.toggle_producto_oculto(3), None),
+        (lambda: db.realizar_cierre_diario("2024-01-01", {1: 2, 2: 0, 4: 1}), None),
+    ]
+    for accion, aviso in acciones:
+        avisos.clear()
+        exito, mensaje = accion()
+        assert exito, mensaje
+        if aviso:
+            assert avisos == [aviso]
+        else:
+            assert avisos
+        for ver_ocultos in (False, True):
+            assert db.get_productos(ver_ocultos) == sin_cache.get_productos(ver_ocultos)
+    sin_cache.close()
+
+
+def test_escritura_durante_la_carga_no_deja_el_catalogo_viejo(db):
+    for i in range(3):
+        db.add_producto(f"Pan {i}", 10.0 + i, 5, False)
+    db.catalogo.invalidar()
+    id_prod = db.get_productos(ver_ocultos=True, modo="row")[0]["id_prod"]
+
+    cargar = db.catalogo.cargar
+    escritor = threading.Thread(target=db.toggle_producto_oculto, args=(id_prod,))
+
+    def cargar_con_escritura_en_medio(filas):
+        # La consulta ya corrió: otro hilo confirma una escritura antes de instalarla
+        escritor.start()
+        escritor.join(timeout=0.5)
+        cargar(filas)
+
+    db.catalogo.cargar = cargar_con_escritura_en_medio
+    db.get_productos(ver_ocultos=True)
+    escritor.join()
+    db.catalogo.cargar = cargar
+
+    en_base = {f["id_prod"]: f["oculto"] for f in db.get_productos(ver_ocultos=True, modo="row")}
+    assert en_base[id_prod] == 1
+    assert {p["id_prod"]: p["oculto"] for p in db.get_productos(ver_ocultos=True)} == en_base
+
+
+def test_produccion_durante_la_carga(db):
+    db.add_producto("Pan", 10.0, 5, False)
+    db.catalogo.invalidar()
+    cargar = db.catalogo.cargar
+    escritor = threading.Thread(target=db.update_produccion_stock, args=(1, 7))
+
+    def cargar_con_escritura_en_medio(filas):
+        escritor.start()
+        escritor.join(timeout=0.5)
+        cargar(filas)
+
+    db.catalogo.cargar = cargar_con_escritura_en_medio
+    db.get_productos()
+    escritor.join()
+    db.catalogo.cargar = cargar
+    assert [(p["stock"], p["produccion_dia"]) for p in db.get_productos()] == [(12, 7)]
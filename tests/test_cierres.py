@@ -0,0 +1,148 @@
+import random
+
+import pytest
+
+from benchmarks.comun import sembrar_productos
+from core.database import DatabaseManager
+
+FECHAS = ["2025-03-01", "2025-03-02", "2025-03-03"]
+
+
+def base_sembrada(ruta, productos=2000):
+    db = DatabaseManager(ruta)
+    sembrar_productos(db, productos)
+    if db.catalogo is not None:
+        db.catalogo.invalidar()
+    return db
+
+
+def foto(db):
+    """Estado que deja un cierre: filas de cierre, stock de productos y resumen de ingresos."""
+    cursor = db.conn.cursor()
+    cursor.execute("""
+    SELECT fecha, id_producto, nombre_producto, stock_inicial, produccion_dia,
+           stock_final_conteo, ventas_calculadas, ROUND(ingresos_calculados, 6)
+    FROM cierre_diario ORDER BY fecha, id_producto
+    """)
+    cierres = cursor.fetchall()
+    cursor.execute("SELECT id_prod, stock, produccion_dia, vendido_dia FROM productos ORDER BY id_prod")
+    productos = cursor.fetchall()
+    cursor.execute("SELECT fecha, ROUND(ingresos, 6), ventas FROM resumen_ingresos_dia ORDER BY fecha")
+    return cierres, productos, cursor.fetchall()
+
+
+def jornada(db, fecha, produccion, conteo):
+    exito, mensaje = db.update_produccion_stock_lote(list(produccion.items()))
+    assert exito, mensaje
+    exito, mensaje = db.realizar_cierre_diario(fecha, conteo)
+    assert exito, mensaje
+    return mensaje
+
+
+def datos_jornadas(ids, semilla=7):
+    """Producción y conteo de cada fecha; algunos conteos superan lo disponible."""
+    rnd = random.Random(semilla)
+    return [({i: rnd.randint(0, 60) for i in ids}, {i: rnd.randint(0, 200) for i in ids}) for _ in FECHAS]
+
+
+def test_repetir_el_mismo_conteo_no_reescribe_nada(tmp_path):
+    db = base_sembrada(str(tmp_path / "panaderia.db"))
+    ids = [p["id_prod"] for p in db.get_productos(ver_ocultos=True)]
+    produccion, conteo = datos_jornadas(ids)[0]
+    jornada(db, FECHAS[0], produccion, conteo)
+    antes = foto(db)
+
+    exito, mensaje = db.realizar_cierre_diario(FECHAS[0], dict(conteo))
+    assert exito and "ya estaba aplicado" in mensaje
+    exito, mensaje = db.reaplicar_cierre(FECHAS[0])
+    assert exito and "ya estaba aplicado" in mensaje
+    assert foto(db) == antes
+    assert [r["accion"] for r in db.get_diario_cierres(FECHAS[0])] == ["cierre"]
+    assert db.get_diario_cierres(FECHAS[0])[0]["conteo"] == conteo
+    db.close()
+
+
+@pytest.mark.parametrize("corregido", range(len(FECHAS)))
+def test_corregir_un_dia_equivale_a_haberlo_cerrado_bien(tmp_path, corregido):
+    corregida = base_sembrada(str(tmp_path / "corregida.db"))
+    desde_cero = base_sembrada(str(tmp_path / "desde_cero.db"))
+    ids = [p["id_prod"] for p in corregida.get_productos(ver_ocultos=True)]
+    jornadas = datos_jornadas(ids)
+    rnd = random.Random(corregido)
+    conteo_bueno = {i: max(c + rnd.randint(-5, 5), 0) for i, c in jornadas[corregido][1].items()}
+
+    for n, (fecha, (produccion, conteo)) in enumerate(zip(FECHAS, jornadas)):
+        jornada(corregida, fecha, produccion, conteo)
+        jornada(desde_cero, fecha, produccion, conteo_bueno if n == corregido else conteo)
+    exito, mensaje = corregida.realizar_cierre_diario(FECHAS[corregido], conteo_bueno)
+    assert exito and "corregido" in mensaje
+
+    assert foto(corregida) == foto(desde_cero)
+    assert corregida.verificar_resumenes() == []
+    assert [r["accion"] for r in corregida.get_diario_cierres(FECHAS[corregido])] == ["cierre", "correccion"]
+    # El catálogo en memoria sigue al stock corregido
+    assert {p["id_prod"]: p["stock"] for p in corregida.get_productos(ver_ocultos=True)} == \
+        {p["id_prod"]: p["stock"] for p in desde_cero.get_productos(ver_ocultos=True)}
+
+    # Reaplicar el diario después de la corrección no cambia nada
+    antes = foto(corregida)
+    exito, mensaje = corregida.reaplicar_cierre(FECHAS[corregido])
+    assert exito and "ya estaba aplicado" in mensaje
+    assert foto(corregida) == antes
+    corregida.close()
+    desde_cero.close()
+
+
+def test_cierre_anterior_al_ultimo_se_rechaza(tmp_path):
+    db = base_sembrada(str(tmp_path / "panaderia.db"), productos=20)
+    ids = [p["id_prod"] for p in db.get_productos(ver_ocultos=True)]
+    produccion, conteo = datos_jornadas(ids)[1]
+    jornada(db, FECHAS[1], produccion, conteo)
+    antes = foto(db)
+
+    exito, mensaje = db.realizar_cierre_diario(FECHAS[0], conteo)
+    assert not exito and FECHAS[1] in mensaje
+    assert foto(db) == antes
+    db.close()
+
+
+def cierre_por_producto(conn, fecha, conteo_final):
+    """El cierre original, producto por producto, como referencia."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id_prod, nombre, precio, stock, produccion_dia FROM productos")
+    for id_prod, nombre, precio, stock, produccion_dia in cursor.fetchall():
+        stock_final_conteo = conteo_final.get(id_prod, 0)
+        stock_inicial_dia = stock - produccion_dia
+        ventas_calculadas = max(stock_inicial_dia + produccion_dia - stock_final_conteo, 0)
+        cursor.execute("""
+        INSERT INTO cierre_diario (fecha, id_producto, nombre_producto, stock_inicial, produccion_dia, stock_final_conteo, ventas_calculadas, ingresos_calculados)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (fecha, id_prod, nombre, stock_inicial_dia, produccion_dia, stock_final_conteo,
+              ventas_calculadas, ventas_calculadas * precio))
+        cursor.execute("UPDATE productos SET stock = ?, produccion_dia = 0, vendido_dia = 0 WHERE id_prod = ?",
+                       (stock_final_conteo, id_prod))
+    conn.commit()
+
+
+def test_cierre_por_conjuntos_equivale_al_cierre_por_producto(tmp_path):
+    por_conjuntos = base_sembrada(str(tmp_path / "conjuntos.db"))
+    referencia = base_sembrada(str(tmp_path / "referencia.db"))
+    ids = [p["id_prod"] for p in por_conjuntos.get_productos(ver_ocultos=True)]
+    for id_prod in ids[::50]:
+        assert por_conjuntos.toggle_producto_oculto(id_prod)[0]
+        assert referencia.toggle_producto_oculto(id_prod)[0]
+
+    for fecha, (produccion, conteo) in zip(FECHAS, datos_jornadas(ids)):
+        # Productos sin contar: se cierran con 0
+        conteo = {i: c for i, c in conteo.items() if i % 7}
+        jornada(por_conjuntos, fecha, produccion, conteo)
+        assert referencia.update_produccion_stock_lote(list(produccion.items()))[0]
+        cierre_por_producto(referencia.conn, fecha, conteo)
+
+    # Comparación exacta, incluidos los ingresos en coma flotante
+    consultas = ("SELECT * FROM cierre_diario ORDER BY fecha, id_producto",
+                 "SELECT * FROM productos ORDER BY id_prod")
+    for sql in consultas:
+        assert por_conjuntos.conn.execute(sql).fetchall() == referencia.conn.execute(sql).fetchall()
+    por_conjuntos.close()
+    referencia.close()
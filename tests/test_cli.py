@@ -0,0 +1,41 @@
+import sys
+
+import pytest
+
+import cli
+from core import exportar
+from conftest import cerrar_dias, dias_atras
+
+
+@pytest.fixture
+def ruta_base(db):
+    cerrar_dias(db, [dias_atras(2), dias_atras(1)])
+    return db.db_name
+
+
+@pytest.fixture
+def sin_openpyxl(monkeypatch):
+    # Con None en sys.modules, find_spec devuelve None y el import falla
+    monkeypatch.setitem(sys.modules, "openpyxl", None)
+
+
+def test_exportar_csv(ruta_base, tmp_path, capsys):
+    salida = tmp_path / "cierres.csv"
+    assert cli.main(["--db", ruta_base, "exportar", str(salida)]) == 0
+    assert "6 filas exportadas" in capsys.readouterr().out
+    assert len(salida.read_text(encoding="utf-8").splitlines()) == 7
+
+
+def test_exportar_xlsx_sin_openpyxl_es_un_error_de_una_linea(ruta_base, tmp_path, capsys, sin_openpyxl):
+    salida = tmp_path / "cierres.xlsx"
+    assert cli.main(["--db", ruta_base, "exportar", str(salida)]) == 1
+    error = capsys.readouterr().err
+    assert error.count("\n") == 1 and "instale openpyxl o use .csv" in error
+    assert not salida.exists() and not (tmp_path / "cierres.xlsx.tmp").exists()
+
+
+def test_error_de_importacion_durante_el_comando(ruta_base, tmp_path, capsys, sin_openpyxl, monkeypatch):
+    # Aunque find_spec lo encuentre, un openpyxl que no se puede importar no termina en traceback
+    monkeypatch.setattr(exportar, "formatos_disponibles", lambda: [".csv", ".xlsx"])
+    assert cli.main(["--db", ruta_base, "exportar", str(tmp_path / "cierres.xlsx")]) == 1
+    assert capsys.readouterr().err.startswith("Error: ")
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import cerrar_dias, dias_atras
+
+# Jueves, domingo y el lunes siguiente: dos semanas y dos meses distintos
+FECHAS = ["2025-02-27", "2025-03-02", "2025-03-03"]
+INGRESOS_DIA = 7 * (10.0 + 11.0 + 12.0)
+
+
+@pytest.fixture
+def movimientos(db):
+    cerrar_dias(db, FECHAS)
+    db.add_trabajador("Ana", "", "Panadera", 1000.0, "Semanal")
+    db.add_proveedor("Molino", "", "Harina")
+    assert db.registrar_pago_trabajador(1, "Ana", 100.0, "Salario")[0]
+    assert db.registrar_pago_proveedor(1, "Molino", 50.0)[0]
+    db.conn.execute("UPDATE pagos SET fecha = CASE tipo WHEN 'Trabajador' THEN '2025-03-02 12:00:00' "
+                    "ELSE '2025-03-03 12:00:00' END")
+    db.conn.commit()
+    exito, mensaje = db.reconstruir_resumenes()
+    assert exito, mensaje
+    return db
+
+
+def resumen(cuadre):
+    return [(b["periodo"], b["ingresos"], b["pagos"], b["cantidad_pagos"], b["balance"]) for b in cuadre]
+
+
+def test_cuadre_por_dia_semana_y_mes(movimientos):
+    assert resumen(movimientos.get_cuadre_caja("2025-02-01", "2025-03-31", "dia")) == [
+        ("2025-02-27", INGRESOS_DIA, 0.0, 0, INGRESOS_DIA),
+        ("2025-03-02", INGRESOS_DIA, 100.0, 1, INGRESOS_DIA - 100.0),
+        ("2025-03-03", INGRESOS_DIA, 50.0, 1, INGRESOS_DIA - 50.0),
+    ]
+    # Las semanas empiezan el lunes
+    assert resumen(movimientos.get_cuadre_caja("2025-02-01", "2025-03-31", "semana")) == [
+        ("2025-02-24", 2 * INGRESOS_DIA, 100.0, 1, 2 * INGRESOS_DIA - 100.0),
+        ("2025-03-03", INGRESOS_DIA, 50.0, 1, INGRESOS_DIA - 50.0),
+    ]
+    mensual = movimientos.get_cuadre_caja("2025-02-01", "2025-03-31", "mes")
+    assert resumen(mensual) == [
+        ("2025-02-01", INGRESOS_DIA, 0.0, 0, INGRESOS_DIA),
+        ("2025-03-01", 2 * INGRESOS_DIA, 150.0, 2, 2 * INGRESOS_DIA - 150.0),
+    ]
+    assert mensual[1]["pagos_por_tipo"] == {("Trabajador", "Salario"): 100.0, ("Proveedor", "Factura"): 50.0}
+
+
+def test_el_rango_incluye_ambos_extremos(movimientos):
+    assert resumen(movimientos.get_cuadre_caja("2025-03-02", "2025-03-02", "mes")) == [
+        ("2025-03-01", INGRESOS_DIA, 100.0, 1, INGRESOS_DIA - 100.0),
+    ]
+    assert movimientos.get_cuadre_caja("2025-04-01", "2025-04-30") == []
+
+
+def test_periodo_desconocido(db):
+    with pytest.raises(ValueError):
+        db.get_cuadre_caja("2025-01-01", "2025-01-31", "anio")
+
+
+def test_la_semana_son_hoy_y_los_seis_dias_anteriores(db):
+    cerrar_dias(db, [dias_atras(7), dias_atras(6), dias_atras(0)])
+    assert db.get_ingresos_calculados_semana() == 2 * INGRESOS_DIA
@@ -0,0 +1,101 @@
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+from core.database import DatabaseManager
+
+
+def retener_bloqueo(ruta, segundos):
+    """Otra 'caja' que toma el bloqueo de escritura y lo suelta después de 'segundos'."""
+    tomado = threading.Event()
+
+    def retener():
+        otra = sqlite3.connect(ruta, isolation_level=None)
+        otra.execute("BEGIN IMMEDIATE")
+        tomado.set()
+        time.sleep(segundos)
+        otra.execute("ROLLBACK")
+        otra.close()
+
+    hilo = threading.Thread(target=retener)
+    hilo.start()
+    tomado.wait()
+    return hilo
+
+
+def test_escritura_reintenta_mientras_otra_caja_escribe(db):
+    db.add_trabajador("Ana", "", "Panadera", 100.0, "Semanal")
+    hilo = retener_bloqueo(db.db_name, 0.4)
+    exito, mensaje = db.registrar_pago_trabajador(1, "Ana", 10.0, "Salario")
+    hilo.join()
+    assert exito, mensaje
+    assert db.reintentos_bloqueo > 0
+
+
+def test_transacciones_implicitas_esperan_el_busy_timeout_completo(db):
+    # Las sentencias fuera de los métodos @_escritura no tienen reintentos:
+    # esperan busy_timeout, que no debe ser la espera corta de cada intento
+    hilo = retener_bloqueo(db.db_name, 0.4)
+    db.conn.execute("INSERT INTO proveedores (nombre, contacto, producto_suministrado) VALUES ('P', '', 'Harina')")
+    db.conn.commit()
+    hilo.join()
+    assert db.get_proveedores()[0]["nombre"] == "P"
+
+
+def test_bloqueo_que_no_se_libera_devuelve_error(tmp_path):
+    db = DatabaseManager(str(tmp_path / "b.db"), perfil={"busy_timeout": 200, "reintentos_escritura": 2})
+    db.add_trabajador("Ana", "", "Panadera", 100.0, "Semanal")
+    hilo = retener_bloqueo(db.db_name, 1.5)
+    exito, mensaje = db.registrar_pago_trabajador(1, "Ana", 10.0, "Salario")
+    hilo.join()
+    db.close()
+    assert not exito and "locked" in mensaje
+
+
+def test_agrupar_confirma_una_vez_y_revierte_solo_la_escritura_fallida(db):
+    db.add_trabajador("Ana", "", "Panadera", 100.0, "Semanal")
+    db.add_producto("Pan", 1.0, 10, False)
+    otra = sqlite3.connect(db.db_name)
+    with db.agrupar():
+        assert db.registrar_pago_trabajador(1, "Ana", 10.0, "Salario")[0]
+        assert db.update_produccion_stock(1, 5)[0]
+        # El pago queda en el grupo; la otra conexión todavía no lo ve
+        assert otra.execute("SELECT COUNT(*) FROM pagos").fetchone()[0] == 0
+        db.conn.execute("DROP TRIGGER IF EXISTS falla")
+        db.conn.execute("""
+        CREATE TEMP TRIGGER falla BEFORE INSERT ON main.pagos WHEN NEW.monto < 0
+        BEGIN SELECT RAISE(ABORT, 'monto negativo'); END
+        """)
+        exito, mensaje = db.registrar_pago_trabajador(1, "Ana", -1.0, "Salario")
+        assert not exito and "monto negativo" in mensaje
+    assert otra.execute("SELECT COUNT(*), SUM(monto) FROM pagos").fetchone() == (1, 10.0)
+    assert otra.execute("SELECT stock FROM productos").fetchone()[0] == 15
+    assert not db.conn.in_transaction
+    assert db.verificar_resumenes() == []
+    otra.close()
+
+
+def _escritor(ruta, escrituras):
+    db = DatabaseManager(ruta, usar_cache_productos=False)
+    fallos = 0
+    for i in range(escrituras):
+        if i % 2:
+            exito, _ = db.registrar_pago_trabajador(1, "Ana", 1.0, "Salario")
+        else:
+            exito, _ = db.update_produccion_stock(1, 1)
+        fallos += not exito
+    db.close()
+    return fallos
+
+
+def test_cuatro_cajas_escribiendo_sin_fallos(db):
+    db.add_trabajador("Ana", "", "Panadera", 100.0, "Semanal")
+    db.add_producto("Pan", 1.0, 0, False)
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        fallos = pool.starmap(_escritor, [(db.db_name, 200)] * 4)
+    assert fallos == [0, 0, 0, 0]
+    assert db.get_estadisticas()["pagos"] == 400
+    db.catalogo.invalidar()
+    assert db.get_productos()[0]["stock"] == 400
+    assert db.verificar_resumenes() == []
@@ -0,0 +1,68 @@
+import csv
+import threading
+
+import pytest
+
+from benchmarks.generador import generar_base
+from core.database import COLUMNAS_REPORTE_VENTAS, DatabaseManager
+from core.exportar import exportar_cierres
+
+
+@pytest.fixture(scope="module")
+def historial(tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp("exportar") / "historial.db")
+    generar_base(ruta, productos=30, anios=0.2)
+    return ruta
+
+
+def escribir_en_otro_hilo(db):
+    """True si otro hilo puede registrar producción mientras tanto (sin quedarse esperando)."""
+    resultado = []
+    hilo = threading.Thread(target=lambda: resultado.append(db.update_produccion_stock(1, 5)))
+    hilo.start()
+    hilo.join(timeout=5)
+    return not hilo.is_alive() and resultado[0][0]
+
+
+@pytest.mark.parametrize("perfil", ["compatible", "rendimiento"])
+def test_exportacion_a_medias_no_bloquea_las_escrituras(historial, perfil):
+    db = DatabaseManager(historial, perfil=perfil)
+    lotes = db.iter_datos_reporte_ventas(tamano_lote=100)
+    next(lotes)
+    try:
+        assert escribir_en_otro_hilo(db)
+    finally:
+        lotes.close()
+        db.close()
+
+
+def test_base_en_memoria():
+    db = DatabaseManager(":memory:")
+    for i in range(5):
+        db.add_producto(f"Pan {i}", 1.0 + i, 10, False)
+    for fecha in ("2025-01-01", "2025-01-02", "2025-01-03"):
+        assert db.realizar_cierre_diario(fecha, {})[0]
+    lotes = db.iter_datos_reporte_ventas(tamano_lote=4)
+    primero = next(lotes)
+    assert escribir_en_otro_hilo(db)
+    filas = primero + [fila for lote in lotes for fila in lote]
+    assert filas == [tuple(f) for f in db.get_datos_reporte_ventas(modo="row")]
+    db.close()
+
+
+@pytest.mark.parametrize("desde,hasta", [(None, None), ("2025-11-01", "2025-11-30")])
+def test_csv_exportado_coincide_con_el_reporte(historial, tmp_path, desde, hasta):
+    db = DatabaseManager(historial)
+    ruta = str(tmp_path / "cierres.csv")
+    avances = []
+    filas = exportar_cierres(db, ruta, desde, hasta, progreso=lambda hecho, total: avances.append((hecho, total)),
+                             tamano_lote=333)
+
+    esperado = [tuple(f) for f in db.get_cierres_por_rango(desde or "0000-01-01", hasta or "9999-12-31", modo="row")]
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        lector = csv.reader(archivo)
+        assert next(lector) == COLUMNAS_REPORTE_VENTAS
+        leidas = [tuple(fila) for fila in lector]
+    assert filas == len(esperado) == avances[-1][0] == avances[-1][1]
+    assert leidas == [tuple(str(valor) for valor in fila) for fila in esperado]
+    db.close()
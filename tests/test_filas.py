@@ -0,0 +1,45 @@
+from array import array
+
+import pytest
+
+from core import filas
+from core.database import DatabaseManager
+
+
+@pytest.mark.parametrize("usar_cache", [True, False])
+def test_resultado_columnar_vacio_usa_listas(tmp_path, usar_cache):
+    db = DatabaseManager(str(tmp_path / "panaderia.db"), usar_cache_productos=usar_cache)
+    resultados = [
+        db.get_productos(modo="columnar"),
+        db.get_trabajadores(modo="columnar"),
+        db.get_cierres_por_rango("2025-01-01", "2025-12-31", modo="columnar"),
+    ]
+    for resultado in resultados:
+        assert all(columna == [] and isinstance(columna, list) for columna in resultado)
+    # Se pueden completar con valores de cualquier tipo
+    resultados[0].nombre.append("Pan")
+    resultados[0].precio.append(12.5)
+    db.close()
+
+
+def test_columnas_no_vacias_eligen_su_tipo(db):
+    db.add_producto("Pan", 12.5, 30, False)
+    db.add_producto("Gaseosa", 900.0, 6, True)
+    productos = db.get_productos(modo="columnar")
+    assert productos.id_prod == array('q', [1, 2])
+    assert productos.precio == array('d', [12.5, 900.0])
+    assert productos.nombre == ["Pan", "Gaseosa"]
+
+
+def test_columnar_coincide_con_las_otras_formas(db):
+    for i in range(30):
+        db.add_producto(f"Pan {i}", i + 0.5, i, i % 4 == 0)
+    for fecha in ("2025-01-01", "2025-01-02"):
+        assert db.realizar_cierre_diario(fecha, {})[0]
+    columnar = db.get_cierres_por_rango("2025-01-01", "2025-01-31", modo="columnar")
+    assert list(zip(*columnar)) == [tuple(f) for f in db.get_cierres_por_rango("2025-01-01", "2025-01-31", modo="row")]
+
+
+def test_convertir_sin_filas():
+    resultado = filas.convertir(("a", "b"), [], "columnar", "prueba")
+    assert resultado.a == [] and resultado.b == []
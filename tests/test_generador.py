@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.generador import generar_base
+
+
+def volcado(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return list(conn.iterdump())
+    finally:
+        conn.close()
+
+
+def test_misma_semilla_genera_la_misma_base(tmp_path):
+    rutas = [str(tmp_path / f"{i}.db") for i in range(3)]
+    generar_base(rutas[0], productos=5, anios=0.1)
+    generar_base(rutas[1], productos=5, anios=0.1)
+    generar_base(rutas[2], productos=5, anios=0.1, semilla=7)
+    assert volcado(rutas[0]) == volcado(rutas[1])
+    assert volcado(rutas[0]) != volcado(rutas[2])
+
+
+def test_el_stock_pasa_de_un_cierre_al_siguiente(tmp_path):
+    ruta = str(tmp_path / "historial.db")
+    generar_base(ruta, productos=5, anios=0.1)
+    conn = sqlite3.connect(ruta)
+    pares, saltos = conn.execute("""
+    SELECT COUNT(*), TOTAL(siguiente.stock_inicial != c.stock_final_conteo) FROM cierre_diario c
+    JOIN cierre_diario siguiente ON siguiente.id_producto = c.id_producto
+     AND siguiente.fecha = date(c.fecha, '+1 day')
+    """).fetchone()
+    dias = conn.execute("SELECT COUNT(DISTINCT fecha) FROM cierre_diario").fetchone()[0]
+    conn.close()
+    assert pares == 5 * 35 and saltos == 0
+    assert dias == 36
+
+
+def resumen_pagos(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return conn.execute("""
+        SELECT fecha, tipo, tipo_pago_realizado, ROUND(total, 2), cantidad
+        FROM resumen_pagos_dia ORDER BY 1, 2, 3
+        """).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("zona", ["Etc/GMT+10", "Etc/GMT-10"])
+def test_pagos_generados_caen_en_su_dia_local_en_cualquier_zona(tmp_path, zona_horaria, zona):
+    zona_horaria("UTC")
+    referencia = str(tmp_path / "utc.db")
+    generar_base(referencia, productos=5, anios=0.1)
+
+    zona_horaria(zona)
+    ruta = str(tmp_path / "local.db")
+    generar_base(ruta, productos=5, anios=0.1)
+
+    resumen = resumen_pagos(ruta)
+    assert resumen and resumen == resumen_pagos(referencia)
+    assert resumen[-1][0] <= "2025-12-31"
@@ -0,0 +1,81 @@
+import os
+import sys
+from array import array
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from ui.grafico import CacheGraficoIngresos, GraficoIngresos  # noqa: E402
+
+from conftest import cerrar_dias, dias_atras  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+def serie_real(db, rango_dias):
+    return db.get_ingresos_por_dia(dias_atras(rango_dias))
+
+
+def serie_cache(cache):
+    return list(zip(cache.dias, cache.totales))
+
+
+def test_dias_nuevos_se_agregan(db):
+    cerrar_dias(db, [dias_atras(3), dias_atras(2)])
+    cache = CacheGraficoIngresos()
+    assert cache.actualizar(db, 30)
+    assert not cache.actualizar(db, 30)
+
+    cerrar_dias(db, [dias_atras(1)])
+    assert cache.actualizar(db, 30)
+    assert serie_cache(cache) == serie_real(db, 30)
+
+
+def test_correccion_de_un_dia_anterior_refresca_la_serie(db):
+    cerrar_dias(db, [dias_atras(4), dias_atras(3), dias_atras(2)])
+    cache = CacheGraficoIngresos()
+    cache.actualizar(db, 30)
+    antes = serie_cache(cache)
+
+    # Contar 5 panes más el primer día: ese día vende menos y el siguiente más
+    conteo = db.get_diario_cierres(dias_atras(4))[-1]["conteo"]
+    exito, mensaje = db.realizar_cierre_diario(dias_atras(4), {i: c + 5 for i, c in conteo.items()})
+    assert exito, mensaje
+    assert db.get_ultimo_resumen_ingresos() == (antes[-1][0], antes[-1][1])
+
+    assert cache.actualizar(db, 30)
+    assert serie_cache(cache) == serie_real(db, 30)
+    assert serie_cache(cache) != antes
+    assert not cache.actualizar(db, 30)
+
+
+def test_cambiar_de_rango_descarta_los_dias_viejos(db):
+    cerrar_dias(db, [dias_atras(40), dias_atras(20), dias_atras(5)])
+    cache = CacheGraficoIngresos()
+    cache.actualizar(db, 90)
+    assert len(cache.dias) == 3
+    assert cache.actualizar(db, 30)
+    assert serie_cache(cache) == serie_real(db, 30) == serie_cache(cache)[-2:]
+
+
+def test_muchos_dias_se_agrupan_en_promedios(app):
+    grafico = GraficoIngresos(ancho_min_barra=3)
+    dias = [f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(300)]
+    grafico.set_serie(dias, array('d', range(300)))
+    etiquetas, valores, por_barra = grafico._submuestrear(300)
+    assert por_barra == 3
+    assert etiquetas[:2] == [dias[0], dias[3]]
+    assert list(valores[:2]) == [1.0, 4.0]
+
+    # Pintar fuera de pantalla no falla, con y sin datos
+    grafico.resize(400, 240)
+    assert not grafico.grab().isNull()
+    grafico.set_serie([], array('d'))
+    assert not grafico.grab().isNull()
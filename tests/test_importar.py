@@ -0,0 +1,61 @@
+import pytest
+
+from core.importar import importar_csv, leer_conteo_csv
+
+
+def escribir(tmp_path, texto, nombre="datos.csv"):
+    ruta = tmp_path / nombre
+    ruta.write_text(texto, encoding="utf-8")
+    return str(ruta)
+
+
+def productos(db):
+    return {p["nombre"]: (p["precio"], p["stock"]) for p in db.get_productos(ver_ocultos=True)}
+
+
+@pytest.mark.parametrize("separador", [",", ";", "\t"])
+def test_separador_de_la_cabecera(db, tmp_path, separador):
+    precio = "12,50" if separador != "," else "12.50"
+    lineas = ["nombre", "precio", "stock"], ["Pan", precio, "30"], ["Factura", "4"], [], ["Medialuna", "1.5", "12"]
+    ruta = escribir(tmp_path, "\n".join(separador.join(celdas) for celdas in lineas) + "\n")
+
+    resultado = importar_csv(db, "productos", ruta)
+    # La fila corta se informa y la línea en blanco se ignora
+    assert resultado["errores"] == [(3, "se esperaban 3 columnas y hay 2")]
+    assert productos(db) == {"Pan": (12.5, 30), "Medialuna": (1.5, 12)}
+
+
+def test_punto_y_coma_con_coma_decimal_en_todas_las_filas(db, tmp_path):
+    filas = "".join(f"Pan {i};{i},25;{i}\n" for i in range(1, 400))
+    ruta = escribir(tmp_path, "\ufeffNombre ; Precio ; Stock\r\n\r\nSuelto;2,5\r\n" + filas)
+
+    resultado = importar_csv(db, "productos", ruta)
+    assert resultado["aplicadas"] == 399
+    assert [linea for linea, _ in resultado["errores"]] == [3]
+    assert productos(db)["Pan 7"] == (7.25, 7)
+
+
+def test_cabecera_desconocida_se_informa_con_sus_columnas(db, tmp_path):
+    ruta = escribir(tmp_path, "nombre;precio;color\nPan;1;rojo\n")
+    with pytest.raises(ValueError, match="Columnas desconocidas: color"):
+        importar_csv(db, "productos", ruta)
+
+
+def test_conteo_con_punto_y_coma(db, tmp_path):
+    db.add_producto("Pan", 10.0, 5, False)
+    db.add_producto("Factura", 4.0, 8, False)
+    ruta = escribir(tmp_path, "nombre;cantidad\nPan;3\n\nFactura\n")
+
+    conteo, errores = leer_conteo_csv(db, ruta, completar_con_stock=False)
+    assert conteo == {db.get_productos()[0]["id_prod"]: 3}
+    assert errores == [(4, "se esperaban 2 columnas y hay 1")]
+
+
+def test_precios_con_separador_de_miles(db, tmp_path):
+    lineas = ["nombre;precio", "Torta;1.234,50", "Caja;1,234.50", "Bandeja;2.500.000,5", "Mal agrupado;1.23,5"]
+    ruta = escribir(tmp_path, "\n".join(lineas) + "\n")
+
+    resultado = importar_csv(db, "productos", ruta)
+    assert resultado["errores"] == [(5, "precio: '1.23,5' no es un número")]
+    precios = {nombre: precio for nombre, (precio, _) in productos(db).items()}
+    assert precios == {"Torta": 1234.5, "Caja": 1234.5, "Bandeja": 2500000.5}
@@ -0,0 +1,59 @@
+import logging
+import os
+import sys
+
+import pytest
+
+
+def test_mide_metodos_sentencias_y_errores(db):
+    instrumentacion = db.activar_instrumentacion()
+    assert db.add_producto("Pan", 10.0, 5, False)[0]
+    assert not db.add_producto("Pan", 10.0, 5, False)[0]
+    assert len(db.get_productos()) == 1
+
+    datos = instrumentacion.instantanea()
+    alta = datos["metodos"]["add_producto"]
+    assert (alta["llamadas"], alta["errores"]) == (2, 1)
+    assert sum(alta["histograma"]) == 2
+    assert datos["metodos"]["get_productos"]["filas"] == 1
+    assert any(sql.startswith("INSERT INTO productos") for sql in datos["sentencias"])
+
+    instrumentacion.reiniciar()
+    assert instrumentacion.instantanea()["metodos"] == {}
+
+
+def test_registra_las_consultas_lentas_con_su_plan(db, caplog):
+    instrumentacion = db.activar_instrumentacion(umbral_lento_ms=0)
+    db.add_producto("Pan", 10.0, 5, False)
+    with caplog.at_level(logging.WARNING):
+        db.get_cierres_por_rango("2024-01-01", "2024-12-31")
+    lentas = [l for l in instrumentacion.instantanea()["lentas"] if "cierre_diario" in l["sql"]]
+    assert lentas and lentas[-1]["plan"]
+    assert "Consulta lenta" in caplog.text
+
+
+def test_desactivada_vuelve_a_los_metodos_originales(db):
+    conn = db.conn
+    instrumentacion = db.activar_instrumentacion()
+    assert db.conn is not conn
+    db.desactivar_instrumentacion()
+    assert db.conn is conn
+    assert not any(getattr(valor, "_instrumentado", False) for valor in vars(db).values())
+    db.add_producto("Pan", 10.0, 5, False)
+    assert instrumentacion.instantanea()["metodos"] == {}
+
+
+def test_dialogo_de_diagnostico(db):
+    pytest.importorskip("PyQt6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from ui.dialogs import DiagnosticoDialog
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    instrumentacion = db.activar_instrumentacion(umbral_lento_ms=0)
+    db.add_producto("Pan", 10.0, 5, False)
+    dialogo = DiagnosticoDialog(instrumentacion)
+    assert dialogo.tabla_metodos.item(0, 0).text() == "add_producto"
+    assert dialogo.tabla_lentas.rowCount() > 0
+    dialogo._reiniciar()
+    assert dialogo.tabla_metodos.rowCount() == 0
@@ -0,0 +1,99 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import time
+
+import pytest
+
+from benchmarks.bench_migraciones import comprobar_actualizada, envejecer, leer_huella
+from benchmarks.generador import generar_base
+from core import database
+from core.database import DatabaseManager, MIGRACIONES, VERSION_ESQUEMA
+
+BASE_INCLUIDA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "panaderia.db")
+
+
+def version(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def copia_incluida(tmp_path):
+    ruta = str(tmp_path / "incluida.db")
+    shutil.copyfile(BASE_INCLUIDA, ruta)
+    return ruta
+
+
+@pytest.fixture(scope="module")
+def historial(tmp_path_factory):
+    """Base generada de tres años, llevada a la forma previa a las migraciones."""
+    ruta = str(tmp_path_factory.mktemp("historial") / "historial.db")
+    generar_base(ruta, productos=40, anios=3)
+    envejecer(ruta)
+    return ruta
+
+
+def test_actualiza_la_base_incluida(copia_incluida):
+    assert version(copia_incluida) < VERSION_ESQUEMA
+    comprobar_actualizada(copia_incluida, leer_huella(copia_incluida))
+    assert version(copia_incluida) == VERSION_ESQUEMA
+
+
+def test_actualiza_una_base_de_varios_anios(historial, tmp_path):
+    ruta = str(tmp_path / "historial.db")
+    shutil.copyfile(historial, ruta)
+    assert version(ruta) == 0
+    comprobar_actualizada(ruta, leer_huella(ruta))
+
+
+def test_un_paso_que_falla_no_deja_nada_a_medias(copia_incluida, monkeypatch):
+    DatabaseManager(copia_incluida, usar_cache_productos=False).close()
+    monkeypatch.setattr(database, "MIGRACIONES", MIGRACIONES + [(VERSION_ESQUEMA + 1, "Paso roto a propósito", [
+        "CREATE TABLE tabla_a_medias (x INTEGER)",
+        "SELECT * FROM tabla_que_no_existe",
+    ])])
+    monkeypatch.setattr(database, "VERSION_ESQUEMA", VERSION_ESQUEMA + 1)
+    DatabaseManager(copia_incluida, usar_cache_productos=False).close()
+
+    conn = sqlite3.connect(copia_incluida)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == VERSION_ESQUEMA
+        assert not database._columnas(conn.cursor(), "tabla_a_medias")
+    finally:
+        conn.close()
+
+
+def test_base_al_dia_solo_lee_user_version(db):
+    sentencias = []
+    db.conn.set_trace_callback(sentencias.append)
+    db.create_tables()
+    db.conn.set_trace_callback(None)
+    assert sentencias == ["PRAGMA user_version"]
+
+
+def _abrir_a_la_vez(ruta, inicio):
+    """Abre la base en el instante 'inicio'; devuelve lo que create_tables informó."""
+    salida = io.StringIO()
+    time.sleep(max(0.0, inicio - time.time()))
+    with contextlib.redirect_stdout(salida):
+        DatabaseManager(ruta, usar_cache_productos=False).close()
+    return salida.getvalue()
+
+
+def test_varias_cajas_actualizan_la_misma_base_vieja(historial, tmp_path):
+    ruta = str(tmp_path / "historial.db")
+    shutil.copyfile(historial, ruta)
+    antes = leer_huella(ruta)
+
+    inicio = time.time() + 1.5  # margen para que arranquen los procesos
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        informes = pool.starmap(_abrir_a_la_vez, [(ruta, inicio)] * 4)
+    assert informes == [""] * 4
+    comprobar_actualizada(ruta, antes)
@@ -0,0 +1,87 @@
+import pytest
+
+from benchmarks.generador import generar_base
+from benchmarks.comun import sembrar_cierres, sembrar_productos
+from core.database import DatabaseManager, SQL_PAGINA_CIERRES
+
+
+@pytest.fixture(scope="module")
+def historial(tmp_path_factory):
+    """Base de ~4 meses con 37 productos: las páginas no coinciden con los cambios de día."""
+    ruta = str(tmp_path_factory.mktemp("paginacion") / "historial.db")
+    generar_base(ruta, productos=37, anios=0.35)
+    db = DatabaseManager(ruta)
+    yield db
+    db.close()
+
+
+def todas_las_filas(db, desde, hasta):
+    return [tuple(fila) for fila in db.get_cierres_por_rango(desde, hasta, modo="row")]
+
+
+def recorrer_paginas(db, desde, hasta, tamano):
+    filas, cursor, paginas = [], None, 0
+    while True:
+        pagina, cursor = db.get_pagina_cierres(desde, hasta, cursor, tamano)
+        assert len(pagina) <= tamano
+        filas += [tuple(fila) for fila in pagina]
+        paginas += 1
+        if cursor is None:
+            return filas, paginas
+
+
+@pytest.mark.parametrize("tamano", [1, 36, 37, 500, 100000])
+def test_las_paginas_reconstruyen_el_rango_completo(historial, tamano):
+    desde, hasta = "2025-09-20", "2025-11-10"
+    esperado = todas_las_filas(historial, desde, hasta)
+    assert esperado
+    filas, paginas = recorrer_paginas(historial, desde, hasta, tamano)
+    assert filas == esperado
+    # Sin páginas vacías salvo cuando el total es múltiplo exacto del tamaño
+    assert paginas == len(esperado) // tamano + 1
+
+
+@pytest.mark.parametrize("desde,hasta", [
+    ("2000-01-01", "9999-12-31"),
+    ("2025-12-31", "2025-12-31"),
+    ("2030-01-01", "2030-12-31"),
+])
+def test_rangos_extremos(historial, desde, hasta):
+    assert recorrer_paginas(historial, desde, hasta, 250)[0] == todas_las_filas(historial, desde, hasta)
+
+
+def test_iter_cierres_por_rango_entrega_las_mismas_filas(historial):
+    desde, hasta = "2025-10-01", "2025-10-31"
+    lotes = list(historial.iter_cierres_por_rango(desde, hasta, tamano_lote=100))
+    assert all(lotes)
+    assert [tuple(fila) for lote in lotes for fila in lote] == todas_las_filas(historial, desde, hasta)
+
+
+def test_la_pagina_parte_de_la_clave_en_el_indice(historial):
+    """Sin ordenar aparte: el costo de una página no depende de cuántas hubo antes."""
+    usa_indice, detalles = historial.verificar_planes_consulta()["get_pagina_cierres"]
+    assert usa_indice
+    assert any("idx_cierre_fecha_desc_nombre (fecha=? AND nombre_producto>?)" in detalle for detalle in detalles)
+    assert not any("TEMP B-TREE" in detalle for detalle in detalles)
+
+
+def test_paginas_dentro_de_un_dia_grande_cuestan_lo_mismo(db):
+    """Una página al final de un día de 3000 productos no vuelve a recorrer las filas ya vistas."""
+    sembrar_productos(db, 3000)
+    sembrar_cierres(db, 3)
+    nombres = [f"Producto {i:06d}" for i in (0, 1500, 2900)]
+
+    def pasos(nombre):
+        contador = [0]
+
+        def contar():
+            contador[0] += 1
+
+        db.conn.set_progress_handler(contar, 100)
+        filas = db.conn.execute(SQL_PAGINA_CIERRES, ("2000-01-01", "2030-12-31", "2020-01-02", nombre, 50)).fetchall()
+        db.conn.set_progress_handler(None, 0)
+        assert len(filas) == 50
+        return contador[0]
+
+    costos = [pasos(nombre) for nombre in nombres]
+    assert max(costos) <= 2 * min(costos) + 2, costos
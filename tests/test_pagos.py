@@ -0,0 +1,58 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from core.database import DatabaseManager
+
+
+def pagar(db, monto=100.0):
+    if not db.get_trabajadores():
+        db.add_trabajador("Ana", "", "Panadera", 1000.0, "Semanal")
+    exito, mensaje = db.registrar_pago_trabajador(db.get_trabajadores()[0]["id_trab"], "Ana", monto, "Salario")
+    assert exito, mensaje
+
+
+# A cualquier hora, al menos una de las dos zonas está en otra fecha que UTC
+@pytest.mark.parametrize("zona", ["Etc/GMT-14", "Etc/GMT+12"])
+def test_pago_de_hoy_cuenta_en_la_fecha_local(db, zona_horaria, zona):
+    zona_horaria(zona)
+    pagar(db, 250.0)
+
+    hoy = datetime.date.today().isoformat()
+    assert [tuple(f) for f in db.conn.execute("SELECT fecha, total FROM resumen_pagos_dia")] == [(hoy, 250.0)]
+    assert db.get_pagos_semana() == 250.0
+    assert db.get_cuadre_caja(hoy, hoy)[0]["pagos"] == 250.0
+    assert db.verificar_resumenes() == []
+
+
+def test_reconstruir_agrupa_por_fecha_local(db, zona_horaria):
+    zona_horaria("Etc/GMT+3")  # UTC-3
+    pagar(db)
+    db.conn.execute("UPDATE pagos SET fecha = '2025-03-02 01:30:00'")
+    db.conn.commit()
+
+    exito, mensaje = db.reconstruir_resumenes()
+    assert exito, mensaje
+    assert db.conn.execute("SELECT fecha FROM resumen_pagos_dia").fetchall() == [("2025-03-01",)]
+
+
+def test_migracion_reagrupa_los_resumenes_guardados_en_utc(tmp_path, zona_horaria):
+    zona_horaria("Etc/GMT+3")
+    ruta = str(tmp_path / "panaderia.db")
+    db = DatabaseManager(ruta)
+    pagar(db, 80.0)
+    db.close()
+
+    # Como la dejaba la versión 5: pago de madrugada (UTC) resumido con su fecha UTC
+    conn = sqlite3.connect(ruta)
+    conn.execute("UPDATE pagos SET fecha = '2025-03-02 01:30:00'")
+    conn.execute("UPDATE resumen_pagos_dia SET fecha = '2025-03-02'")
+    conn.execute("PRAGMA user_version = 5")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(ruta)
+    assert db.conn.execute("SELECT fecha, total FROM resumen_pagos_dia").fetchall() == [("2025-03-01", 80.0)]
+    assert db.verificar_resumenes() == []
+    db.close()
@@ -0,0 +1,26 @@
+from benchmarks.comun import sembrar_productos
+from benchmarks.generador import generar_base
+from core.database import CONSULTAS_REPORTES, DatabaseManager
+
+
+def comprobar_planes(db):
+    planes = db.verificar_planes_consulta()
+    assert set(planes) == set(CONSULTAS_REPORTES)
+    sin_indice = {nombre: detalles for nombre, (usa_indice, detalles) in planes.items() if not usa_indice}
+    assert sin_indice == {}
+
+
+def test_reportes_usan_indices_con_pocos_datos(db):
+    sembrar_productos(db, 200)
+    db.conn.execute("ANALYZE")
+    comprobar_planes(db)
+
+
+def test_reportes_usan_indices_con_historial(tmp_path):
+    ruta = str(tmp_path / "historial.db")
+    generar_base(ruta, productos=40, anios=1)
+    db = DatabaseManager(ruta)
+    try:
+        comprobar_planes(db)
+    finally:
+        db.close()
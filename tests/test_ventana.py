@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from ui import main_window  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+@pytest.fixture
+def ventana(app, tmp_path):
+    ventana = main_window.MainWindow(precalentar_reportes=False, db_name=str(tmp_path / "panaderia.db"))
+    yield ventana
+    ventana.close()
+
+
+@pytest.fixture
+def dialogo_guardar(monkeypatch):
+    """Reemplaza el diálogo de guardar: registra lo que ofrece y simula que se canceló."""
+    pedidos = []
+
+    def get_save_file_name(parent, titulo, sugerido, filtros):
+        pedidos.append((sugerido, filtros))
+        return "", ""
+
+    monkeypatch.setattr(main_window.QFileDialog, "getSaveFileName", get_save_file_name)
+    return pedidos
+
+
+def test_exportar_ofrece_excel_con_openpyxl(ventana, dialogo_guardar, monkeypatch):
+    monkeypatch.setattr(main_window, "formatos_disponibles", lambda: [".csv", ".xlsx"])
+    ventana.slot_exportar_excel()
+    assert dialogo_guardar == [("reporte_cierres_panaderia.xlsx", "Excel (*.xlsx);;CSV (*.csv)")]
+
+
+def test_exportar_sin_openpyxl_solo_ofrece_csv(ventana, dialogo_guardar, monkeypatch):
+    monkeypatch.setitem(sys.modules, "openpyxl", None)
+    ventana.slot_exportar_excel()
+    assert dialogo_guardar == [("reporte_cierres_panaderia.csv", "CSV (*.csv)")]
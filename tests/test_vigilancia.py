@@ -0,0 +1,68 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from core.database import DatabaseManager
+from core.vigilancia import DetectorCambios
+
+
+def test_iniciar_no_espera_el_bloqueo_de_otra_caja(db):
+    otra = sqlite3.connect(db.db_name, isolation_level=None)
+    otra.execute("BEGIN IMMEDIATE")
+    try:
+        detector = DetectorCambios(db)
+    finally:
+        otra.execute("ROLLBACK")
+        otra.close()
+    assert detector.revisar() == set()
+
+
+def test_solo_informa_los_cambios_de_otra_conexion(db):
+    db.add_trabajador("Ana", "", "Panadera", 100.0, "Semanal")
+    detector = DetectorCambios(db)
+
+    db.registrar_pago_trabajador(1, "Ana", 50.0, "Salario")
+    assert detector.revisar() == set()
+
+    otra = DatabaseManager(db.db_name)
+    try:
+        otra.registrar_pago_trabajador(1, "Ana", 20.0, "Salario")
+        otra.add_producto("Pan", 1.0, 10, False)
+    finally:
+        otra.close()
+    assert detector.revisar() == {"resumen_pagos_dia", "productos"}
+    assert detector.revisar() == set()
+
+
+def _escritor(ruta, pagos):
+    db = DatabaseManager(ruta)
+    fallos = sum(not db.registrar_pago_trabajador(1, "Ana", 1.0, "Salario")[0] for _ in range(pagos))
+    db.close()
+    return fallos
+
+
+def test_varias_cajas_escribiendo(db):
+    db.add_trabajador("Ana", "", "Panadera", 100.0, "Semanal")
+    detector = DetectorCambios(db)
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        fallos = pool.starmap(_escritor, [(db.db_name, 50)] * 3)
+    assert fallos == [0, 0, 0]
+    assert detector.revisar() == {"resumen_pagos_dia"}
+    assert db.get_estadisticas()["pagos"] == 150
+    assert db.verificar_resumenes() == []
+
+
+def test_vigilante_informa_el_fallo_y_no_arranca(db, monkeypatch):
+    pytest.importorskip("PyQt6")
+    from ui.invalidacion import VigilanteCambios
+
+    def bloqueada():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "version_datos", bloqueada)
+    vigilante = VigilanteCambios(db)
+    mensajes = []
+    vigilante.fallo.connect(mensajes.append)
+    assert not vigilante.iniciar()
+    assert mensajes and "database is locked" in mensajes[0]
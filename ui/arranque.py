@@ -0,0 +1,31 @@
+import json
+import time
+
+
+class TrazaArranque:
+    """
+    Marcas de tiempo del arranque de la interfaz, en ms desde 'inicio' (un
+    time.perf_counter(); por defecto, la creación de la traza). Cada evento
+    se registra solo la primera vez que ocurre.
+
+    MainWindow marca "ventana_creada", "ventana_visible" (primer pintado),
+    "precarga" (datos leídos en segundo plano) y "pestana:<título>" cuando
+    cada pestaña queda construida y cargada.
+    """
+    def __init__(self, inicio=None):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.marcas = {}
+
+    def marcar(self, evento):
+        if evento not in self.marcas:
+            self.marcas[evento] = (time.perf_counter() - self.inicio) * 1000
+
+    def como_dict(self):
+        return dict(self.marcas)
+
+    def guardar(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.marcas, f, ensure_ascii=False, indent=2)
+
+    def resumen(self):
+        return "\n".join(f"  {ms:9.1f} ms  {evento}" for evento, ms in sorted(self.marcas.items(), key=lambda kv: kv[1]))
@@ -1,7 +1,11 @@
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QLabel, QSpinBox, QDialogButtonBox, QComboBox,
-    QDoubleSpinBox, QFormLayout, QScrollArea, QWidget
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QDialogButtonBox, QComboBox,
+    QDoubleSpinBox, QFormLayout, QLineEdit, QTableWidget, QTableWidgetItem,
+    QHeaderView, QTableView, QStyledItemDelegate, QAbstractItemDelegate, QAbstractItemView
 )
+from PyQt6.QtCore import Qt, QSortFilterProxyModel
+
+from .modelos import ModeloConteo
 
 class InputDialog(QDialog):
     """Diálogo simple para pedir una cantidad."""
@@ -64,42 +68,73 @@ class PagoDialog(QDialog):
             "tipo_pago": self.combo_tipo_pago.currentText()
         }
 
+class DelegadoConteo(QStyledItemDelegate):
+    """Editor de la columna Conteo: un QSpinBox que solo existe mientras se edita la celda."""
+    def createEditor(self, parent, option, index):
+        editor = QSpinBox(parent)
+        editor.setRange(0, 9999)
+        editor.setFrame(False)
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(Qt.ItemDataRole.EditRole))
+        editor.selectAll()
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.ItemDataRole.EditRole)
+
+
 class CierreDialog(QDialog):
-    """Diálogo para ingresar el conteo final de stock."""
-# ... (código existente sin cambios) ...
+    """
+    Diálogo para ingresar el conteo final de stock.
+    La tabla es un modelo/vista: solo la celda en edición tiene un widget,
+    así que abre igual de rápido con 50 que con miles de productos.
+    """
     def __init__(self, productos, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Realizar Cierre de Día - Conteo Final")
-        self.setMinimumWidth(400)
+        self.setMinimumSize(500, 500)
         
         self.layout = QVBoxLayout(self)
-        self.form_layout = QFormLayout()
-        
-        # Guardamos los spinboxes para leerlos luego
-        self.spinboxes = {} 
-
-        widget_interno = QWidget()
-        form_layout = QFormLayout(widget_interno)
-        
-        for prod in productos:
-            id_prod = prod['id_prod']
-            nombre = prod['nombre']
-            stock_actual = prod['stock']
-            
-            label = QLabel(f"{nombre} (Actual: {stock_actual}):")
-            spinbox = QSpinBox()
-            spinbox.setRange(0, 9999)
-            spinbox.setValue(stock_actual) # Sugerir el stock actual
-            
-            form_layout.addRow(label, spinbox)
-            self.spinboxes[id_prod] = spinbox
-            
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setWidget(widget_interno)
-        
         self.layout.addWidget(QLabel("Ingrese el conteo de STOCK FINAL de cada producto:"))
-        self.layout.addWidget(scroll)
+
+        busqueda_layout = QHBoxLayout()
+        self.entry_filtro = QLineEdit()
+        self.entry_filtro.setPlaceholderText("Buscar producto...")
+        self.entry_filtro.textChanged.connect(self._filtrar)
+        # Lector de códigos: escribe el código y Enter; se salta al conteo de ese producto
+        self.entry_codigo = QLineEdit()
+        self.entry_codigo.setPlaceholderText("Código o nombre + Enter")
+        self.entry_codigo.returnPressed.connect(self._saltar)
+        busqueda_layout.addWidget(self.entry_filtro)
+        busqueda_layout.addWidget(self.entry_codigo)
+        self.layout.addLayout(busqueda_layout)
+
+        self.modelo = ModeloConteo(productos, self)
+        self.filtro = QSortFilterProxyModel(self)
+        self.filtro.setSourceModel(self.modelo)
+        self.filtro.setFilterKeyColumn(1)
+        self.filtro.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        self.tabla = QTableView()
+        self.tabla.setModel(self.filtro)
+        self.tabla.setItemDelegateForColumn(ModeloConteo.COLUMNA_CONTEO, DelegadoConteo(self.tabla))
+        self.tabla.setEditTriggers(QAbstractItemView.EditTrigger.AllEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabla.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tabla.verticalHeader().setVisible(False)
+        # Alto fijo y columnas sin ResizeToContents: la vista no mide cada fila al abrir
+        self.tabla.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.tabla.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.tabla.itemDelegateForColumn(ModeloConteo.COLUMNA_CONTEO).closeEditor.connect(self._al_cerrar_editor)
+        self.layout.addWidget(self.tabla)
+
+        self.label_cambios = QLabel()
+        self.layout.addWidget(self.label_cambios)
+        self.modelo.dataChanged.connect(self._actualizar_cambios)
+        self._actualizar_cambios()
         
         self.buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
@@ -109,10 +144,184 @@ class CierreDialog(QDialog):
         self.buttons.rejected.connect(self.reject)
         
         self.layout.addWidget(self.buttons)
+        self.entry_codigo.setFocus()
+
+    def keyPressEvent(self, event):
+        # Enter confirma códigos y conteos; nunca acepta el diálogo entero
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            return
+        super().keyPressEvent(event)
+
+    def _filtrar(self, texto):
+        self.filtro.setFilterFixedString(texto.strip())
+
+    def _saltar(self):
+        texto = self.entry_codigo.text().strip()
+        self.entry_codigo.clear()
+        if not texto:
+            return
+        fila = self.modelo.fila_de_id(int(texto)) if texto.isdigit() else None
+        if fila is None:
+            # No es un código: primer producto visible cuyo nombre empieza con el texto
+            coincidencias = self.filtro.match(self.filtro.index(0, 1), Qt.ItemDataRole.DisplayRole, texto, 1,
+                                              Qt.MatchFlag.MatchStartsWith)
+            if not coincidencias:
+                self.entry_codigo.setPlaceholderText(f"'{texto}' no encontrado")
+                return
+            indice = coincidencias[0].siblingAtColumn(ModeloConteo.COLUMNA_CONTEO)
+        else:
+            if self.entry_filtro.text():
+                self.entry_filtro.clear()
+            indice = self.filtro.mapFromSource(self.modelo.index(fila, ModeloConteo.COLUMNA_CONTEO))
+        self.entry_codigo.setPlaceholderText("Código o nombre + Enter")
+        self.tabla.scrollTo(indice)
+        self.tabla.setCurrentIndex(indice)
+        # Con el disparador CurrentChanged el editor ya puede estar abierto
+        if self.tabla.state() != QAbstractItemView.State.EditingState:
+            self.tabla.edit(indice)
+        editor = self.tabla.indexWidget(indice)
+        if editor is not None:
+            editor.setFocus()
+
+    def _al_cerrar_editor(self, editor, pista):
+        # Confirmar con Enter devuelve el foco al lector para el siguiente código
+        if pista == QAbstractItemDelegate.EndEditHint.SubmitModelCache:
+            self.entry_codigo.setFocus()
+
+    def _actualizar_cambios(self, *args):
+        self.label_cambios.setText(f"Productos con conteo distinto al stock actual: {self.modelo.cantidad_cambios()}")
+
+    def get_cambios(self):
+        """{id_prod: cantidad} solo de los productos cuyo conteo se cambió."""
+        return self.modelo.cambios()
 
     def get_conteo_final(self):
-# ... (código existente sin cambios) ...
-        conteo = {}
-        for id_prod, spinbox in self.spinboxes.items():
-            conteo[id_prod] = spinbox.value()
-        return conteo
\ No newline at end of file
+        """{id_prod: cantidad} de todos los productos (los no cambiados conservan su stock actual)."""
+        return self.modelo.conteo()
+
+class ProduccionLoteDialog(QDialog):
+    """Diálogo para cargar la producción/compra de varios productos de una vez."""
+    def __init__(self, productos, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Registrar Producción/Compra en Lote")
+        self.setMinimumSize(500, 500)
+
+        self.layout = QVBoxLayout(self)
+        self.layout.addWidget(QLabel("Ingrese la cantidad producida/comprada de cada producto (0 = sin cambios):"))
+
+        self.entry_filtro = QLineEdit()
+        self.entry_filtro.setPlaceholderText("Buscar producto...")
+        self.entry_filtro.textChanged.connect(self._filtrar)
+        self.layout.addWidget(self.entry_filtro)
+
+        self.tabla = QTableWidget(len(productos), 3)
+        self.tabla.setHorizontalHeaderLabels(["Producto", "Stock Actual", "Cantidad"])
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabla.verticalHeader().setVisible(False)
+
+        for i, prod in enumerate(productos):
+            nombre = QTableWidgetItem(prod['nombre'])
+            nombre.setFlags(nombre.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            nombre.setData(Qt.ItemDataRole.UserRole, prod['id_prod'])
+            stock = QTableWidgetItem(str(prod['stock']))
+            stock.setFlags(stock.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            # Un entero en EditRole hace que el delegado use un QSpinBox al editar
+            cantidad = QTableWidgetItem()
+            cantidad.setData(Qt.ItemDataRole.EditRole, 0)
+
+            self.tabla.setItem(i, 0, nombre)
+            self.tabla.setItem(i, 1, stock)
+            self.tabla.setItem(i, 2, cantidad)
+
+        self.layout.addWidget(self.tabla)
+
+        self.buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+
+        self.layout.addWidget(self.buttons)
+
+    def _filtrar(self, texto):
+        texto = texto.strip().lower()
+        for i in range(self.tabla.rowCount()):
+            nombre = self.tabla.item(i, 0).text().lower()
+            self.tabla.setRowHidden(i, texto not in nombre)
+
+    def get_entradas(self):
+        """Lista de (id_prod, cantidad) solo para los productos con cantidad > 0."""
+        entradas = []
+        for i in range(self.tabla.rowCount()):
+            cantidad = self.tabla.item(i, 2).data(Qt.ItemDataRole.EditRole) or 0
+            if cantidad > 0:
+                entradas.append((self.tabla.item(i, 0).data(Qt.ItemDataRole.UserRole), int(cantidad)))
+        return entradas
+
+class DiagnosticoDialog(QDialog):
+    """Muestra las métricas de core.instrumentacion: métodos, sentencias y consultas lentas."""
+    def __init__(self, instrumentacion, parent=None):
+        super().__init__(parent)
+        self.instrumentacion = instrumentacion
+        self.setWindowTitle("Diagnóstico de Base de Datos")
+        self.setMinimumSize(800, 600)
+
+        self.layout = QVBoxLayout(self)
+        self.label_resumen = QLabel()
+        self.layout.addWidget(self.label_resumen)
+
+        self.tabla_metodos = self._crear_tabla(["Método", "Llamadas", "Errores", "Media ms", "p95 ms", "Máx ms", "Filas"])
+        self.tabla_lentas = self._crear_tabla(["Momento", "ms", "Filas", "Consulta", "Plan"])
+        self.layout.addWidget(QLabel("--- Métodos de DatabaseManager ---"))
+        self.layout.addWidget(self.tabla_metodos)
+        self.layout.addWidget(QLabel("--- Consultas lentas (más recientes primero) ---"))
+        self.layout.addWidget(self.tabla_lentas)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close, self)
+        btn_actualizar = self.buttons.addButton("Actualizar", QDialogButtonBox.ButtonRole.ActionRole)
+        btn_reiniciar = self.buttons.addButton("Reiniciar", QDialogButtonBox.ButtonRole.ResetRole)
+        btn_actualizar.clicked.connect(self.actualizar)
+        btn_reiniciar.clicked.connect(self._reiniciar)
+        self.buttons.rejected.connect(self.reject)
+        self.layout.addWidget(self.buttons)
+
+        self.actualizar()
+
+    def _crear_tabla(self, cabeceras):
+        tabla = QTableWidget(0, len(cabeceras))
+        tabla.setHorizontalHeaderLabels(cabeceras)
+        tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        tabla.horizontalHeader().setStretchLastSection(True)
+        tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        tabla.verticalHeader().setVisible(False)
+        return tabla
+
+    def _llenar(self, tabla, filas):
+        tabla.setRowCount(len(filas))
+        for i, fila in enumerate(filas):
+            for j, valor in enumerate(fila):
+                texto = f"{valor:.2f}" if isinstance(valor, float) else ("" if valor is None else str(valor))
+                tabla.setItem(i, j, QTableWidgetItem(texto))
+
+    def actualizar(self):
+        datos = self.instrumentacion.instantanea()
+        metodos = sorted(datos["metodos"].items(), key=lambda kv: -kv[1]["total_ms"])
+        self._llenar(self.tabla_metodos, [
+            (nombre, m["llamadas"], m["errores"], m["media_ms"],
+             m["p95_ms"] if m["p95_ms"] is not None else "+", m["max_ms"], m["filas"])
+            for nombre, m in metodos
+        ])
+        self._llenar(self.tabla_lentas, [
+            (l["momento"], l["ms"], l["filas"], l["sql"], " / ".join(l["plan"] or []))
+            for l in reversed(datos["lentas"])
+        ])
+        self.label_resumen.setText(
+            f"{sum(m['llamadas'] for _, m in metodos)} llamadas, "
+            f"{len(datos['sentencias'])} sentencias distintas, "
+            f"{len(datos['lentas'])} consultas sobre {datos['umbral_lento_ms']:.0f} ms"
+        )
+
+    def _reiniciar(self):
+        self.instrumentacion.reiniciar()
+        self.actualizar()
@@ -0,0 +1,147 @@
+import datetime
+import math
+from array import array
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QColor, QPen
+from PyQt6.QtWidgets import QWidget
+
+
+class CacheGraficoIngresos:
+    """
+    Serie de ingresos por día para el gráfico, cacheada por rango, por el
+    último cierre y por el diario de cierres. Si desde la última consulta
+    llegaron días nuevos, se rehízo el último o se corrigió uno anterior, se
+    piden únicamente los días desde el primero que cambió.
+    """
+    def __init__(self):
+        self.dias = []
+        self.totales = array('d')
+        self.rango_dias = None
+        self._ultimo = None  # (fecha, ingresos) del último cierre visto
+        self._registro = 0  # último id_registro de diario_cierres visto
+
+    def actualizar(self, db, rango_dias, progreso=None):
+        """Sincroniza la serie con la DB. Devuelve True si los datos cambiaron."""
+        desde = (datetime.date.today() - datetime.timedelta(days=rango_dias)).isoformat()
+        ultimo = db.get_ultimo_resumen_ingresos()
+        registro, primer_cambio = db.get_primer_dia_cerrado_desde(self._registro)
+
+        if rango_dias != self.rango_dias or self._ultimo is None or ultimo is None:
+            filas = db.get_ingresos_por_dia(desde)
+            self.dias = [f for f, _ in filas]
+            self.totales = array('d', (t for _, t in filas))
+        elif ultimo == self._ultimo and primer_cambio is None and (not self.dias or self.dias[0] >= desde):
+            return False
+        else:
+            # Incremental: volver a pedir desde el último día conocido (puede haberse
+            # rehecho) o desde el primer día cerrado o corregido después
+            fecha_conocida = min(self._ultimo[0], primer_cambio or self._ultimo[0])
+            corte = len(self.dias)
+            while corte > 0 and self.dias[corte - 1] >= fecha_conocida:
+                corte -= 1
+            del self.dias[corte:]
+            del self.totales[corte:]
+            for fecha, total in db.get_ingresos_por_dia(max(fecha_conocida, desde)):
+                self.dias.append(fecha)
+                self.totales.append(total)
+            # Descartar los días que quedaron fuera de la ventana
+            inicio = 0
+            while inicio < len(self.dias) and self.dias[inicio] < desde:
+                inicio += 1
+            del self.dias[:inicio]
+            del self.totales[:inicio]
+
+        self.rango_dias = rango_dias
+        self._ultimo = ultimo
+        self._registro = registro
+        return True
+
+
+class GraficoIngresos(QWidget):
+    """
+    Gráfico de barras de ingresos por día dibujado con QPainter.
+    Cuando hay más días que espacio (menos de 'ancho_min_barra' píxeles por
+    barra), agrupa días consecutivos y dibuja el promedio de cada grupo.
+    """
+    MARGEN_IZQ = 70
+    MARGEN_DER = 15
+    MARGEN_SUP = 30
+    MARGEN_INF = 40
+
+    def __init__(self, parent=None, ancho_min_barra=3):
+        super().__init__(parent)
+        self.ancho_min_barra = ancho_min_barra
+        self.dias = []
+        self.totales = array('d')
+        self._muestreo = None  # (clave, etiquetas, valores, dias_por_barra)
+        self.setMinimumHeight(220)
+
+    def set_serie(self, dias, totales):
+        self.dias = dias
+        self.totales = totales
+        self._muestreo = None
+        self.update()
+
+    def _submuestrear(self, ancho_util):
+        """Agrupa la serie para que entre en 'ancho_util' píxeles (cacheado por ancho y tamaño)."""
+        clave = (ancho_util, len(self.dias), self.dias[-1] if self.dias else None)
+        if self._muestreo and self._muestreo[0] == clave:
+            return self._muestreo[1:]
+
+        max_barras = max(1, ancho_util // self.ancho_min_barra)
+        por_barra = max(1, math.ceil(len(self.dias) / max_barras))
+        etiquetas = []
+        valores = array('d')
+        for i in range(0, len(self.dias), por_barra):
+            grupo = self.totales[i:i + por_barra]
+            etiquetas.append(self.dias[i])
+            valores.append(sum(grupo) / len(grupo))
+        self._muestreo = (clave, etiquetas, valores, por_barra)
+        return etiquetas, valores, por_barra
+
+    def paintEvent(self, event):
+        pintor = QPainter(self)
+        pintor.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        color_texto = self.palette().color(self.foregroundRole())
+        pintor.setPen(color_texto)
+
+        area = QRectF(self.MARGEN_IZQ, self.MARGEN_SUP,
+                      self.width() - self.MARGEN_IZQ - self.MARGEN_DER,
+                      self.height() - self.MARGEN_SUP - self.MARGEN_INF)
+        if not self.dias or area.width() <= 0 or area.height() <= 0:
+            pintor.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No hay ingresos en el rango seleccionado.")
+            return
+
+        etiquetas, valores, por_barra = self._submuestrear(int(area.width()))
+        maximo = max(valores) or 1.0
+        titulo = "Ingresos Calculados por Día"
+        if por_barra > 1:
+            titulo += f" (promedio cada {por_barra} días)"
+        pintor.drawText(QRectF(0, 0, self.width(), self.MARGEN_SUP), Qt.AlignmentFlag.AlignCenter, titulo)
+
+        # Ejes y escala
+        pintor.drawLine(area.bottomLeft(), area.bottomRight())
+        pintor.drawLine(area.bottomLeft(), area.topLeft())
+        for paso in range(5):
+            valor = maximo * paso / 4
+            y = area.bottom() - area.height() * paso / 4
+            pintor.drawText(QRectF(0, y - 8, self.MARGEN_IZQ - 6, 16),
+                            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"${valor:,.0f}")
+
+        # Barras
+        ancho_barra = area.width() / len(valores)
+        pintor.setPen(Qt.PenStyle.NoPen)
+        pintor.setBrush(QColor("#88c0d0"))
+        for i, valor in enumerate(valores):
+            alto = area.height() * valor / maximo
+            pintor.drawRect(QRectF(area.left() + i * ancho_barra, area.bottom() - alto,
+                                   max(1.0, ancho_barra - 1), alto))
+
+        # Etiquetas de fecha: a lo sumo ~8 para que no se encimen
+        pintor.setPen(QPen(color_texto))
+        cada = max(1, math.ceil(len(etiquetas) / 8))
+        for i in range(0, len(etiquetas), cada):
+            x = area.left() + i * ancho_barra
+            pintor.drawText(QRectF(x - 40, area.bottom() + 4, 80, 16),
+                            Qt.AlignmentFlag.AlignCenter, etiquetas[i][5:])
@@ -0,0 +1,113 @@
+import sqlite3
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.vigilancia import DetectorCambios
+
+
+class BusInvalidacion(QObject):
+    """
+    Junta las invalidaciones de datos y refresca cada conjunto una sola vez
+    por vuelta del bucle de eventos.
+
+    Las mutaciones llaman invalidar(conjunto, ids): 'ids' acota el cambio a
+    esas claves y None pide recargar todo. Al vaciarse la cola, cada
+    conjunto sucio recibe refrescar(ids) con la unión de lo pedido (None si
+    alguna invalidación fue total). Los conjuntos sin refresco registrado
+    (p. ej. una pestaña que aún no se construyó) se ignoran.
+
+    'version_datos' (DatabaseManager.version_datos) evita las recargas
+    totales cuando la base no cambió desde el último refresco del conjunto.
+    """
+    refrescado = pyqtSignal(str, object)  # conjunto, ids (None = todo)
+
+    def __init__(self, version_datos=None, parent=None):
+        super().__init__(parent)
+        self._version_datos = version_datos
+        self._refrescos = {}
+        self._versiones = {}  # versión de los datos en el último refresco total
+        self._sucios = {}  # {conjunto: set de ids, o None = todo}
+        self._programado = False
+        self.omitidos = 0  # recargas evitadas por version_datos
+
+    def registrar(self, conjunto, refrescar):
+        """
+        Registra refrescar(ids) para 'conjunto'. Llamarlo justo antes de la
+        carga inicial: la versión de los datos se toma en este momento.
+        """
+        self._refrescos[conjunto] = refrescar
+        self._versiones[conjunto] = self._version()
+
+    def invalidar(self, conjunto, ids=None):
+        if conjunto not in self._refrescos:
+            return
+        if ids is None:
+            self._sucios[conjunto] = None
+        else:
+            pendientes = self._sucios.setdefault(conjunto, set())
+            if pendientes is not None:
+                pendientes.update(ids)
+        if not self._programado:
+            self._programado = True
+            QTimer.singleShot(0, self.vaciar)
+
+    def vaciar(self):
+        """Aplica ya los refrescos pendientes (normalmente lo hace el temporizador)."""
+        self._programado = False
+        sucios, self._sucios = self._sucios, {}
+        version = self._version() if any(ids is None for ids in sucios.values()) else None
+        for conjunto, ids in sucios.items():
+            if ids is None:
+                if version is not None and version == self._versiones.get(conjunto):
+                    self.omitidos += 1
+                    continue
+                self._versiones[conjunto] = version
+            self._refrescos[conjunto](ids)
+            self.refrescado.emit(conjunto, ids)
+
+    def _version(self):
+        return self._version_datos() if self._version_datos is not None else None
+
+
+class VigilanteCambios(QObject):
+    """
+    Revisa cada 'intervalo_ms' si otro proceso cambió la base (ver
+    core.vigilancia.DetectorCambios) y emite 'cambios' con las tablas
+    tocadas. En reposo cada tic cuesta una lectura de PRAGMA data_version.
+    Si la base no responde (p. ej. otra caja la retiene más allá de
+    busy_timeout) se detiene y emite 'fallo' con el mensaje.
+    """
+    cambios = pyqtSignal(object)  # set de tablas
+    fallo = pyqtSignal(str)
+
+    def __init__(self, db, intervalo_ms=1000, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.detector = None
+        self._temporizador = QTimer(self)
+        self._temporizador.setInterval(intervalo_ms)
+        self._temporizador.timeout.connect(self.revisar)
+
+    def iniciar(self):
+        """Empieza a revisar. Devuelve False (y emite 'fallo') si no se pudo leer la base."""
+        if self.detector is None:
+            try:
+                self.detector = DetectorCambios(self.db)
+            except sqlite3.OperationalError as e:
+                self.fallo.emit(f"No se pudo iniciar el tablero en vivo: {e}")
+                return False
+        self._temporizador.start()
+        return True
+
+    def detener(self):
+        self._temporizador.stop()
+
+    def revisar(self):
+        try:
+            tablas = self.detector.revisar()
+        except sqlite3.OperationalError as e:
+            self.detener()
+            self.fallo.emit(f"El tablero en vivo se detuvo: {e}")
+            return
+        if tablas:
+            self.cambios.emit(tablas)
@@ -1,39 +1,102 @@
 import sys
 import os
 import datetime
+import importlib
+import importlib.util
+import threading
 
 # --- Importaciones de PyQt6 ---
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QFormLayout,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QMessageBox,
+    QLineEdit, QPushButton, QTableView, QComboBox, QMessageBox,
     QDoubleSpinBox, QSpinBox, QCheckBox, QHBoxLayout, QLabel, QHeaderView,
-    QDialog, QDialogButtonBox, QStyle, QDateEdit
+    QDialog, QDialogButtonBox, QStyle, QDateEdit, QProgressDialog, QFileDialog
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QTimer, QModelIndex
 from PyQt6.QtGui import QIcon 
 
 # --- Importaciones para Reportes ---
-try:
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    REPORTES_ENABLED = True
-except ImportError:
-    REPORTES_ENABLED = False
-    print("Advertencia: 'pandas', 'openpyxl' o 'matplotlib' no están instalados.")
+# openpyxl tarda en importarse: core.exportar la carga recién al exportar a
+# Excel, y el precalentamiento la importa en segundo plano tras mostrar la ventana.
+MODULOS_PRECALENTAR = ["openpyxl"]
+
+def _precalentar_modulos():
+    for modulo in MODULOS_PRECALENTAR:
+        if importlib.util.find_spec(modulo.split(".")[0]) is not None:
+            importlib.import_module(modulo)
 
 # --- Importar nuestro propio código ---
 from core.database import DatabaseManager
+from core.exportar import exportar_cierres, formatos_disponibles
+from core.importar import importar_csv, importar_conteo_csv
 # Importamos TODOS los diálogos
-from .dialogs import PagoDialog, CierreDialog, InputDialog
+from .dialogs import PagoDialog, CierreDialog, InputDialog, ProduccionLoteDialog, DiagnosticoDialog
+from .servicio_db import ServicioDB, AvisosCatalogo
+from .invalidacion import BusInvalidacion, VigilanteCambios
+from .grafico import GraficoIngresos, CacheGraficoIngresos
+from .modelos import (
+    ModeloTablaColumnar, COLUMNAS_CIERRES, COLUMNAS_CUADRE, COLUMNAS_PRODUCTOS,
+    COLUMNAS_TRABAJADORES, COLUMNAS_PROVEEDORES
+)
+
+
+def _lotes_tabla_productos(productos, ver_ocultos, tamano_lote=500):
+    """Lotes de filas de la tabla de productos (ver SQL_TABLA_PRODUCTOS) a partir de diccionarios."""
+    visibles = [p for p in productos if ver_ocultos or not p['oculto']]
+    for i in range(0, len(visibles), tamano_lote):
+        yield [(p['id_prod'], p['nombre'], p['precio'], p['stock'], p['produccion_dia'], p['es_gaseosa'], p['oculto'])
+               for p in visibles[i:i + tamano_lote]]
+
+
+# Rangos del gráfico de ingresos; el primero es el inicial (y el que se precarga)
+GRAFICO_RANGOS = (30, 90, 365, 730)
+
+# Tablero en vivo: cada cuánto se revisa si otra caja cambió la base, y qué
+# conjuntos del bus se refrescan por cada tabla vigilada que cambió
+INTERVALO_TABLERO_MS = 1000
+CONJUNTOS_POR_TABLA = {
+    "productos": ("productos",),
+    "trabajadores": ("trabajadores",),
+    "proveedores": ("proveedores",),
+    "resumen_ingresos_dia": ("ingresos", "caja", "cierres"),
+    "resumen_pagos_dia": ("caja",),
+}
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    """
+    Ventana principal. Cada pestaña se construye y se carga la primera vez
+    que se muestra; tras el primer pintado se precargan en segundo plano el
+    catálogo de productos y la serie del gráfico. 'traza' (ui.arranque.TrazaArranque)
+    registra los tiempos de ese arranque.
+    """
+    def __init__(self, precalentar_reportes=True, diagnostico=False, db_name="panaderia.db", traza=None):
         super().__init__()
+        self._precalentar_reportes = precalentar_reportes
+        self._primer_show = True
+        self.traza = traza
         self.setWindowTitle("Sistema de Gestión de Panadería (v2.1 - Pago Proveedor)")
         self.setGeometry(100, 100, 1000, 700)
         
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(db_name)
+        if diagnostico:
+            # Métricas de cada llamada y registro de consultas lentas
+            self.db.activar_instrumentacion()
+            menu = self.menuBar().addMenu("Herramientas")
+            menu.addAction("Diagnóstico de base de datos...", self.slot_mostrar_diagnostico)
+        # Las escrituras y operaciones largas corren en el hilo del servicio
+        self.servicio = ServicioDB(self.db, self)
+        self.servicio.ocupado.connect(self._al_cambiar_ocupado)
+        # Las mutaciones marcan conjuntos de datos sucios; cada vista se
+        # refresca una sola vez por vuelta del bucle de eventos
+        self.bus = BusInvalidacion(self.db.version_datos, self)
+        # Se crea al activar el tablero en vivo de la pestaña de cierres
+        self.vigilante = None
+        # Los cambios del catálogo de productos refrescan solo lo que cambió
+        self.avisos_catalogo = AvisosCatalogo(self)
+        self.avisos_catalogo.cambio.connect(self._al_cambiar_catalogo)
+        if self.db.catalogo is not None:
+            self.db.catalogo.suscribir(self.avisos_catalogo)
         
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
@@ -50,23 +113,54 @@ class MainWindow(QMainWindow):
         self.tab_widget.addTab(self.tab_personal, "Personal")
         self.tab_widget.addTab(self.tab_proveedores, "Proveedores")
         self.tab_widget.addTab(self.tab_reportes, "Ejecutar Cierre y Reportes") # Renombrada
-        
-        # --- Inicializar ---
-        self.init_cierres_ui() # Nueva pestaña de cierres
-        self.init_stock_ui()
-        self.init_personal_ui() # Modificada
-        self.init_proveedores_ui() # Modificada
-        self.init_reportes_ui() # Modificada
 
-        # Cargar datos iniciales
-        self.refresh_combobox_productos()
-        self.refresh_table_productos()
-        self.refresh_table_trabajadores()
-        self.refresh_table_proveedores()
+        # La serie del gráfico vive fuera de la pestaña para poder precargarla
+        self.cache_grafico = CacheGraficoIngresos()
+
+        # --- Inicializar a demanda ---
+        # {pestaña: (construir, conjunto de datos, refrescar(ids))}; se quita al
+        # construirla, y refrescar(None) hace la carga inicial
+        self._pestanas_pendientes = {
+            self.tab_cierres: (self.init_cierres_ui, None, None), # Nueva pestaña de cierres
+            self.tab_stock: (self.init_stock_ui, "productos", self._refrescar_productos),
+            self.tab_personal: (self.init_personal_ui, "trabajadores", lambda ids: self.refresh_table_trabajadores()), # Modificada
+            self.tab_proveedores: (self.init_proveedores_ui, "proveedores", lambda ids: self.refresh_table_proveedores()), # Modificada
+            self.tab_reportes: (self.init_reportes_ui, "ingresos", self._refrescar_grafico), # Modificada
+        }
+        self.tab_widget.currentChanged.connect(self._al_cambiar_pestana)
+        self._al_cambiar_pestana(self.tab_widget.currentIndex())
+        self._marcar("ventana_creada")
+
+    def _marcar(self, evento):
+        if self.traza is not None:
+            self.traza.marcar(evento)
+
+    def _al_cambiar_pestana(self, indice):
+        """Construye y carga la pestaña la primera vez que se muestra."""
+        pestana = self.tab_widget.widget(indice)
+        pendiente = self._pestanas_pendientes.pop(pestana, None)
+        if pendiente is None:
+            return
+        construir, conjunto, refrescar = pendiente
+        construir()
+        if conjunto:
+            self.bus.registrar(conjunto, refrescar)
+            refrescar(None)
+        self._marcar(f"pestana:{self.tab_widget.tabText(indice)}")
 
     # --- PESTAÑA 1: CIERRES Y CAJA (ANTES VENTAS) ---
     def init_cierres_ui(self):
         layout = QVBoxLayout(self.tab_cierres)
+
+        # --- Tablero en vivo (varias cajas sobre la misma base) ---
+        tablero_layout = QHBoxLayout()
+        self.check_tablero = QCheckBox("Tablero en vivo (se actualiza con los cambios de otras cajas)")
+        self.check_tablero.toggled.connect(self.slot_tablero_en_vivo)
+        self.label_tablero = QLabel("")
+        tablero_layout.addWidget(self.check_tablero)
+        tablero_layout.addWidget(self.label_tablero)
+        tablero_layout.addStretch()
+        layout.addLayout(tablero_layout)
         
         # --- Selector de Fechas ---
         date_layout = QHBoxLayout()
@@ -93,38 +187,70 @@ class MainWindow(QMainWindow):
         layout.addLayout(date_layout)
 
         # --- Tabla de Cierres ---
-        self.table_cierres = QTableWidget()
-        self.table_cierres_headers = ["Fecha", "Producto", "Stock Inicial", "Producción", "Stock Final", "Ventas (calc)", "Ingresos (calc)"]
-        self.table_cierres.setColumnCount(len(self.table_cierres_headers))
-        self.table_cierres.setHorizontalHeaderLabels(self.table_cierres_headers)
-        self.table_cierres.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table_cierres.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table_cierres = QTableView()
+        self.model_cierres = ModeloTablaColumnar(COLUMNAS_CIERRES, self)
+        self.table_cierres.setModel(self.model_cierres)
+        self.table_cierres.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_cierres.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table_cierres.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         layout.addWidget(self.table_cierres)
 
-        # --- Cuadre de Caja Semanal ---
+        # --- Cuadre de Caja por Período ---
         caja_layout = QVBoxLayout()
-        self.label_ingresos_semana = QLabel("Ingresos (7 días): $0.00")
-        self.label_pagos_semana = QLabel("Pagos (7 días): $0.00")
-        self.label_balance_semana = QLabel("Balance (7 días): $0.00")
+        periodo_layout = QHBoxLayout()
+        self.caja_date_inicio = QDateEdit()
+        self.caja_date_inicio.setCalendarPopup(True)
+        self.caja_date_inicio.setDate(QDate.currentDate().addDays(-6))
         
-        font = self.label_ingresos_semana.font()
-        font.setPointSize(14)
-        self.label_ingresos_semana.setFont(font)
-        self.label_pagos_semana.setFont(font)
-        self.label_balance_semana.setFont(font)
+        self.caja_date_fin = QDateEdit()
+        self.caja_date_fin.setCalendarPopup(True)
+        self.caja_date_fin.setDate(QDate.currentDate())
+        
+        self.caja_combo_periodo = QComboBox()
+        self.caja_combo_periodo.addItem("Por día", "dia")
+        self.caja_combo_periodo.addItem("Por semana", "semana")
+        self.caja_combo_periodo.addItem("Por mes", "mes")
         
-        self.btn_cuadrar_caja = QPushButton(" Calcular Cuadre de Caja Semanal")
+        self.btn_cuadrar_caja = QPushButton(" Calcular Cuadre de Caja")
         icon_caja = self.style().standardIcon(QStyle.StandardPixmap.SP_ArrowRight)
         self.btn_cuadrar_caja.setIcon(QIcon(icon_caja))
         self.btn_cuadrar_caja.clicked.connect(self.slot_cuadrar_caja)
         
-        caja_layout.addWidget(QLabel("--- CUADRE DE CAJA SEMANAL ---"))
-        caja_layout.addWidget(self.label_ingresos_semana)
-        caja_layout.addWidget(self.label_pagos_semana)
-        caja_layout.addWidget(self.label_balance_semana)
-        caja_layout.addWidget(self.btn_cuadrar_caja)
+        periodo_layout.addWidget(QLabel("Desde:"))
+        periodo_layout.addWidget(self.caja_date_inicio)
+        periodo_layout.addWidget(QLabel("Hasta:"))
+        periodo_layout.addWidget(self.caja_date_fin)
+        periodo_layout.addWidget(self.caja_combo_periodo)
+        periodo_layout.addWidget(self.btn_cuadrar_caja)
+        periodo_layout.addStretch()
+        
+        self.table_cuadre = QTableView()
+        self.model_cuadre = ModeloTablaColumnar(COLUMNAS_CUADRE, self)
+        self.table_cuadre.setModel(self.model_cuadre)
+        self.table_cuadre.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table_cuadre.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table_cuadre.horizontalHeader().setStretchLastSection(True)
+        
+        self.label_ingresos_periodo = QLabel("Ingresos: $0.00")
+        self.label_pagos_periodo = QLabel("Pagos: $0.00")
+        self.label_balance_periodo = QLabel("Balance: $0.00")
+        
+        font = self.label_ingresos_periodo.font()
+        font.setPointSize(14)
+        self.label_ingresos_periodo.setFont(font)
+        self.label_pagos_periodo.setFont(font)
+        self.label_balance_periodo.setFont(font)
+        
+        totales_layout = QHBoxLayout()
+        totales_layout.addWidget(self.label_ingresos_periodo)
+        totales_layout.addWidget(self.label_pagos_periodo)
+        totales_layout.addWidget(self.label_balance_periodo)
+        
+        caja_layout.addWidget(QLabel("--- CUADRE DE CAJA ---"))
+        caja_layout.addLayout(periodo_layout)
+        caja_layout.addWidget(self.table_cuadre)
+        caja_layout.addLayout(totales_layout)
         
         layout.addLayout(caja_layout)
 
@@ -172,23 +298,27 @@ class MainWindow(QMainWindow):
         self.btn_add_produccion.setIcon(QIcon(icon_prod))
         self.btn_add_produccion.clicked.connect(self.slot_agregar_produccion)
         
+        self.btn_add_produccion_lote = QPushButton(" Registrar Producción/Compra en Lote")
+        self.btn_add_produccion_lote.setIcon(QIcon(icon_prod))
+        self.btn_add_produccion_lote.clicked.connect(self.slot_agregar_produccion_lote)
+        
         form_col.addWidget(QLabel("--- Registrar Producción (Panes) / Compra (Gaseosas) ---"))
         form_col.addLayout(form_prod)
         form_col.addWidget(self.btn_add_produccion)
+        form_col.addWidget(self.btn_add_produccion_lote)
         form_col.addStretch()
 
         # --- Columna Derecha: Tabla ---
         table_col = QVBoxLayout()
         
         self.stock_check_ver_ocultos = QCheckBox("Ver productos ocultos")
-        self.stock_check_ver_ocultos.stateChanged.connect(self.refresh_table_productos)
-        
-        self.table_productos = QTableWidget()
-        self.table_productos_headers = ["ID", "Nombre", "Precio", "Stock Actual", "Prod. Hoy", "Gaseosa", "Oculto"]
-        self.table_productos.setColumnCount(len(self.table_productos_headers))
-        self.table_productos.setHorizontalHeaderLabels(self.table_productos_headers)
-        self.table_productos.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table_productos.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.stock_check_ver_ocultos.stateChanged.connect(lambda _: self.refresh_table_productos())
+        
+        self.table_productos = QTableView()
+        self.model_productos = ModeloTablaColumnar(COLUMNAS_PRODUCTOS, self)
+        self.table_productos.setModel(self.model_productos)
+        self.table_productos.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_productos.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table_productos.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         self.btn_toggle_oculto_prod = QPushButton(" Ocultar/Mostrar Seleccionado")
@@ -245,13 +375,11 @@ class MainWindow(QMainWindow):
         self.personal_check_ver_inactivos = QCheckBox("Ver personal inactivo (archivado)")
         self.personal_check_ver_inactivos.stateChanged.connect(self.refresh_table_trabajadores)
         
-        self.table_trabajadores = QTableWidget()
-        # Cabeceras Modificadas
-        self.table_trabajadores_headers = ["ID", "Nombre", "Contacto", "Cargo", "Tipo Pago", "Salario", "Activo"]
-        self.table_trabajadores.setColumnCount(len(self.table_trabajadores_headers))
-        self.table_trabajadores.setHorizontalHeaderLabels(self.table_trabajadores_headers)
-        self.table_trabajadores.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table_trabajadores.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table_trabajadores = QTableView()
+        self.model_trabajadores = ModeloTablaColumnar(COLUMNAS_TRABAJADORES, self)
+        self.table_trabajadores.setModel(self.model_trabajadores)
+        self.table_trabajadores.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_trabajadores.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table_trabajadores.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         btn_layout = QHBoxLayout()
@@ -311,13 +439,12 @@ class MainWindow(QMainWindow):
         self.prov_check_ver_inactivos = QCheckBox("Ver proveedores inactivos (archivados)")
         self.prov_check_ver_inactivos.stateChanged.connect(self.refresh_table_proveedores)
         
-        self.table_proveedores = QTableWidget()
+        self.table_proveedores = QTableView()
         # CAMBIO: Eliminada columna "Pago Mensual"
-        self.table_prov_headers = ["ID", "Nombre", "Contacto", "Suministro", "Activo"]
-        self.table_proveedores.setColumnCount(len(self.table_prov_headers)) # Ajustado a 5
-        self.table_proveedores.setHorizontalHeaderLabels(self.table_prov_headers)
-        self.table_proveedores.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table_proveedores.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.model_proveedores = ModeloTablaColumnar(COLUMNAS_PROVEEDORES, self)
+        self.table_proveedores.setModel(self.model_proveedores)
+        self.table_proveedores.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_proveedores.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table_proveedores.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         btn_layout = QHBoxLayout()
@@ -357,29 +484,77 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.btn_ejecutar_cierre)
         layout.addSpacing(40)
         
-        # --- Exportación a Excel ---
+        # --- Exportación a Excel / CSV ---
         layout.addWidget(QLabel("--- Exportar Reportes ---"))
-        self.btn_exportar_excel = QPushButton(" Exportar Reporte de CIERRES a Excel")
+        export_layout = QHBoxLayout()
+        self.export_check_todo = QCheckBox("Todo el historial")
+        self.export_check_todo.setChecked(True)
+        self.export_date_inicio = QDateEdit()
+        self.export_date_inicio.setCalendarPopup(True)
+        self.export_date_inicio.setDate(QDate.currentDate().addMonths(-1))
+        self.export_date_fin = QDateEdit()
+        self.export_date_fin.setCalendarPopup(True)
+        self.export_date_fin.setDate(QDate.currentDate())
+        self.export_check_todo.toggled.connect(self.export_date_inicio.setDisabled)
+        self.export_check_todo.toggled.connect(self.export_date_fin.setDisabled)
+        self.export_date_inicio.setDisabled(True)
+        self.export_date_fin.setDisabled(True)
+
+        export_layout.addWidget(self.export_check_todo)
+        export_layout.addWidget(QLabel("Desde:"))
+        export_layout.addWidget(self.export_date_inicio)
+        export_layout.addWidget(QLabel("Hasta:"))
+        export_layout.addWidget(self.export_date_fin)
+        export_layout.addStretch()
+        layout.addLayout(export_layout)
+
+        formatos = "Excel o CSV" if ".xlsx" in formatos_disponibles() else "CSV; instale openpyxl para Excel"
+        self.btn_exportar_excel = QPushButton(f" Exportar Reporte de CIERRES ({formatos})")
         icon_excel = self.style().standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton) 
         self.btn_exportar_excel.setIcon(QIcon(icon_excel))
         self.btn_exportar_excel.clicked.connect(self.slot_exportar_excel) # Modificado
-        if not REPORTES_ENABLED:
-            self.btn_exportar_excel.setDisabled(True)
         
         layout.addWidget(self.btn_exportar_excel)
         layout.addSpacing(20)
 
-        # --- Gráficos ---
+        # --- Importación desde CSV ---
+        layout.addWidget(QLabel("--- Importar desde CSV ---"))
+        importar_layout = QHBoxLayout()
+        self.importar_combo_tipo = QComboBox()
+        self.importar_combo_tipo.addItem("Productos", "productos")
+        self.importar_combo_tipo.addItem("Personal", "trabajadores")
+        self.importar_combo_tipo.addItem("Proveedores", "proveedores")
+        self.importar_combo_tipo.addItem("Conteo de stock (cierre de hoy)", "conteo")
+        self.btn_importar_csv = QPushButton(" Importar CSV...")
+        icon_importar = self.style().standardIcon(QStyle.StandardPixmap.SP_DialogOpenButton)
+        self.btn_importar_csv.setIcon(QIcon(icon_importar))
+        self.btn_importar_csv.clicked.connect(self.slot_importar_csv)
+        importar_layout.addWidget(self.importar_combo_tipo)
+        importar_layout.addWidget(self.btn_importar_csv)
+        importar_layout.addStretch()
+        layout.addLayout(importar_layout)
+        layout.addSpacing(20)
+
+        # --- Gráficos (panel embebido) ---
         layout.addWidget(QLabel("--- Gráficos ---"))
-        self.btn_generar_grafico = QPushButton(" Generar Gráfico de INGRESOS (Últimos 30 días)")
+        grafico_layout = QHBoxLayout()
+        self.grafico_combo_rango = QComboBox()
+        for dias in GRAFICO_RANGOS:
+            self.grafico_combo_rango.addItem(f"Últimos {dias} días", dias)
+        self.grafico_combo_rango.currentIndexChanged.connect(self.slot_generar_grafico)
+
+        self.btn_generar_grafico = QPushButton(" Actualizar Gráfico de INGRESOS")
         icon_chart = self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogDetailedView)
         self.btn_generar_grafico.setIcon(QIcon(icon_chart))
         self.btn_generar_grafico.clicked.connect(self.slot_generar_grafico) # Modificado
-        if not REPORTES_ENABLED:
-            self.btn_generar_grafico.setDisabled(True)
-            
-        layout.addWidget(self.btn_generar_grafico)
-        layout.addStretch()
+
+        grafico_layout.addWidget(self.grafico_combo_rango)
+        grafico_layout.addWidget(self.btn_generar_grafico)
+        grafico_layout.addStretch()
+        layout.addLayout(grafico_layout)
+
+        self.grafico_ingresos = GraficoIngresos()
+        layout.addWidget(self.grafico_ingresos, 1)
 
     # --- SLOTS (Lógica de la Aplicación) ---
 
@@ -394,72 +569,126 @@ class MainWindow(QMainWindow):
             msgBox.setIcon(QMessageBox.Icon.Critical)
         msgBox.exec()
 
+    def _al_cambiar_ocupado(self, ocupado):
+        if ocupado:
+            self.statusBar().showMessage("Procesando en segundo plano...")
+        else:
+            self.statusBar().clearMessage()
+
+    def _despachar(self, tarea, *args, al_exito=None, titulo_exito="Éxito", titulo_error="Error", mostrar_exito=True):
+        """
+        Envía al servicio una tarea que devuelve (success, message) y muestra
+        el resultado al terminar; 'al_exito' se llama solo si tuvo éxito.
+        """
+        def al_terminar(resultado):
+            success, message = resultado
+            if success:
+                if mostrar_exito:
+                    self._show_message(titulo_exito, message)
+                if al_exito:
+                    al_exito()
+            else:
+                self._show_message(titulo_error, message, "error")
+
+        def al_fallar(mensaje):
+            self._show_message(titulo_error, mensaje, "error")
+
+        self.servicio.enviar(tarea, *args, al_terminar=al_terminar, al_fallar=al_fallar)
+
+    def slot_mostrar_diagnostico(self):
+        DiagnosticoDialog(self.db.instrumentacion, self).exec()
+
     # --- Slots de Cierres y Caja (NUEVOS) ---
     
     def slot_buscar_cierres(self):
         fecha_inicio = self.date_inicio.date().toString("yyyy-MM-dd")
         fecha_fin = self.date_fin.date().toString("yyyy-MM-dd")
         
-        cierres = self.db.get_cierres_por_rango(fecha_inicio, fecha_fin)
-        
-        self.table_cierres.setRowCount(0)
-        for i, cierre in enumerate(cierres):
-            self.table_cierres.insertRow(i)
-            self.table_cierres.setItem(i, 0, QTableWidgetItem(cierre['fecha']))
-            self.table_cierres.setItem(i, 1, QTableWidgetItem(cierre['nombre_producto']))
-            self.table_cierres.setItem(i, 2, QTableWidgetItem(str(cierre['stock_inicial'])))
-            self.table_cierres.setItem(i, 3, QTableWidgetItem(str(cierre['produccion_dia'])))
-            self.table_cierres.setItem(i, 4, QTableWidgetItem(str(cierre['stock_final_conteo'])))
-            self.table_cierres.setItem(i, 5, QTableWidgetItem(str(cierre['ventas_calculadas'])))
-            self.table_cierres.setItem(i, 6, QTableWidgetItem(f"${cierre['ingresos_calculados']:.2f}"))
+        # El modelo pide más lotes a la DB a medida que se desplaza la tabla
+        self.model_cierres.cargar(self.db.iter_cierres_por_rango(fecha_inicio, fecha_fin))
 
     def slot_cuadrar_caja(self):
-        # Ahora usa la nueva función de la DB
-        ingresos = self.db.get_ingresos_calculados_semana()
-        pagos = self.db.get_pagos_semana()
-        balance = ingresos - pagos
-        
-        self.label_ingresos_semana.setText(f"Ingresos (7 días): ${ingresos:.2f}")
-        self.label_pagos_semana.setText(f"Pagos (7 días): ${pagos:.2f}")
-        self.label_balance_semana.setText(f"Balance (7 días): ${balance:.2f}")
-        
-        self._show_message("Cuadre de Caja Semanal",
-                           f"Ingresos Calculados: ${ingresos:.2f}\n"
-                           f"Pagos Registrados: ${pagos:.2f}\n"
-                           f"-------------------\n"
-                           f"Balance: ${balance:.2f}")
+        fecha_inicio = self.caja_date_inicio.date().toString("yyyy-MM-dd")
+        fecha_fin = self.caja_date_fin.date().toString("yyyy-MM-dd")
+        periodo = self.caja_combo_periodo.currentData()
+
+        def calcular(db, progreso):
+            return db.get_cuadre_caja(fecha_inicio, fecha_fin, periodo)
+
+        self.servicio.enviar(calcular, al_terminar=self._mostrar_cuadre_caja,
+                             al_fallar=lambda m: self._show_message("Error", m, "error"))
+
+    def slot_tablero_en_vivo(self, activo):
+        """Con el tablero activo, un QTimer revisa la base y refresca solo lo que otra caja cambió."""
+        if not activo:
+            self.vigilante.detener()
+            self.label_tablero.setText("")
+            return
+        if self.vigilante is None:
+            self.vigilante = VigilanteCambios(self.db, INTERVALO_TABLERO_MS, self)
+            self.vigilante.cambios.connect(self._al_detectar_cambios)
+            self.vigilante.fallo.connect(self._al_fallar_tablero)
+            self.bus.registrar("caja", lambda ids: self.slot_cuadrar_caja())
+            self.bus.registrar("cierres", lambda ids: self.slot_buscar_cierres())
+        if not self.vigilante.iniciar():
+            return
+        self.slot_buscar_cierres()
+        self.slot_cuadrar_caja()
+        self.label_tablero.setText(f"Actualizado {datetime.datetime.now():%H:%M:%S}")
+
+    def _al_fallar_tablero(self, mensaje):
+        self._show_message("Tablero en vivo", mensaje, "error")
+        # Destildar detiene el vigilante y limpia la etiqueta (slot_tablero_en_vivo)
+        self.check_tablero.setChecked(False)
+
+    def _al_detectar_cambios(self, tablas):
+        if "productos" in tablas and self.db.catalogo is not None:
+            # El catálogo en memoria quedó viejo; su aviso también marca los productos
+            self.db.catalogo.invalidar()
+        for tabla in tablas:
+            for conjunto in CONJUNTOS_POR_TABLA.get(tabla, ()):
+                self.bus.invalidar(conjunto)
+        self.label_tablero.setText(f"Actualizado {datetime.datetime.now():%H:%M:%S}")
+
+    def _mostrar_cuadre_caja(self, baldes):
+        filas_cuadre = []
+        for balde in baldes:
+            detalle = "; ".join(f"{tipo}/{tipo_pago}: ${total:.2f}"
+                                for (tipo, tipo_pago), total in sorted(balde["pagos_por_tipo"].items()))
+            filas_cuadre.append((balde["periodo"], balde["ingresos"], balde["pagos"], balde["balance"], detalle))
+        self.model_cuadre.cargar([filas_cuadre] if filas_cuadre else [])
+
+        ingresos = sum(balde["ingresos"] for balde in baldes)
+        pagos = sum(balde["pagos"] for balde in baldes)
+        self.label_ingresos_periodo.setText(f"Ingresos: ${ingresos:.2f}")
+        self.label_pagos_periodo.setText(f"Pagos: ${pagos:.2f}")
+        self.label_balance_periodo.setText(f"Balance: ${ingresos - pagos:.2f}")
 
     # --- Slots de Productos y Stock ---
     
-    def refresh_combobox_productos(self):
+    def refresh_combobox_productos(self, productos=None):
         """Recarga los combobox de productos en Pestaña Ventas y Pestaña Stock."""
-        productos = self.db.get_productos(ver_ocultos=False)
+        if productos is None:
+            productos = self.db.get_productos(ver_ocultos=False)
         
         self.stock_combo_producto_prod.clear()
         
-        if not productos:
+        if not any(not prod['oculto'] for prod in productos):
             self.stock_combo_producto_prod.addItem("No hay productos disponibles")
             return
             
         for prod in productos:
+            if prod['oculto']:
+                continue
             texto = f"{prod['nombre']} (Stock: {prod['stock']})"
             self.stock_combo_producto_prod.addItem(texto, prod['id_prod'])
 
-    def refresh_table_productos(self):
+    def refresh_table_productos(self, productos=None):
         ver_ocultos = self.stock_check_ver_ocultos.isChecked()
-        productos = self.db.get_productos(ver_ocultos)
-        
-        self.table_productos.setRowCount(0) # Limpiar tabla
-        for i, prod in enumerate(productos):
-            self.table_productos.insertRow(i)
-            self.table_productos.setItem(i, 0, QTableWidgetItem(str(prod['id_prod'])))
-            self.table_productos.setItem(i, 1, QTableWidgetItem(prod['nombre']))
-            self.table_productos.setItem(i, 2, QTableWidgetItem(f"${prod['precio']:.2f}"))
-            self.table_productos.setItem(i, 3, QTableWidgetItem(str(prod['stock'])))
-            self.table_productos.setItem(i, 4, QTableWidgetItem(str(prod['produccion_dia'])))
-            # self.table_productos.setItem(i, 5, QTableWidgetItem(str(prod['vendido_dia']))) # Ya no es relevante aquí
-            self.table_productos.setItem(i, 5, QTableWidgetItem("Sí" if prod['es_gaseosa'] else "No"))
-            self.table_productos.setItem(i, 6, QTableWidgetItem("Sí" if prod['oculto'] else "No"))
+        if productos is None:
+            self.model_productos.cargar(self.db.iter_productos(ver_ocultos))
+        else:
+            self.model_productos.cargar(_lotes_tabla_productos(productos, ver_ocultos))
         
         # Ocultar la columna ID (es útil tenerla pero no verla)
         self.table_productos.setColumnHidden(0, True)
@@ -474,20 +703,16 @@ class MainWindow(QMainWindow):
             self._show_message("Error", "Nombre y Precio son obligatorios.", "error")
             return
         
-        success, message = self.db.add_producto(nombre, precio, stock, es_gaseosa)
-        
-        if success:
-            self._show_message("Éxito", message)
+        def al_exito():
             # Limpiar formulario
             self.stock_entry_nombre.clear()
             self.stock_spin_precio.setValue(0.01)
             self.stock_spin_stock_inicial.setValue(0)
             self.stock_check_gaseosa.setChecked(False)
-            # Actualizar vistas
-            self.refresh_table_productos()
-            self.refresh_combobox_productos()
-        else:
-            self._show_message("Error al Guardar", message, "error")
+            # Las vistas se actualizan con el aviso del catálogo
+
+        self._despachar("add_producto", nombre, precio, stock, es_gaseosa,
+                        al_exito=al_exito, titulo_error="Error al Guardar")
 
     def slot_agregar_produccion(self):
         id_prod = self.stock_combo_producto_prod.currentData()
@@ -500,13 +725,63 @@ class MainWindow(QMainWindow):
         
         if dialog.exec():
             cantidad = dialog.get_value()
-            success, message = self.db.update_produccion_stock(id_prod, cantidad)
-            if success:
-                self._show_message("Éxito", message)
-                self.refresh_table_productos()
+            self._despachar("update_produccion_stock", id_prod, cantidad)
+
+    def slot_agregar_produccion_lote(self):
+        productos = self.db.get_productos(ver_ocultos=False)
+        if not productos:
+            self._show_message("Error", "No hay productos disponibles.", "error")
+            return
+
+        dialog = ProduccionLoteDialog(productos, self)
+        if dialog.exec():
+            entradas = dialog.get_entradas()
+            if not entradas:
+                return
+            # Una transacción para todo el lote y un solo aviso del catálogo
+            self._despachar("update_produccion_stock_lote", entradas)
+
+    def _refrescar_productos(self, ids):
+        """
+        Refresca la tabla y el combobox de productos: solo las filas de 'ids'
+        (tomadas del catálogo, sin consultar) o, con None, todo con una sola
+        lectura del catálogo.
+        """
+        if ids is None:
+            productos = self.db.get_productos(ver_ocultos=True)
+            self.refresh_table_productos(productos)
+            self.refresh_combobox_productos(productos)
+            return
+        productos = [p for p in map(self.db.catalogo.obtener, ids) if p is not None]
+        self._actualizar_filas_productos(productos)
+        self._actualizar_combo_productos(productos)
+
+    def _al_cambiar_catalogo(self, evento, ids):
+        """Marca sucios los productos del aviso; un alta o una caché invalidada piden recargar todo."""
+        self.bus.invalidar("productos", ids if evento == "modificado" else None)
+
+    def _actualizar_filas_productos(self, productos):
+        ver_ocultos = self.stock_check_ver_ocultos.isChecked()
+        visibles = [p.como_fila_tabla() for p in productos if ver_ocultos or not p.oculto]
+        ocultados = any(self.model_productos.contiene(p.id_prod)
+                        for p in productos if p.oculto and not ver_ocultos)
+        faltantes = self.model_productos.actualizar_filas(visibles)
+        # Las filas de lotes aún no pedidos salen del catálogo ya actualizado;
+        # solo hay que recargar si cambió qué productos se ven
+        if ocultados or (faltantes and not self.model_productos.canFetchMore(QModelIndex())):
+            self.refresh_table_productos()
+
+    def _actualizar_combo_productos(self, productos):
+        combo = self.stock_combo_producto_prod
+        posiciones = {combo.itemData(i): i for i in range(combo.count())}
+        for prod in productos:
+            i = posiciones.get(prod.id_prod)
+            if (i is None) != bool(prod.oculto):
+                # Apareció o desapareció de la lista: reconstruirla
                 self.refresh_combobox_productos()
-            else:
-                self._show_message("Error", message, "error")
+                return
+            if i is not None:
+                combo.setItemText(i, f"{prod.nombre} (Stock: {prod.stock})")
 
     def _get_selected_id(self, tabla):
         """Helper para obtener el ID de la fila seleccionada."""
@@ -516,35 +791,18 @@ class MainWindow(QMainWindow):
             return None
         
         # El ID está en la columna 0 (oculta)
-        id_item = tabla.item(selected_rows[0].row(), 0)
-        return int(id_item.text())
+        return tabla.model().valor(selected_rows[0].row(), 0)
 
     def slot_toggle_producto(self):
         id_prod = self._get_selected_id(self.table_productos)
         if id_prod:
-            success, message = self.db.toggle_producto_oculto(id_prod)
-            if success:
-                self.refresh_table_productos()
-                self.refresh_combobox_productos()
-            else:
-                self._show_message("Error", message, "error")
+            self._despachar("toggle_producto_oculto", id_prod, mostrar_exito=False)
 
     # --- Slots de Personal (MODIFICADOS) ---
     
     def refresh_table_trabajadores(self):
         ver_inactivos = self.personal_check_ver_inactivos.isChecked()
-        trabajadores = self.db.get_trabajadores(ver_inactivos)
-        
-        self.table_trabajadores.setRowCount(0)
-        for i, trab in enumerate(trabajadores):
-            self.table_trabajadores.insertRow(i)
-            self.table_trabajadores.setItem(i, 0, QTableWidgetItem(str(trab['id_trab'])))
-            self.table_trabajadores.setItem(i, 1, QTableWidgetItem(trab['nombre']))
-            self.table_trabajadores.setItem(i, 2, QTableWidgetItem(trab['contacto']))
-            self.table_trabajadores.setItem(i, 3, QTableWidgetItem(trab['cargo']))
-            self.table_trabajadores.setItem(i, 4, QTableWidgetItem(trab['tipo_pago'])) # Nuevo
-            self.table_trabajadores.setItem(i, 5, QTableWidgetItem(f"${trab['salario_semanal']:.2f}")) # Renombrado
-            self.table_trabajadores.setItem(i, 6, QTableWidgetItem("Sí" if trab['activo'] else "No"))
+        self.model_trabajadores.cargar(self.db.iter_trabajadores(ver_inactivos))
         
         self.table_trabajadores.setColumnHidden(0, True)
 
@@ -559,25 +817,20 @@ class MainWindow(QMainWindow):
             self._show_message("Error", "El nombre es obligatorio.", "error")
             return
             
-        success, message = self.db.add_trabajador(nombre, contacto, cargo, salario, tipo_pago)
-        if success:
-            self._show_message("Éxito", message)
+        def al_exito():
             self.personal_entry_nombre.clear()
             self.personal_entry_contacto.clear()
             self.personal_entry_cargo.clear()
             self.personal_spin_salario.setValue(0)
-            self.refresh_table_trabajadores()
-        else:
-            self._show_message("Error", message, "error")
+            self.bus.invalidar("trabajadores")
+
+        self._despachar("add_trabajador", nombre, contacto, cargo, salario, tipo_pago, al_exito=al_exito)
 
     def slot_toggle_trabajador(self):
         id_trab = self._get_selected_id(self.table_trabajadores)
         if id_trab:
-            success, message = self.db.toggle_trabajador_activo(id_trab)
-            if success:
-                self.refresh_table_trabajadores()
-            else:
-                self._show_message("Error", message, "error")
+            self._despachar("toggle_trabajador_activo", id_trab,
+                            al_exito=lambda: self.bus.invalidar("trabajadores"), mostrar_exito=False)
 
     def slot_pagar_trabajador(self):
         id_trab = self._get_selected_id(self.table_trabajadores)
@@ -585,9 +838,8 @@ class MainWindow(QMainWindow):
             return
             
         row = self.table_trabajadores.selectionModel().selectedRows()[0].row()
-        nombre = self.table_trabajadores.item(row, 1).text()
-        salario_str = self.table_trabajadores.item(row, 5).text().replace("$", "")
-        salario = float(salario_str)
+        nombre = self.model_trabajadores.valor(row, 1)
+        salario = self.model_trabajadores.valor(row, 5)
 
         # Usar el nuevo PagoDialog
         dialog = PagoDialog(nombre, salario, self)
@@ -597,27 +849,14 @@ class MainWindow(QMainWindow):
             monto = valores["monto"]
             tipo_pago = valores["tipo_pago"]
             
-            success, message = self.db.registrar_pago_trabajador(id_trab, nombre, monto, tipo_pago)
-            if success:
-                self._show_message("Éxito", message)
-            else:
-                self._show_message("Error", message, "error")
+            self._despachar("registrar_pago_trabajador", id_trab, nombre, monto, tipo_pago,
+                            al_exito=lambda: self.bus.invalidar("caja"))
 
     # --- Slots de Proveedores (MODIFICADOS) ---
 
     def refresh_table_proveedores(self):
         ver_inactivos = self.prov_check_ver_inactivos.isChecked()
-        proveedores = self.db.get_proveedores(ver_inactivos)
-        
-        self.table_proveedores.setRowCount(0)
-        for i, prov in enumerate(proveedores):
-            self.table_proveedores.insertRow(i)
-            self.table_proveedores.setItem(i, 0, QTableWidgetItem(str(prov['id_prov'])))
-            self.table_proveedores.setItem(i, 1, QTableWidgetItem(prov['nombre']))
-            self.table_proveedores.setItem(i, 2, QTableWidgetItem(prov['contacto']))
-            self.table_proveedores.setItem(i, 3, QTableWidgetItem(prov['producto_suministrado']))
-            # CAMBIO: La columna 4 ahora es "Activo"
-            self.table_proveedores.setItem(i, 4, QTableWidgetItem("Sí" if prov['activo'] else "No"))
+        self.model_proveedores.cargar(self.db.iter_proveedores(ver_inactivos))
         
         self.table_proveedores.setColumnHidden(0, True)
 
@@ -632,25 +871,20 @@ class MainWindow(QMainWindow):
             return
         
         # CAMBIO: Llamada a DB modificada
-        success, message = self.db.add_proveedor(nombre, contacto, producto)
-        if success:
-            self._show_message("Éxito", message)
+        def al_exito():
             self.prov_entry_nombre.clear()
             self.prov_entry_contacto.clear()
             self.prov_entry_producto.clear()
             # CAMBIO: Eliminado spin_pago.setValue(0)
-            self.refresh_table_proveedores()
-        else:
-            self._show_message("Error", message, "error")
+            self.bus.invalidar("proveedores")
+
+        self._despachar("add_proveedor", nombre, contacto, producto, al_exito=al_exito)
 
     def slot_toggle_proveedor(self):
         id_prov = self._get_selected_id(self.table_proveedores)
         if id_prov:
-            success, message = self.db.toggle_proveedor_activo(id_prov)
-            if success:
-                self.refresh_table_proveedores()
-            else:
-                self._show_message("Error", message, "error")
+            self._despachar("toggle_proveedor_activo", id_prov,
+                            al_exito=lambda: self.bus.invalidar("proveedores"), mostrar_exito=False)
                 
     def slot_pagar_proveedor(self):
         id_prov = self._get_selected_id(self.table_proveedores)
@@ -658,7 +892,7 @@ class MainWindow(QMainWindow):
             return
             
         row = self.table_proveedores.selectionModel().selectedRows()[0].row()
-        nombre = self.table_proveedores.item(row, 1).text()
+        nombre = self.model_proveedores.valor(row, 1)
         
         # CAMBIO: Usar el InputDialog importado
         dialog = InputDialog(self, f"Pagar a {nombre}", "Monto a Pagar (Factura):")
@@ -666,59 +900,146 @@ class MainWindow(QMainWindow):
         
         if dialog.exec():
             monto = dialog.get_value()
-            success, message = self.db.registrar_pago_proveedor(id_prov, nombre, monto)
-            if success:
-                self._show_message("Éxito", message)
-            else:
-                self._show_message("Error", message, "error")
+            self._despachar("registrar_pago_proveedor", id_prov, nombre, monto,
+                            al_exito=lambda: self.bus.invalidar("caja"))
 
     # --- Slots de Reportes y Cierre (MODIFICADOS) ---
     
     def slot_exportar_excel(self):
-        if not REPORTES_ENABLED:
-            self._show_message("Error", "Bibliotecas de reportes no instaladas.", "error")
-            return
-        
-        datos = self.db.get_datos_reporte_ventas()
-        if not datos:
-            self._show_message("Info", "No hay datos de cierres para exportar.")
+        # Sin openpyxl solo se ofrece CSV
+        if ".xlsx" in formatos_disponibles():
+            sugerido, filtros = "reporte_cierres_panaderia.xlsx", "Excel (*.xlsx);;CSV (*.csv)"
+        else:
+            sugerido, filtros = "reporte_cierres_panaderia.csv", "CSV (*.csv)"
+        archivo, _ = QFileDialog.getSaveFileName(self, "Exportar Reporte de Cierres", sugerido, filtros)
+        if not archivo:
             return
 
-        try:
-            df = pd.DataFrame(datos)
-            archivo_excel = "reporte_cierres_panaderia.xlsx"
-            df.to_excel(archivo_excel, index=False, sheet_name="CierresDiarios")
-            
-            self._show_message("Éxito", f"Reporte guardado como '{archivo_excel}'\n"
-                                        f"El archivo se encuentra en:\n{os.path.abspath(archivo_excel)}")
-        except Exception as e:
-            self._show_message("Error de Exportación", f"No se pudo guardar el archivo Excel.\nError: {e}", "error")
+        fecha_inicio = fecha_fin = None
+        if not self.export_check_todo.isChecked():
+            fecha_inicio = self.export_date_inicio.date().toString("yyyy-MM-dd")
+            fecha_fin = self.export_date_fin.date().toString("yyyy-MM-dd")
 
-    def slot_generar_grafico(self):
-        if not REPORTES_ENABLED:
-            self._show_message("Error", "Bibliotecas de gráficos no instaladas.", "error")
+        progreso = QProgressDialog("Exportando cierres...", "Cancelar", 0, 100, self)
+        progreso.setWindowTitle("Exportar Reporte")
+        progreso.setWindowModality(Qt.WindowModality.WindowModal)
+        progreso.setMinimumDuration(300)
+        progreso.canceled.connect(self.servicio.cancelar)
+
+        def cerrar_progreso():
+            progreso.canceled.disconnect(self.servicio.cancelar)
+            progreso.close()
+
+        def al_progresar(hecho, total):
+            progreso.setValue(int(hecho * 100 / total) if total else 100)
+
+        def al_terminar(filas):
+            cerrar_progreso()
+            if filas == 0:
+                self._show_message("Info", "No hay datos de cierres para exportar.")
+                return
+            self._show_message("Éxito", f"Reporte guardado ({filas} filas) como '{os.path.basename(archivo)}'\n"
+                                        f"El archivo se encuentra en:\n{os.path.abspath(archivo)}")
+
+        def al_fallar(mensaje):
+            cerrar_progreso()
+            self._show_message("Error de Exportación", f"No se pudo guardar el archivo.\nError: {mensaje}", "error")
+
+        self.servicio.enviar(exportar_cierres, archivo, fecha_inicio, fecha_fin,
+                             al_terminar=al_terminar, al_fallar=al_fallar, al_progresar=al_progresar)
+
+    def slot_importar_csv(self):
+        tipo = self.importar_combo_tipo.currentData()
+        archivo, _ = QFileDialog.getOpenFileName(
+            self, f"Importar {self.importar_combo_tipo.currentText()}", "", "CSV (*.csv);;Todos (*)"
+        )
+        if not archivo:
             return
-        
-        datos = self.db.get_datos_grafico_ventas()
-        if not datos:
-            self._show_message("Info", "No hay datos de ingresos suficientes para generar un gráfico.")
+
+        if tipo == "conteo":
+            fecha_cierre = datetime.date.today()
+            confirm = QMessageBox.question(self, "Confirmar Cierre",
+                                       f"¿Ejecutar el cierre del {fecha_cierre} con el conteo de "
+                                       f"'{os.path.basename(archivo)}'?\n\n"
+                                       "Los productos que no figuren en el archivo conservan su stock actual.",
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                       QMessageBox.StandardButton.No)
+            if confirm != QMessageBox.StandardButton.Yes:
+                return
+
+            def al_terminar_conteo(resultado):
+                success, message, errores = resultado
+                if success:
+                    self._show_message("Cierre Diario", message)
+                    self._invalidar_cierre()
+                else:
+                    self._show_message("Error en Cierre", message + self._detalle_errores(errores), "error")
+
+            self.servicio.enviar(importar_conteo_csv, archivo, fecha_cierre, al_terminar=al_terminar_conteo,
+                                 al_fallar=lambda m: self._show_message("Error de Importación", m, "error"))
             return
 
-        dias = [fila[0] for fila in datos]
-        totales = [fila[1] for fila in datos]
-
-        try:
-            plt.figure(figsize=(10, 6))
-            plt.bar(dias, totales, color='skyblue')
-            plt.xlabel("Fecha")
-            plt.ylabel("Total Ingresos ($)")
-            plt.title("Ingresos Calculados por Día (Últimos 30 días)")
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.show() 
-            
-        except Exception as e:
-            self._show_message("Error de Gráfico", f"No se pudo generar el gráfico.\nError: {e}", "error")
+        progreso = QProgressDialog("Importando...", "Cancelar", 0, 100, self)
+        progreso.setWindowTitle("Importar CSV")
+        progreso.setWindowModality(Qt.WindowModality.WindowModal)
+        progreso.setMinimumDuration(300)
+        progreso.canceled.connect(self.servicio.cancelar)
+
+        def cerrar_progreso():
+            progreso.canceled.disconnect(self.servicio.cancelar)
+            progreso.close()
+
+        def al_progresar(hecho, total):
+            progreso.setValue(int(hecho * 100 / total) if total else 100)
+
+        def al_terminar(resultado):
+            cerrar_progreso()
+            if tipo in ("trabajadores", "proveedores"):
+                self.bus.invalidar(tipo)
+            # Los productos se refrescan solos con el aviso del catálogo
+            errores = resultado["errores"]
+            self._show_message("Importación" if not errores else "Importación con errores",
+                               f"{resultado['aplicadas']} de {resultado['leidas']} filas importadas."
+                               + self._detalle_errores(errores),
+                               "info" if not errores else "error")
+
+        def al_fallar(mensaje):
+            cerrar_progreso()
+            # Los lotes confirmados antes de un error o una cancelación quedan
+            # guardados; si no llegó a confirmarse ninguno, no se recarga nada
+            self.bus.invalidar("trabajadores")
+            self.bus.invalidar("proveedores")
+            self._show_message("Error de Importación", mensaje, "error")
+
+        self.servicio.enviar(importar_csv, tipo, archivo,
+                             al_terminar=al_terminar, al_fallar=al_fallar, al_progresar=al_progresar)
+
+    def _detalle_errores(self, errores, maximo=15):
+        if not errores:
+            return ""
+        lineas = [f"Línea {linea}: {mensaje}" for linea, mensaje in errores[:maximo]]
+        if len(errores) > maximo:
+            lineas.append(f"... y {len(errores) - maximo} errores más.")
+        return "\n\n" + "\n".join(lineas)
+
+    def slot_generar_grafico(self):
+        # La caché solo consulta a la DB los días nuevos desde el último cierre visto
+        rango_dias = self.grafico_combo_rango.currentData()
+        self.servicio.enviar(self.cache_grafico.actualizar, rango_dias,
+                             al_terminar=self._dibujar_grafico,
+                             al_fallar=lambda m: self._show_message("Error de Gráfico", m, "error"))
+
+    def _refrescar_grafico(self, ids):
+        """Refresco del bus (y carga inicial): dibuja aunque la serie precargada no haya cambiado."""
+        rango_dias = self.grafico_combo_rango.currentData()
+        self.servicio.enviar(self.cache_grafico.actualizar, rango_dias,
+                             al_terminar=lambda cambio: self._dibujar_grafico(True),
+                             al_fallar=lambda m: self._show_message("Error de Gráfico", m, "error"))
+
+    def _dibujar_grafico(self, cambio):
+        if cambio:
+            # Copias: la caché se sigue actualizando en el hilo del servicio
+            self.grafico_ingresos.set_serie(list(self.cache_grafico.dias), self.cache_grafico.totales[:])
             
     def slot_ejecutar_cierre(self):
         # NUEVO: Lanza el diálogo de Cierre de Día
@@ -733,25 +1054,84 @@ class MainWindow(QMainWindow):
         
         if dialog.exec():
             conteo_final = dialog.get_conteo_final()
+            cambios = dialog.get_cambios()
             fecha_cierre = datetime.date.today()
 
             confirm = QMessageBox.question(self, "Confirmar Cierre",
                                        f"¿Está seguro de ejecutar el cierre para la fecha {fecha_cierre}?\n\n"
+                                       f"{len(cambios)} de {len(conteo_final)} productos tienen un conteo distinto al stock actual.\n"
                                        "Esto calculará las ventas y REEMPLAZARÁ el stock actual con el conteo ingresado.",
                                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                        QMessageBox.StandardButton.No)
             
             if confirm == QMessageBox.StandardButton.Yes:
-                success, message = self.db.realizar_cierre_diario(fecha_cierre, conteo_final)
-                if success:
-                    self._show_message("Cierre Diario", message)
-                    self.refresh_table_productos()
-                    self.refresh_combobox_productos()
-                else:
-                    self._show_message("Error en Cierre", message, "error")
+                self._ejecutar_cierre_en_segundo_plano(fecha_cierre, conteo_final)
+
+    def _invalidar_cierre(self):
+        # Los productos se refrescan con el aviso del catálogo
+        for conjunto in ("ingresos", "caja", "cierres"):
+            self.bus.invalidar(conjunto)
+
+    def _ejecutar_cierre_en_segundo_plano(self, fecha_cierre, conteo_final):
+        """Corre el cierre en el hilo del servicio con un diálogo de progreso cancelable."""
+        progreso = QProgressDialog("Ejecutando cierre del día...", "Cancelar", 0, 0, self)
+        progreso.setWindowTitle("Cierre Diario")
+        progreso.setWindowModality(Qt.WindowModality.WindowModal)
+        progreso.setMinimumDuration(300)
+        progreso.canceled.connect(self.servicio.cancelar)
+
+        def cerrar_progreso():
+            # QProgressDialog emite 'canceled' al cerrarse; desconectar antes
+            progreso.canceled.disconnect(self.servicio.cancelar)
+            progreso.close()
+
+        def al_terminar(resultado):
+            cerrar_progreso()
+            success, message = resultado
+            if success:
+                self._show_message("Cierre Diario", message)
+                self._invalidar_cierre()
+            else:
+                self._show_message("Error en Cierre", message, "error")
+
+        def al_fallar(mensaje):
+            cerrar_progreso()
+            self._show_message("Error en Cierre", mensaje, "error")
+
+        self.servicio.enviar("realizar_cierre_diario", fecha_cierre, conteo_final,
+                             al_terminar=al_terminar, al_fallar=al_fallar)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._primer_show:
+            # Después de este show se procesan la exposición y el primer pintado
+            self._primer_show = False
+            QTimer.singleShot(0, self._al_quedar_visible)
+        if self._precalentar_reportes:
+            # Una sola vez, cuando la ventana ya se pintó
+            self._precalentar_reportes = False
+            QTimer.singleShot(1000, self._iniciar_precalentamiento)
+
+    def _al_quedar_visible(self):
+        self._marcar("ventana_visible")
+        self.servicio.enviar(self._precargar, al_terminar=lambda _: self._marcar("precarga"))
+
+    def _precargar(self, db, progreso):
+        """Lee en el hilo del servicio lo más caro de las pestañas aún no abiertas."""
+        if db.catalogo is not None:
+            db.get_productos(ver_ocultos=True)
+        # Si el gráfico ya se abrió, respetar el rango elegido
+        self.cache_grafico.actualizar(db, self.cache_grafico.rango_dias or GRAFICO_RANGOS[0])
+
+    def _iniciar_precalentamiento(self):
+        """Importa en un hilo aparte las bibliotecas de reportes para que el primer uso sea inmediato."""
+        threading.Thread(target=_precalentar_modulos, daemon=True).start()
 
     def closeEvent(self, event):
         """Sobrescribe el evento de cierre para cerrar la DB."""
+        if self.vigilante is not None:
+            self.vigilante.detener()
+        self.servicio.detener()
         self.db.close()
         print("Conexión a la base de datos cerrada.")
         event.accept()
\ No newline at end of file
@@ -0,0 +1,259 @@
+import sys
+from array import array
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QFont
+
+
+# --- Formateadores de celdas ---
+
+def formato_texto(valor):
+    return "" if valor is None else str(valor)
+
+def formato_moneda(valor):
+    return f"${valor:.2f}"
+
+def formato_si_no(valor):
+    return "Sí" if valor else "No"
+
+
+class ModeloTablaColumnar(QAbstractTableModel):
+    """
+    Modelo de solo lectura para tablas grandes.
+    Las filas se guardan por columnas (arrays para números, listas de textos
+    internados para el resto) y cada celda se formatea recién en data().
+    Los datos llegan de un iterador de lotes de tuplas que se consume a medida
+    que la vista lo pide con canFetchMore/fetchMore.
+
+    'columnas' es una lista de (cabecera, formateador, tipo), donde 'tipo' es
+    un código de array ('q' enteros, 'd' reales) o None para valores de texto.
+    """
+    def __init__(self, columnas, parent=None):
+        super().__init__(parent)
+        self._cabeceras = [c[0] for c in columnas]
+        self._formateadores = [c[1] or formato_texto for c in columnas]
+        self._tipos = [c[2] for c in columnas]
+        self._datos = self._buffers_vacios()
+        self._filas = 0
+        self._fuente = None
+        self._indice = None  # {clave de la columna 0: fila}, se arma a demanda
+
+    def _buffers_vacios(self):
+        return [array(tipo) if tipo else [] for tipo in self._tipos]
+
+    def cargar(self, lotes):
+        """Reemplaza el contenido por un nuevo iterador de lotes y carga el primero."""
+        self.beginResetModel()
+        self._datos = self._buffers_vacios()
+        self._filas = 0
+        self._indice = None
+        self._fuente = iter(lotes)
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def actualizar_filas(self, filas):
+        """
+        Reemplaza en el lugar las filas ya cargadas cuya clave (columna 0)
+        coincide, avisando a la vista solo por esas filas.
+        Devuelve las claves que no estaban cargadas.
+        """
+        indice = self._indice_claves()
+        faltantes = []
+        for fila in filas:
+            i = indice.get(fila[0])
+            if i is None:
+                faltantes.append(fila[0])
+                continue
+            for buffer, valor in zip(self._datos, fila):
+                buffer[i] = valor
+            self.dataChanged.emit(self.index(i, 0), self.index(i, len(self._cabeceras) - 1))
+        return faltantes
+
+    def contiene(self, clave):
+        """True si ya hay una fila cargada con esa clave en la columna 0."""
+        return clave in self._indice_claves()
+
+    def _indice_claves(self):
+        if self._indice is None:
+            self._indice = {clave: i for i, clave in enumerate(self._datos[0])}
+        return self._indice
+
+    def valor(self, fila, columna):
+        """Valor crudo (sin formato) de una celda."""
+        return self._datos[columna][fila]
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._filas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cabeceras)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        columna = index.column()
+        return self._formateadores[columna](self._datos[columna][index.row()])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._cabeceras[section]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fuente is not None
+
+    def fetchMore(self, parent):
+        if parent.isValid() or self._fuente is None:
+            return
+        lote = next(self._fuente, None)
+        if not lote:
+            self._fuente = None
+            return
+
+        self.beginInsertRows(QModelIndex(), self._filas, self._filas + len(lote) - 1)
+        for buffer, tipo, valores in zip(self._datos, self._tipos, zip(*lote)):
+            if tipo:
+                buffer.extend(valores)
+            else:
+                # Fechas y nombres se repiten mucho: internarlos evita una copia por fila
+                buffer.extend(sys.intern(v) if isinstance(v, str) else v for v in valores)
+        self._filas += len(lote)
+        self._indice = None
+        self.endInsertRows()
+
+
+class ModeloConteo(QAbstractTableModel):
+    """
+    Modelo editable del conteo de cierre: (Código, Producto, Stock Actual, Conteo).
+    Cada producto empieza con su stock actual como conteo sugerido; solo la
+    columna Conteo se edita y las filas modificadas se muestran en negrita.
+    """
+    CABECERAS = ("Código", "Producto", "Stock Actual", "Conteo")
+    COLUMNA_CONTEO = 3
+
+    def __init__(self, productos, parent=None):
+        super().__init__(parent)
+        self._ids = array('q', (p['id_prod'] for p in productos))
+        self._nombres = [p['nombre'] for p in productos]
+        self._stock = array('q', (p['stock'] for p in productos))
+        self._conteo = array('q', self._stock)
+        self._cambiadas = set()  # filas con conteo distinto del stock actual
+        self._filas_por_id = None
+        self._negrita = QFont()
+        self._negrita.setBold(True)
+
+    def fila_de_id(self, id_prod):
+        """Fila del producto con ese código, o None."""
+        if self._filas_por_id is None:
+            self._filas_por_id = {id_prod: i for i, id_prod in enumerate(self._ids)}
+        return self._filas_por_id.get(id_prod)
+
+    def conteo(self):
+        """{id_prod: cantidad} de todos los productos."""
+        return dict(zip(self._ids, self._conteo))
+
+    def cambios(self):
+        """{id_prod: cantidad} solo de los productos cuyo conteo difiere del stock actual."""
+        return {self._ids[i]: self._conteo[i] for i in sorted(self._cambiadas)}
+
+    def cantidad_cambios(self):
+        return len(self._cambiadas)
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.CABECERAS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        fila, columna = index.row(), index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if columna == 0:
+                return self._ids[fila]
+            if columna == 1:
+                return self._nombres[fila]
+            if columna == 2:
+                return self._stock[fila]
+            return self._conteo[fila]
+        if role == Qt.ItemDataRole.FontRole and fila in self._cambiadas:
+            return self._negrita
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != self.COLUMNA_CONTEO:
+            return False
+        fila = index.row()
+        self._conteo[fila] = int(value)
+        if self._conteo[fila] != self._stock[fila]:
+            self._cambiadas.add(fila)
+        else:
+            self._cambiadas.discard(fila)
+        self.dataChanged.emit(self.index(fila, 0), self.index(fila, self.COLUMNA_CONTEO))
+        return True
+
+    def flags(self, index):
+        banderas = super().flags(index)
+        if index.column() == self.COLUMNA_CONTEO:
+            banderas |= Qt.ItemFlag.ItemIsEditable
+        return banderas
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.CABECERAS[section]
+        return None
+
+
+# --- Definición de columnas de cada tabla ---
+
+COLUMNAS_CIERRES = [
+    ("Fecha", None, None),
+    ("Producto", None, None),
+    ("Stock Inicial", None, "q"),
+    ("Producción", None, "q"),
+    ("Stock Final", None, "q"),
+    ("Ventas (calc)", None, "q"),
+    ("Ingresos (calc)", formato_moneda, "d"),
+]
+
+COLUMNAS_CUADRE = [
+    ("Período", None, None),
+    ("Ingresos", formato_moneda, "d"),
+    ("Pagos", formato_moneda, "d"),
+    ("Balance", formato_moneda, "d"),
+    ("Detalle de pagos", None, None),
+]
+
+COLUMNAS_PRODUCTOS = [
+    ("ID", None, "q"),
+    ("Nombre", None, None),
+    ("Precio", formato_moneda, "d"),
+    ("Stock Actual", None, "q"),
+    ("Prod. Hoy", None, "q"),
+    ("Gaseosa", formato_si_no, "q"),
+    ("Oculto", formato_si_no, "q"),
+]
+
+COLUMNAS_TRABAJADORES = [
+    ("ID", None, "q"),
+    ("Nombre", None, None),
+    ("Contacto", None, None),
+    ("Cargo", None, None),
+    ("Tipo Pago", None, None),
+    ("Salario", formato_moneda, "d"),
+    ("Activo", formato_si_no, "q"),
+]
+
+COLUMNAS_PROVEEDORES = [
+    ("ID", None, "q"),
+    ("Nombre", None, None),
+    ("Contacto", None, None),
+    ("Suministro", None, None),
+    ("Activo", formato_si_no, "q"),
+]
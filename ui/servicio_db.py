@@ -0,0 +1,170 @@
+import itertools
+import threading
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+
+class TareaCancelada(Exception):
+    """Se lanza dentro de una tarea cuando el usuario pidió cancelarla."""
+
+
+class _Lote:
+    """
+    Escrituras agrupables (ver core.database._escritura_agrupable) encoladas
+    seguidas. Sigue aceptando tareas hasta que el trabajador lo toma.
+    """
+    def __init__(self, tarea):
+        self.tareas = [tarea]  # (id_tarea, nombre del método, args)
+        self.cerrado = False
+        self.bloqueo = threading.Lock()
+
+    def agregar(self, tarea):
+        with self.bloqueo:
+            if self.cerrado:
+                return False
+            self.tareas.append(tarea)
+            return True
+
+    def tomar(self):
+        with self.bloqueo:
+            self.cerrado = True
+            return self.tareas
+
+
+class _TrabajadorDB(QObject):
+    """Vive en el hilo del servicio y ejecuta las tareas de una en una."""
+    terminado = pyqtSignal(int, object)
+    fallo = pyqtSignal(int, str)
+    progreso = pyqtSignal(int, int, int)
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.cancelar_actual = threading.Event()
+
+    @pyqtSlot(int, object, object)
+    def ejecutar(self, id_tarea, tarea, args):
+        self.cancelar_actual.clear()
+        try:
+            if isinstance(tarea, str):
+                resultado = getattr(self.db, tarea)(*args)
+            else:
+                resultado = tarea(self.db, *args, progreso=lambda hecho, total: self._informar(id_tarea, hecho, total))
+            self.terminado.emit(id_tarea, resultado)
+        except TareaCancelada:
+            self.fallo.emit(id_tarea, "Operación cancelada.")
+        except Exception as e:
+            self.fallo.emit(id_tarea, str(e))
+
+    @pyqtSlot(object)
+    def ejecutar_lote(self, lote):
+        tareas = lote.tomar()
+        try:
+            with self.db.agrupar():
+                resultados = [(id_tarea, getattr(self.db, tarea)(*args)) for id_tarea, tarea, args in tareas]
+        except Exception as e:
+            for id_tarea, _, _ in tareas:
+                self.fallo.emit(id_tarea, str(e))
+            return
+        # Los resultados salen después del commit del grupo
+        for id_tarea, resultado in resultados:
+            self.terminado.emit(id_tarea, resultado)
+
+    def _informar(self, id_tarea, hecho, total):
+        if self.cancelar_actual.is_set():
+            raise TareaCancelada()
+        self.progreso.emit(id_tarea, hecho, total)
+
+
+class ServicioDB(QObject):
+    """
+    Ejecuta llamadas a DatabaseManager en un QThread dedicado.
+    Las tareas se encolan y corren en orden, así que todas las escrituras
+    siguen pasando por un único escritor serializado.
+
+    Una tarea es el nombre de un método de DatabaseManager, o una función
+    tarea(db, *args, progreso) donde progreso(hecho, total) informa avance.
+    Los resultados vuelven al hilo de la interfaz por los callbacks.
+
+    Las escrituras chicas (registrar_pago_*, update_produccion_stock) que se
+    encolan seguidas, por ejemplo mientras corre una tarea larga, se
+    ejecutan juntas dentro de DatabaseManager.agrupar(): un solo commit para
+    toda la ráfaga. Cada una recibe su propio resultado.
+    """
+    _solicitar = pyqtSignal(int, object, object)
+    _solicitar_lote = pyqtSignal(object)
+    ocupado = pyqtSignal(bool)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._callbacks = {}
+        self._lote = None  # último _Lote encolado, mientras acepte tareas
+
+        self._hilo = QThread()
+        self._trabajador = _TrabajadorDB(db)
+        self._trabajador.moveToThread(self._hilo)
+        self._solicitar.connect(self._trabajador.ejecutar)
+        self._solicitar_lote.connect(self._trabajador.ejecutar_lote)
+        self._trabajador.terminado.connect(self._al_terminar)
+        self._trabajador.fallo.connect(self._al_fallar)
+        self._trabajador.progreso.connect(self._al_progresar)
+        self._hilo.start()
+
+    def enviar(self, tarea, *args, al_terminar=None, al_fallar=None, al_progresar=None):
+        """Encola una tarea y devuelve su id."""
+        id_tarea = next(self._ids)
+        self._callbacks[id_tarea] = (al_terminar, al_fallar, al_progresar)
+        if len(self._callbacks) == 1:
+            self.ocupado.emit(True)
+        if isinstance(tarea, str) and getattr(getattr(type(self._trabajador.db), tarea, None), "agrupable", False):
+            if self._lote is None or not self._lote.agregar((id_tarea, tarea, args)):
+                self._lote = _Lote((id_tarea, tarea, args))
+                self._solicitar_lote.emit(self._lote)
+        else:
+            # Las tareas siguientes no se adelantan a esta
+            self._lote = None
+            self._solicitar.emit(id_tarea, tarea, args)
+        return id_tarea
+
+    def cancelar(self):
+        """Cancela la tarea en curso: interrumpe la consulta activa de la conexión principal."""
+        self._trabajador.cancelar_actual.set()
+        self._trabajador.db.conn.interrupt()
+
+    def detener(self):
+        self._hilo.quit()
+        self._hilo.wait()
+
+    def _terminar(self, id_tarea):
+        callbacks = self._callbacks.pop(id_tarea, (None, None, None))
+        if not self._callbacks:
+            self.ocupado.emit(False)
+        return callbacks
+
+    def _al_terminar(self, id_tarea, resultado):
+        al_terminar, _, _ = self._terminar(id_tarea)
+        if al_terminar:
+            al_terminar(resultado)
+
+    def _al_fallar(self, id_tarea, mensaje):
+        _, al_fallar, _ = self._terminar(id_tarea)
+        if al_fallar:
+            al_fallar(mensaje)
+
+    def _al_progresar(self, id_tarea, hecho, total):
+        _, _, al_progresar = self._callbacks.get(id_tarea, (None, None, None))
+        if al_progresar:
+            al_progresar(hecho, total)
+
+
+class AvisosCatalogo(QObject):
+    """
+    Oyente de core.database.CatalogoProductos que reenvía cada aviso por una
+    señal, para que llegue al hilo de la interfaz aunque el cambio se haya
+    hecho en el hilo del servicio.
+    """
+    cambio = pyqtSignal(str, object)
+
+    def __call__(self, evento, ids):
+        self.cambio.emit(evento, ids)